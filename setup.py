@@ -4,4 +4,9 @@ setup(
     name='coffee-chats-program',
     version='1.0.0',
     packages=find_packages(),
-)
\ No newline at end of file
+    entry_points={
+        'console_scripts': [
+            'coffee-chats=src.cli:main',
+        ],
+    },
+)
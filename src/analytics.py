@@ -0,0 +1,288 @@
+"""
+Materialized analytics over captain_history.db.
+
+Summary tables are kept up to date incrementally: CaptainHistoryDB calls
+update_aggregates() for every meeting inside the same transaction that
+records it, so dashboards read precomputed rows instead of rescanning
+meetings.group_members.
+
+Tables:
+    employee_stats      - meetings, captaincies, distinct partners and
+                          cross-department meetings per employee
+    employee_partners   - how often each (employee, partner) pair has met
+    department_stats    - member meetings, captaincies and cross-department
+                          pairs per department
+    department_links    - cross-department connection counts per department pair
+    round_stats         - groups, participants, roster size and
+                          cross-department pairs per round (meeting date)
+"""
+
+import csv
+import os
+import sqlite3
+from itertools import combinations
+from typing import Dict, List, Tuple
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS employee_stats (
+        employee_id TEXT PRIMARY KEY,
+        meetings INTEGER NOT NULL DEFAULT 0,
+        captain_count INTEGER NOT NULL DEFAULT 0,
+        distinct_partners INTEGER NOT NULL DEFAULT 0,
+        cross_department_meetings INTEGER NOT NULL DEFAULT 0,
+        first_meeting_date TEXT,
+        last_meeting_date TEXT
+    );
+    CREATE TABLE IF NOT EXISTS employee_partners (
+        employee_id TEXT NOT NULL,
+        partner_id TEXT NOT NULL,
+        meetings INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (employee_id, partner_id)
+    );
+    CREATE TABLE IF NOT EXISTS department_stats (
+        department TEXT PRIMARY KEY,
+        member_meetings INTEGER NOT NULL DEFAULT 0,
+        captaincies INTEGER NOT NULL DEFAULT 0,
+        cross_department_pairs INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS department_links (
+        department_a TEXT NOT NULL,
+        department_b TEXT NOT NULL,
+        pairs INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (department_a, department_b)
+    );
+    CREATE TABLE IF NOT EXISTS round_stats (
+        round_date TEXT PRIMARY KEY,
+        groups INTEGER NOT NULL DEFAULT 0,
+        participants INTEGER NOT NULL DEFAULT 0,
+        employees INTEGER NOT NULL DEFAULT 0,
+        cross_department_pairs INTEGER NOT NULL DEFAULT 0
+    );
+"""
+
+AGGREGATE_TABLES = ('employee_stats', 'employee_partners', 'department_stats',
+                    'department_links', 'round_stats')
+
+UNKNOWN_DEPARTMENT = "Unknown"
+
+
+def create_tables(cursor: sqlite3.Cursor) -> None:
+    """Create the summary tables if they don't exist"""
+    # One statement at a time: executescript() would commit the caller's transaction
+    for statement in SCHEMA.split(';'):
+        if statement.strip():
+            cursor.execute(statement)
+
+
+def update_aggregates(cursor: sqlite3.Cursor, captain_id: str, members: List[str], date: str) -> None:
+    """
+    Fold one meeting into the summary tables
+
+    Must be called with the cursor of the transaction that inserts the meeting,
+    so the aggregates can never disagree with the meetings table.
+    """
+    placeholders = ','.join('?' * len(members))
+    cursor.execute(f"SELECT employee_id, department FROM captain_history WHERE employee_id IN ({placeholders})",
+                   members)
+    department = dict(cursor.fetchall())
+    departments = {m: department.get(m, UNKNOWN_DEPARTMENT) for m in members}
+
+    # Per employee
+    for member in members:
+        new_partners = 0
+        for partner in members:
+            if partner == member:
+                continue
+            cursor.execute("""
+                INSERT OR IGNORE INTO employee_partners (employee_id, partner_id, meetings)
+                VALUES (?, ?, 0)
+            """, (member, partner))
+            new_partners += cursor.rowcount
+            cursor.execute("""
+                UPDATE employee_partners SET meetings = meetings + 1
+                WHERE employee_id = ? AND partner_id = ?
+            """, (member, partner))
+        crossed = any(departments[p] != departments[member] for p in members)
+        cursor.execute("""
+            INSERT INTO employee_stats (employee_id, meetings, captain_count, distinct_partners,
+                                        cross_department_meetings, first_meeting_date, last_meeting_date)
+            VALUES (?, 1, ?, ?, ?, ?, ?)
+            ON CONFLICT(employee_id) DO UPDATE SET
+                meetings = meetings + 1,
+                captain_count = captain_count + excluded.captain_count,
+                distinct_partners = distinct_partners + excluded.distinct_partners,
+                cross_department_meetings = cross_department_meetings + excluded.cross_department_meetings,
+                first_meeting_date = MIN(first_meeting_date, excluded.first_meeting_date),
+                last_meeting_date = MAX(last_meeting_date, excluded.last_meeting_date)
+        """, (member, int(member == captain_id), new_partners, int(crossed), date, date))
+
+    # Per department
+    cross_pairs: Dict[str, int] = {}
+    links: Dict[Tuple[str, str], int] = {}
+    for a, b in combinations(members, 2):
+        dept_a, dept_b = sorted((departments[a], departments[b]))
+        if dept_a != dept_b:
+            links[dept_a, dept_b] = links.get((dept_a, dept_b), 0) + 1
+            cross_pairs[dept_a] = cross_pairs.get(dept_a, 0) + 1
+            cross_pairs[dept_b] = cross_pairs.get(dept_b, 0) + 1
+    for dept in set(departments.values()):
+        cursor.execute("""
+            INSERT INTO department_stats (department, member_meetings, captaincies, cross_department_pairs)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(department) DO UPDATE SET
+                member_meetings = member_meetings + excluded.member_meetings,
+                captaincies = captaincies + excluded.captaincies,
+                cross_department_pairs = cross_department_pairs + excluded.cross_department_pairs
+        """, (dept, sum(1 for m in members if departments[m] == dept),
+              int(departments.get(captain_id) == dept), cross_pairs.get(dept, 0)))
+    cursor.executemany("""
+        INSERT INTO department_links (department_a, department_b, pairs) VALUES (?, ?, ?)
+        ON CONFLICT(department_a, department_b) DO UPDATE SET pairs = pairs + excluded.pairs
+    """, [(a, b, n) for (a, b), n in links.items()])
+
+    # Per round
+    cursor.execute("""
+        INSERT INTO round_stats (round_date, groups, participants, employees, cross_department_pairs)
+        VALUES (?, 1, ?, (SELECT COUNT(*) FROM captain_history), ?)
+        ON CONFLICT(round_date) DO UPDATE SET
+            groups = groups + 1,
+            participants = participants + excluded.participants,
+            employees = excluded.employees,
+            cross_department_pairs = cross_department_pairs + excluded.cross_department_pairs
+    """, (date, len(members), sum(links.values())))
+
+
+def rebuild_aggregates(cursor: sqlite3.Cursor) -> int:
+    """Recompute every summary table from the meetings table. Returns the meetings replayed"""
+    for table in AGGREGATE_TABLES:
+        cursor.execute(f"DELETE FROM {table}")
+    cursor.execute("SELECT captain_id, group_members, date FROM meetings ORDER BY meeting_id")
+    rows = cursor.fetchall()
+    for captain_id, group_members, date in rows:
+        update_aggregates(cursor, captain_id, group_members.split(','), date)
+    return len(rows)
+
+
+class HistoryAnalytics:
+    """Read-only queries over the materialized summary tables"""
+
+    def __init__(self, db):
+        """
+        Args:
+            db: CaptainHistoryDB whose summary tables are read
+        """
+        self.db = db
+
+    def _query(self, sql: str, params: Tuple = ()) -> Tuple[List[str], List[Tuple]]:
+        with self.db._connect() as conn:
+            cursor = conn.execute(sql, params)
+            return [c[0] for c in cursor.description], cursor.fetchall()
+
+    def employee_summary(self) -> Tuple[List[str], List[Tuple]]:
+        """One row per known employee, including those never matched"""
+        return self._query("""
+            SELECT h.employee_id, h.employee_name, h.department,
+                   COALESCE(s.meetings, 0) AS meetings,
+                   COALESCE(s.captain_count, 0) AS captain_count,
+                   COALESCE(s.distinct_partners, 0) AS distinct_partners,
+                   COALESCE(s.cross_department_meetings, 0) AS cross_department_meetings,
+                   s.first_meeting_date, s.last_meeting_date
+            FROM captain_history h LEFT JOIN employee_stats s ON s.employee_id = h.employee_id
+            ORDER BY h.employee_id
+        """)
+
+    def never_matched(self) -> Tuple[List[str], List[Tuple]]:
+        """Known employees who have not been in a single meeting"""
+        return self._query("""
+            SELECT h.employee_id, h.employee_name, h.department, h.created_at
+            FROM captain_history h LEFT JOIN employee_stats s ON s.employee_id = h.employee_id
+            WHERE s.employee_id IS NULL
+            ORDER BY h.department, h.employee_name
+        """)
+
+    def department_summary(self) -> Tuple[List[str], List[Tuple]]:
+        """Headcount, participation and captaincy per department"""
+        return self._query("""
+            SELECT h.department, COUNT(*) AS employees,
+                   SUM(CASE WHEN s.employee_id IS NULL THEN 0 ELSE 1 END) AS ever_matched,
+                   COALESCE(d.member_meetings, 0) AS member_meetings,
+                   COALESCE(d.captaincies, 0) AS captaincies,
+                   COALESCE(d.cross_department_pairs, 0) AS cross_department_pairs
+            FROM captain_history h
+            LEFT JOIN employee_stats s ON s.employee_id = h.employee_id
+            LEFT JOIN department_stats d ON d.department = h.department
+            GROUP BY h.department
+            ORDER BY h.department
+        """)
+
+    def department_links(self) -> Tuple[List[str], List[Tuple]]:
+        """Cross-department connection counts, most connected first"""
+        return self._query("""
+            SELECT department_a, department_b, pairs FROM department_links
+            ORDER BY pairs DESC, department_a, department_b
+        """)
+
+    def round_summary(self) -> Tuple[List[str], List[Tuple]]:
+        """Groups, participants and participation rate per round"""
+        return self._query("""
+            SELECT round_date, groups, participants, employees,
+                   ROUND(100.0 * participants / MAX(employees, 1), 1) AS participation_pct,
+                   cross_department_pairs
+            FROM round_stats
+            ORDER BY round_date
+        """)
+
+    def tables(self) -> Dict[str, Tuple[List[str], List[Tuple]]]:
+        """Every summary as (columns, rows), keyed by sheet name"""
+        return {
+            'Employees': self.employee_summary(),
+            'Never Matched': self.never_matched(),
+            'Departments': self.department_summary(),
+            'Department Links': self.department_links(),
+            'Rounds': self.round_summary(),
+        }
+
+    def rebuild(self) -> int:
+        """Recompute the summary tables from scratch (e.g. after a manual edit of meetings)"""
+        return self.db._write(rebuild_aggregates)
+
+    def export(self, output_path: str) -> List[str]:
+        """
+        Dump every summary table
+
+        Args:
+            output_path: An .xlsx file (one sheet per table) or a directory
+                that receives one CSV file per table
+
+        Returns:
+            List[str]: Files written
+        """
+        tables = self.tables()
+        if output_path.endswith('.xlsx'):
+            import openpyxl
+            from openpyxl.styles import Font
+
+            wb = openpyxl.Workbook()
+            wb.remove(wb.active)
+            for title, (columns, rows) in tables.items():
+                ws = wb.create_sheet(title)
+                ws.append(columns)
+                for cell in ws[1]:
+                    cell.font = Font(bold=True)
+                for row in rows:
+                    ws.append(list(row))
+            if os.path.dirname(output_path):
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            wb.save(output_path)
+            return [output_path]
+
+        os.makedirs(output_path, exist_ok=True)
+        written = []
+        for title, (columns, rows) in tables.items():
+            path = os.path.join(output_path, title.lower().replace(' ', '_') + '.csv')
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                writer.writerows(rows)
+            written.append(path)
+        return written
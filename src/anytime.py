@@ -0,0 +1,252 @@
+"""
+Anytime matching with checkpoints.
+
+On large rosters a thorough search takes minutes. AnytimeMatcher runs
+independently seeded GroupMatcher attempts one after another and keeps the
+best grouping found so far (the incumbent), so a result is ready whenever
+the run stops: at the time limit, after max_attempts, or on Ctrl-C.
+
+Attempts read captain history through a ReadOnlyHistory, so nothing is
+written to the history database while searching. Only finalize() records
+the incumbent, once, under a round ID that survives resumes.
+
+Every checkpoint_interval seconds the search state is written atomically to
+a JSON checkpoint:
+
+    seed, attempts      attempt n uses derive_seed(seed, 'attempt', n), so the
+                        pair is the whole solver state
+    best_score, best    the incumbent's score and its group records
+    best_schedule       the incumbent's meeting-time statistics
+    roster              fingerprint of the roster the checkpoint belongs to
+    round_id            history round ID used by finalize()
+    finalized           whether finalize() has recorded the round
+
+A run started with resume=True continues from the checkpoint and reaches the
+same incumbent as a run that was never interrupted. Once the round is
+recorded the checkpoint cannot be resumed: a later, better incumbent could
+never be written under the same round ID, so history and the exported
+grouping would disagree.
+"""
+
+import contextlib
+import copy
+import hashlib
+import io
+import json
+import os
+import time
+import uuid
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from src.captain_history import CaptainHistoryDB
+from src.coffee_matching import GroupMatcher, groups_from_records, groups_to_records
+from src.compatibility import CompatibilityIndex
+from src.constraints import ConstraintSet
+from src.event_log import EventLog
+from src.history_store import HistoryStore, ReadOnlyHistory
+from src.models import refresh_offsets
+from src.utils import at_round_date, derive_seed, round_date_scope
+
+CHECKPOINT_VERSION = 2
+CHECKPOINT_INTERVAL = 30.0  # seconds between checkpoints
+
+
+def roster_fingerprint(participants: List[dict], index: CompatibilityIndex) -> str:
+    """Stable digest of the roster (IDs and UTC availability), to match checkpoints to rosters"""
+    text = "\n".join(f"{p['id']}:{mask}" for p, mask in zip(participants, index.masks))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class AnytimeMatcher:
+    """Repeated seeded matching that always has its best grouping ready"""
+
+    def __init__(self, participants: List[dict], min_group_size: int = 2, max_group_size: int = 3,
+                 db: Optional[HistoryStore] = None, solver: str = 'random', seed: Optional[int] = None,
+                 max_meetings_per_hour: Optional[int] = None,
+                 constraints: Optional[ConstraintSet] = None,
+                 round_date: Optional[date] = None,
+                 time_limit: Optional[float] = None, max_attempts: Optional[int] = None,
+                 checkpoint_path: Optional[str] = None,
+                 checkpoint_interval: float = CHECKPOINT_INTERVAL, resume: bool = False,
+                 event_log: Optional[EventLog] = None):
+        """
+        Args:
+            participants: List of participant dictionaries
+            db: History store; only read until finalize()
+            seed: Master seed for the attempts (defaults to a random one)
+            time_limit: Seconds this run may search (checked between attempts)
+            max_attempts: Stop once this many attempts were made in total
+            checkpoint_path: JSON file the search state is saved to
+            checkpoint_interval: Seconds between checkpoints
+            resume: Continue from checkpoint_path if it exists
+            event_log: Receives the final groups, captains and unmatched
+                participants from finalize() (attempts are not logged)
+        """
+        if constraints is None:
+            constraints = ConstraintSet(min_group_size=min_group_size, max_group_size=max_group_size)
+        self.constraints = constraints
+        self.participants = participants
+        self.db = db if db is not None else CaptainHistoryDB()
+        self.solver = solver
+        self.max_meetings_per_hour = max_meetings_per_hour
+        self.time_limit = time_limit
+        self.max_attempts = max_attempts
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.event_log = event_log
+
+        # The round date is only in effect while this search works (see at_round_date)
+        self.round_date = round_date
+        with round_date_scope(round_date):
+            if round_date is not None:
+                refresh_offsets(participants)
+            # One compatibility graph for every attempt
+            self.index = CompatibilityIndex(participants, constraints.min_overlap_hours)
+            self.roster = roster_fingerprint(participants, self.index)
+
+        self.seed = seed if seed is not None else uuid.uuid4().int % 2 ** 32
+        self.attempts = 0
+        self.best_score: Optional[Tuple] = None
+        self.best: List[Dict] = []
+        self.best_schedule: Dict = {}
+        self.round_id = uuid.uuid4().hex
+        self.interrupted = False
+        self.finalized = False
+        if resume and checkpoint_path and os.path.exists(checkpoint_path):
+            self.load_checkpoint(checkpoint_path)
+
+    def _attempt(self, n: int) -> Tuple[Tuple, List[Dict], Dict]:
+        """
+        Run attempt n on a copy of the roster, without touching the history database
+
+        The score ranks attempts by people matched, then the lowest soft-rule
+        penalty (see CompiledConstraints.penalty), then fewest meetings over
+        the hourly capacity, then most groups at a preferred hour.
+        """
+        roster = copy.deepcopy(self.participants)
+        with contextlib.redirect_stdout(io.StringIO()):
+            matcher = GroupMatcher(roster, db=ReadOnlyHistory(self.db), index=self.index,
+                                   solver=self.solver, seed=derive_seed(self.seed, 'attempt', n),
+                                   max_meetings_per_hour=self.max_meetings_per_hour,
+                                   constraints=self.constraints)
+            groups = matcher.create_groups()
+        schedule = matcher.schedule
+        score = (sum(len(g.members) for g in groups if g.captain), -matcher.penalty(groups),
+                 -schedule.get('over_capacity', 0), schedule.get('preferred', 0))
+        return score, groups_to_records(groups), schedule
+
+    @at_round_date
+    def run(self) -> List[Dict]:
+        """
+        Search until the time limit, max_attempts or Ctrl-C, whichever comes first
+
+        Returns:
+            List[Dict]: Group records of the best grouping found (see groups_to_records)
+        """
+        start = time.monotonic()
+        last_checkpoint = start
+        print(f"Anytime search from attempt {self.attempts + 1} (seed {self.seed})")
+        try:
+            while self.max_attempts is None or self.attempts < self.max_attempts:
+                if self.time_limit is not None and time.monotonic() - start >= self.time_limit:
+                    print(f"Time limit of {self.time_limit:g}s reached")
+                    break
+                score, records, schedule = self._attempt(self.attempts)
+                self.attempts += 1
+                # Keep the first of equally good attempts
+                if self.best_score is None or score > self.best_score:
+                    self.best_score, self.best, self.best_schedule = score, records, schedule
+                    print(f"Attempt {self.attempts}: {score[0]}/{len(self.participants)} matched "
+                          f"in {len(records)} groups (new best)")
+                if self.checkpoint_path and time.monotonic() - last_checkpoint >= self.checkpoint_interval:
+                    self.save_checkpoint(self.checkpoint_path)
+                    last_checkpoint = time.monotonic()
+        except KeyboardInterrupt:
+            self.interrupted = True
+            print("\nInterrupted, keeping the best grouping found so far")
+        if self.checkpoint_path:
+            self.save_checkpoint(self.checkpoint_path)
+        print(f"Best of {self.attempts} attempts: "
+              f"{self.best_score[0] if self.best_score else 0}/{len(self.participants)} matched")
+        return self.best
+
+    def save_checkpoint(self, path: str) -> None:
+        """Write the search state to a JSON file, atomically"""
+        state = {
+            'version': CHECKPOINT_VERSION,
+            'roster': self.roster,
+            'seed': self.seed,
+            'attempts': self.attempts,
+            'round_id': self.round_id,
+            'finalized': self.finalized,
+            'best_score': list(self.best_score) if self.best_score is not None else None,
+            'best': self.best,
+            'best_schedule': {
+                'per_hour': sorted(self.best_schedule.get('per_hour', {}).items()),
+                'preferred': self.best_schedule.get('preferred', 0),
+                'over_capacity': self.best_schedule.get('over_capacity', 0),
+            },
+        }
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write a sibling file first so an interrupted save never leaves a torn checkpoint
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(temp_path, path)
+
+    def load_checkpoint(self, path: str) -> None:
+        """Restore the search state saved by save_checkpoint"""
+        with open(path) as f:
+            state = json.load(f)
+        if state.get('version') != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version in {path}: {state.get('version')}")
+        if state['roster'] != self.roster:
+            raise ValueError(f"Checkpoint {path} was made for a different roster")
+        if state.get('finalized'):
+            raise ValueError(f"Checkpoint {path} was already recorded as round {state['round_id']}; "
+                             f"start a new search instead of resuming it")
+        self.seed = state['seed']
+        self.attempts = state['attempts']
+        self.round_id = state['round_id']
+        self.best_score = tuple(state['best_score']) if state['best_score'] is not None else None
+        self.best = state['best']
+        schedule = state['best_schedule']
+        self.best_schedule = {'per_hour': {hour: n for hour, n in schedule['per_hour']},
+                              'preferred': schedule['preferred'],
+                              'over_capacity': schedule['over_capacity']}
+        print(f"Resumed from {path}: {self.attempts} attempts made")
+
+    @at_round_date
+    def finalize(self) -> GroupMatcher:
+        """
+        Record the incumbent in the history database
+
+        Employees are registered and the groups written as one round. The
+        round ID comes from the checkpoint, so finalizing the same search
+        twice records it once. The checkpoint is then marked finalized, so
+        it can no longer be resumed.
+
+        Returns:
+            GroupMatcher: Holds the final groups and schedule, for reporting
+        """
+        matcher = GroupMatcher(self.participants, db=self.db, index=self.index, solver=self.solver,
+                               max_meetings_per_hour=self.max_meetings_per_hour,
+                               constraints=self.constraints, event_log=self.event_log)
+        matcher.groups = groups_from_records(self.best, self.participants)
+        matcher.used_participants = {m['id'] for g in matcher.groups for m in g.members}
+        matcher.schedule = self.best_schedule
+        matcher.round_id = self.round_id
+        if self.event_log is not None:
+            matcher.log_round()
+            for group in matcher.groups:
+                matcher.log_group(group, 'anytime')
+            # Restored groups keep their captains without counting a new turn
+            matcher.log_outcome(matcher.groups, counted=False)
+        if matcher.record_groups(matcher.groups):
+            print(f"Recorded {len(matcher.groups)} groups in captain history")
+        self.finalized = True
+        if self.checkpoint_path:
+            self.save_checkpoint(self.checkpoint_path)
+        return matcher
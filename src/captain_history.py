@@ -1,54 +1,194 @@
 # captain_history.py
 import sqlite3
+import random
+import time
+import uuid
+from contextlib import contextmanager
 from datetime import datetime
 import os
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+from src.analytics import create_tables, rebuild_aggregates, update_aggregates
+from src.history_store import HistoryStore, Meeting
 
-class CaptainHistoryDB:
-    """Handles persistent storage of captain assignments and meeting participation"""
+T = TypeVar('T')
+
+# Notification queue, filled and drained by src/notifications.py
+OUTBOX_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS outbox (
+        message_id TEXT PRIMARY KEY,
+        round_id TEXT NOT NULL,
+        employee_id TEXT NOT NULL,
+        recipient TEXT NOT NULL,
+        subject TEXT NOT NULL,
+        body TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',  -- pending, sent or failed
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        sent_at TEXT
+    );
+    CREATE INDEX IF NOT EXISTS outbox_status ON outbox (status, created_at)
+"""
+
+BUSY_TIMEOUT = 5.0    # seconds SQLite waits for another writer's lock
+MAX_RETRIES = 5       # further attempts when the lock wait still times out
+RETRY_BACKOFF = 0.05  # first retry delay in seconds, doubled on each attempt
+
+class CaptainHistoryDB(HistoryStore):
+    """Handles persistent storage of captain assignments and meeting participation
+    
+    Safe to share between processes: every write is a single BEGIN IMMEDIATE
+    transaction (so read-modify-write sequences cannot interleave), waits up to
+    busy_timeout for other writers and retries with exponential backoff if
+    the database stays locked. Rounds carry an ID, so a round committed twice
+    is only counted once.
+    """
     
-    def __init__(self, db_path: str = "data/captain_history.db"):
-        """Initialize database connection and create tables if they don't exist"""
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    def __init__(self, db_path: str = "data/captain_history.db", persistent: bool = False,
+                 busy_timeout: float = BUSY_TIMEOUT, max_retries: int = MAX_RETRIES):
+        """
+        Initialize database connection and create tables if they don't exist
+        
+        Args:
+            db_path: Path to the SQLite database file, or ":memory:"
+            persistent: Keep a single connection open between calls (used by
+                long-running processes such as the matching service; always
+                on for ":memory:")
+            busy_timeout: Seconds to wait for a lock held by another process
+            max_retries: Retries of a write that still found the database locked
+        """
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
         self.db_path = db_path
-        self._create_tables()
+        self.busy_timeout = busy_timeout
+        self.max_retries = max_retries
+        self._conn = None
+        if persistent or db_path == ":memory:":
+            self._conn = sqlite3.connect(db_path, timeout=busy_timeout, check_same_thread=False)
+        if db_path != ":memory:":
+            # Readers no longer block the writer (and vice versa)
+            self._retry(lambda: self._execute_pragma("PRAGMA journal_mode=WAL"))
+        self._write(self._create_tables)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return the persistent connection if one is open, otherwise a new one"""
+        if self._conn is not None:
+            return self._conn
+        return sqlite3.connect(self.db_path, timeout=self.busy_timeout)
+
+    def _execute_pragma(self, pragma: str) -> None:
+        conn = self._connect()
+        try:
+            conn.execute(pragma)
+        finally:
+            if conn is not self._conn:
+                conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Cursor]:
+        """One BEGIN IMMEDIATE transaction: the write lock is taken up front"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn.cursor()
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        finally:
+            if conn is not self._conn:
+                conn.close()
 
-    def _create_tables(self):
+    def _retry(self, attempt: Callable[[], T]) -> T:
+        """Run attempt, retrying with jittered exponential backoff while the database is locked"""
+        for retry in range(self.max_retries + 1):
+            try:
+                return attempt()
+            except sqlite3.OperationalError as e:
+                message = str(e).lower()
+                if retry == self.max_retries or ("locked" not in message and "busy" not in message):
+                    raise
+                time.sleep(RETRY_BACKOFF * (2 ** retry) * (1 + random.random()))
+
+    def _write(self, work: Callable[[sqlite3.Cursor], T]) -> T:
+        """Run work(cursor) in its own transaction, retried as a whole if the database is locked"""
+        def attempt() -> T:
+            with self._transaction() as cursor:
+                return work(cursor)
+        return self._retry(attempt)
+
+    def close(self) -> None:
+        """Close the persistent connection, if any"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _query(self, sql: str, params: tuple = ()) -> List[Tuple]:
+        """Run a read-only query, closing the connection unless it is the persistent one"""
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            if conn is not self._conn:
+                conn.close()
+
+    def _create_tables(self, cursor: sqlite3.Cursor) -> None:
         """Create necessary database tables if they don't exist"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Create captain history table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS captain_history (
-                    employee_id TEXT PRIMARY KEY,
-                    employee_name TEXT NOT NULL,
-                    department TEXT NOT NULL,
-                    captain_count INTEGER DEFAULT 0,
-                    last_captain_date TEXT,
-                    total_meetings_attended INTEGER DEFAULT 0,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Create meetings table for detailed history
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS meetings (
-                    meeting_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT NOT NULL,
-                    captain_id TEXT NOT NULL,
-                    group_members TEXT NOT NULL,  -- Stored as comma-separated employee IDs
-                    meeting_time TEXT NOT NULL,
-                    FOREIGN KEY (captain_id) REFERENCES captain_history (employee_id)
-                )
-            """)
-            
-            conn.commit()
+        # Create captain history table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS captain_history (
+                employee_id TEXT PRIMARY KEY,
+                employee_name TEXT NOT NULL,
+                department TEXT NOT NULL,
+                captain_count INTEGER DEFAULT 0,
+                last_captain_date TEXT,
+                total_meetings_attended INTEGER DEFAULT 0,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Create meetings table for detailed history
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS meetings (
+                meeting_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date TEXT NOT NULL,
+                captain_id TEXT NOT NULL,
+                group_members TEXT NOT NULL,  -- Stored as comma-separated employee IDs
+                meeting_time TEXT NOT NULL,
+                round_id TEXT,
+                FOREIGN KEY (captain_id) REFERENCES captain_history (employee_id)
+            )
+        """)
+        cursor.execute("PRAGMA table_info(meetings)")
+        if 'round_id' not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute("ALTER TABLE meetings ADD COLUMN round_id TEXT")
+
+        # One row per committed round; its ID makes repeated commits no-ops
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS rounds (
+                round_id TEXT PRIMARY KEY,
+                date TEXT NOT NULL,
+                meetings INTEGER NOT NULL,
+                recorded_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        for statement in OUTBOX_SCHEMA.split(';'):
+            if statement.strip():
+                cursor.execute(statement)
+
+        # Materialized analytics, backfilled once for databases that predate them
+        create_tables(cursor)
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM meetings), EXISTS (SELECT 1 FROM round_stats)")
+        has_meetings, has_aggregates = cursor.fetchone()
+        if has_meetings and not has_aggregates:
+            rebuild_aggregates(cursor)
 
     def get_captain_stats(self, employee_id: str) -> Optional[Tuple[int, str]]:
         """Get captain count and last captain date for an employee"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT captain_count, last_captain_date
@@ -61,11 +201,30 @@ class CaptainHistoryDB:
                 return result[0], result[1]
             return None
 
+    def list_employees(self) -> List[Tuple]:
+        """Return (employee_id, name, department, captain_count, meetings attended) for everyone"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT employee_id, employee_name, department, captain_count, total_meetings_attended
+                FROM captain_history
+                ORDER BY captain_count DESC, employee_name
+            """)
+            return cursor.fetchall()
+
+    def get_recent_groups(self, rounds: int) -> List[List[str]]:
+        """Return the member ID lists of every meeting in the most recent rounds (meeting dates)"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT group_members FROM meetings
+                WHERE date IN (SELECT DISTINCT date FROM meetings ORDER BY date DESC LIMIT ?)
+            """, (rounds,))
+            return [row[0].split(',') for row in cursor.fetchall()]
+
     def update_or_create_employee(self, employee_data: Dict) -> None:
         """Update or create employee record in captain history"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
+        def work(cursor: sqlite3.Cursor) -> None:
             cursor.execute("""
                 INSERT INTO captain_history (
                     employee_id, employee_name, department, captain_count,
@@ -80,43 +239,120 @@ class CaptainHistoryDB:
                 employee_data['name'],
                 employee_data['department']
             ))
-            
-            conn.commit()
+        self._write(work)
 
-    def record_meeting(self, captain_id: str, group_members: List[str], meeting_time: str) -> None:
-        """Record a new meeting with captain and participants"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Update captain's record
-            cursor.execute("""
-                UPDATE captain_history 
-                SET captain_count = captain_count + 1,
-                    last_captain_date = ?,
-                    total_meetings_attended = total_meetings_attended + 1,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE employee_id = ?
-            """, (datetime.now().isoformat(), captain_id))
-            
-            # Update other members' meeting counts
-            member_ids = [m for m in group_members if m != captain_id]
-            for member_id in member_ids:
-                cursor.execute("""
-                    UPDATE captain_history 
-                    SET total_meetings_attended = total_meetings_attended + 1,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE employee_id = ?
-                """, (member_id,))
-            
-            # Record meeting details
-            cursor.execute("""
-                INSERT INTO meetings (date, captain_id, group_members, meeting_time)
-                VALUES (?, ?, ?, ?)
-            """, (
-                datetime.now().isoformat(),
-                captain_id,
-                ','.join(group_members),
-                meeting_time
-            ))
-            
-            conn.commit()
\ No newline at end of file
+    def record_rounds(self, rounds: List[Tuple[Optional[str], List[Meeting]]],
+                      round_ids: Optional[List[str]] = None) -> int:
+        """
+        Record several rounds of meetings, each with its own date, in one transaction
+        
+        Args:
+            rounds: (date, meetings) per round; a None date means now
+            round_ids: Unique ID per round; rounds already recorded are skipped
+        
+        Returns:
+            int: Number of rounds actually written
+        """
+        round_ids = round_ids or [uuid.uuid4().hex for _ in rounds]
+
+        def work(cursor: sqlite3.Cursor) -> int:
+            written = 0
+            for (date, meetings), round_id in zip(rounds, round_ids):
+                date = date or datetime.now().isoformat()
+                cursor.execute("INSERT OR IGNORE INTO rounds (round_id, date, meetings) VALUES (?, ?, ?)",
+                               (round_id, date, len(meetings)))
+                if cursor.rowcount == 0:
+                    continue  # already committed by an earlier (or concurrent) call
+                written += 1
+                for captain_id, group_members, meeting_time in meetings:
+                    self._insert_meeting(cursor, captain_id, group_members, meeting_time, date, round_id)
+            return written
+        return self._write(work)
+
+    def enqueue_messages(self, messages: List[Tuple[str, str, str, str, str, str]]) -> int:
+        """
+        Add notifications to the outbox in one transaction
+
+        Args:
+            messages: (message_id, round_id, employee_id, recipient, subject, body);
+                message IDs already queued are skipped
+
+        Returns:
+            int: Messages added
+        """
+        def work(cursor: sqlite3.Cursor) -> int:
+            cursor.executemany("""
+                INSERT OR IGNORE INTO outbox (message_id, round_id, employee_id, recipient, subject, body)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, messages)
+            return cursor.rowcount
+        return self._write(work)
+
+    def pending_messages(self, limit: Optional[int] = None) -> List[Tuple[str, str, str, str]]:
+        """(message_id, recipient, subject, body) of messages still to send, oldest first"""
+        return self._query("""
+            SELECT message_id, recipient, subject, body FROM outbox
+            WHERE status = 'pending' ORDER BY created_at, message_id LIMIT ?
+        """, (-1 if limit is None else limit,))
+
+    def message_counts(self) -> Dict[str, int]:
+        """Number of outbox messages per status"""
+        return dict(self._query("SELECT status, COUNT(*) FROM outbox GROUP BY status"))
+
+    def update_messages(self, updates: List[Tuple[str, str, Optional[str]]]) -> None:
+        """
+        Record the outcome of send attempts, all in one transaction
+
+        Args:
+            updates: (message_id, status, error) per attempt; status is 'sent'
+                (stamps sent_at), 'pending' (will be retried) or 'failed'
+        """
+        def work(cursor: sqlite3.Cursor) -> None:
+            cursor.executemany("""
+                UPDATE outbox SET status = ?, attempts = attempts + 1,
+                    last_error = COALESCE(?, last_error),
+                    sent_at = CASE WHEN ? = 'sent' THEN CURRENT_TIMESTAMP ELSE sent_at END
+                WHERE message_id = ?
+            """, [(status, error, status, message_id) for message_id, status, error in updates])
+        self._write(work)
+
+    def retry_failed_messages(self) -> int:
+        """Put messages that were given up on back in the queue. Returns how many"""
+        return self._write(lambda cursor: cursor.execute(
+            "UPDATE outbox SET status = 'pending' WHERE status = 'failed'").rowcount)
+
+    def _insert_meeting(self, cursor, captain_id: str, group_members: List[str],
+                        meeting_time: str, date: str, round_id: Optional[str] = None) -> None:
+        # Update captain's record
+        cursor.execute("""
+            UPDATE captain_history 
+            SET captain_count = captain_count + 1,
+                last_captain_date = ?,
+                total_meetings_attended = total_meetings_attended + 1,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE employee_id = ?
+        """, (date, captain_id))
+        
+        # Update other members' meeting counts
+        member_ids = [m for m in group_members if m != captain_id]
+        cursor.executemany("""
+            UPDATE captain_history 
+            SET total_meetings_attended = total_meetings_attended + 1,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE employee_id = ?
+        """, [(member_id,) for member_id in member_ids])
+        
+        # Record meeting details
+        cursor.execute("""
+            INSERT INTO meetings (date, captain_id, group_members, meeting_time, round_id)
+            VALUES (?, ?, ?, ?, ?)
+        """, (
+            date,
+            captain_id,
+            ','.join(group_members),
+            meeting_time,
+            round_id
+        ))
+
+        # Keep the analytics tables in step, in the same transaction
+        update_aggregates(cursor, captain_id, group_members, date)
@@ -0,0 +1,426 @@
+"""
+Command line interface for the coffee chat matching system.
+
+Subcommands import their dependencies lazily so that quick commands such as
+``history`` or ``--help`` never pay for openpyxl/pandas imports.
+
+Usage:
+    coffee-chats template [--output PATH] [--weekly]
+    coffee-chats match --input PATH [--output PATH] [--seed N] [--solver NAME] [--constraints PATH] [--round-date DATE]
+                       [--time-limit SECONDS] [--max-attempts N] [--checkpoint PATH [--resume]] [--notify]
+                       [--event-log PATH]
+    coffee-chats explain --log PATH --employee ID [--round ID]
+    coffee-chats notify [--db PATH] [--smtp-host HOST] [--smtp-port N] [--sender ADDRESS] [--connections N] [--rate N]
+    coffee-chats season --input PATH --rounds K [--workers N]
+    coffee-chats export --input PATH --groups PATH [--output PATH]
+    coffee-chats ingest --input DIR|GLOB [--output PATH.csv] [--conflicts PATH.csv] [--workers N]
+    coffee-chats history [--db PATH] [--employee ID]
+    coffee-chats analytics [--db PATH] [--output PATH.xlsx|DIR] [--rebuild]
+    coffee-chats bench [--participants N] [--repeat N]
+    coffee-chats simulate [--input PATH | --participants N] [--add REGION=COUNT ...] [--runs N]
+    coffee-chats serve [--host HOST] [--port PORT]
+"""
+
+import argparse
+import sys
+from typing import List, Optional
+
+DEFAULT_DB = "data/captain_history.db"
+
+
+def load_constraints(args):
+    """Build the ConstraintSet for a run from --constraints and the group size options"""
+    from src.constraints import ConstraintSet
+
+    data = {}
+    if getattr(args, "constraints", None):
+        data = ConstraintSet.from_file(args.constraints).to_dict()
+    sizes = data.setdefault("group_size", {})
+    # Explicit command line sizes override the config file
+    if args.min_group_size is not None:
+        sizes["min"] = args.min_group_size
+    if args.max_group_size is not None:
+        sizes["max"] = args.max_group_size
+    return ConstraintSet.from_dict(data)
+
+
+def cmd_template(args) -> int:
+    from src.excel_handler import ExcelTemplateHandler
+    ExcelTemplateHandler().create_template(args.output, weekly=args.weekly)
+    return 0
+
+
+def cmd_match(args) -> int:
+    import json
+    from datetime import date
+    from src.coffee_matching import run_matching_program, groups_to_records
+
+    constraints = load_constraints(args)
+    matcher = run_matching_program(args.input, args.output,
+                                   min_group_size=constraints.min_group_size,
+                                   max_group_size=constraints.max_group_size,
+                                   solver=args.solver, db_path=args.db, seed=args.seed,
+                                   max_meetings_per_hour=args.max_per_hour,
+                                   constraints=constraints,
+                                   round_date=date.fromisoformat(args.round_date) if args.round_date else None,
+                                   time_limit=args.time_limit, max_attempts=args.max_attempts,
+                                   checkpoint_path=args.checkpoint, resume=args.resume,
+                                   notify=args.notify, event_log_path=args.event_log)
+    if matcher is None:
+        return 1
+    if args.groups_json:
+        with open(args.groups_json, "w") as f:
+            json.dump(groups_to_records(matcher.groups), f, indent=2)
+        print(f"Group records written to: {args.groups_json}")
+    return 0
+
+
+def cmd_season(args) -> int:
+    from datetime import date
+    from src.captain_history import CaptainHistoryDB
+    from src.ingest import read_roster
+    from src.season import SeasonPlanner
+
+    participants = read_roster(args.input)
+    if not participants:
+        print("No participants found in Excel file!")
+        return 1
+    planner = SeasonPlanner(participants, args.rounds,
+                            db=CaptainHistoryDB(args.db), seed=args.seed,
+                            attempts=args.attempts, workers=args.workers,
+                            max_meetings_per_hour=args.max_per_hour,
+                            start_date=date.fromisoformat(args.start_date) if args.start_date else None,
+                            interval_days=args.interval_days,
+                            constraints=load_constraints(args))
+    planner.plan()
+    planner.export(args.output)
+    planner.commit()
+    return 0
+
+
+def cmd_export(args) -> int:
+    import json
+    from src.excel_handler import export_match_report
+    from src.coffee_matching import groups_from_records
+    from src.ingest import read_roster
+
+    participants = read_roster(args.input)
+    if not participants:
+        print("No participants found in Excel file!")
+        return 1
+    with open(args.groups) as f:
+        records = json.load(f)
+    export_match_report(groups_from_records(records, participants), args.output, participants=participants)
+    return 0
+
+
+def cmd_ingest(args) -> int:
+    from src.ingest import ingest_rosters, write_conflict_report, write_roster_csv
+
+    participants, conflicts = ingest_rosters(args.input, workers=args.workers)
+    if not participants:
+        return 1
+    write_roster_csv(participants, args.output)
+    if conflicts:
+        write_conflict_report(conflicts, args.conflicts)
+        for c in conflicts[:args.limit]:
+            differing = ", ".join(c['fields']) or "identical"
+            print(f"{c['id']}: kept {c['kept_file']} over {c['dropped_file']} ({c['reason']}; {differing})")
+    return 0
+
+
+def cmd_notify(args) -> int:
+    import os
+    from src.captain_history import CaptainHistoryDB
+    from src.notifications import Outbox, SMTPSettings, send_pending
+
+    outbox = Outbox(CaptainHistoryDB(args.db, persistent=True))
+    if args.retry_failed:
+        print(f"Re-queued {outbox.retry_failed()} failed notifications")
+    settings = SMTPSettings(args.smtp_host, args.smtp_port, args.sender, args.username,
+                            os.environ.get("COFFEE_CHATS_SMTP_PASSWORD"), args.starttls)
+    stats = send_pending(outbox, settings, connections=args.connections, rate=args.rate,
+                         max_retries=args.max_retries, limit=args.limit)
+    counts = outbox.counts()
+    print("Outbox: " + ", ".join(f"{status} {n}" for status, n in sorted(counts.items())))
+    return 1 if stats['failed'] else 0
+
+
+def cmd_explain(args) -> int:
+    from src.event_log import describe, trail
+
+    events = trail(args.log, args.employee, args.round)
+    if not events:
+        print(f"No events for employee {args.employee} in {args.log}")
+        return 1
+    for event in events:
+        print(describe(event, args.employee))
+    return 0
+
+
+def cmd_history(args) -> int:
+    from src.captain_history import CaptainHistoryDB
+
+    db = CaptainHistoryDB(args.db)
+    if args.employee:
+        stats = db.get_captain_stats(args.employee)
+        if stats is None:
+            print(f"No history for employee {args.employee}")
+            return 1
+        print(f"Employee {args.employee}: captain {stats[0]} time(s), last on {stats[1] or 'never'}")
+        return 0
+
+    rows = db.list_employees()
+    print(f"{len(rows)} employees in {args.db}")
+    print(f"{'ID':<10} {'Name':<30} {'Department':<25} {'Captain':>7} {'Meetings':>8}")
+    for employee_id, name, department, captain_count, meetings in rows[:args.limit]:
+        print(f"{employee_id:<10} {name[:30]:<30} {department[:25]:<25} {captain_count:>7} {meetings:>8}")
+    return 0
+
+
+def cmd_analytics(args) -> int:
+    from src.analytics import HistoryAnalytics
+    from src.captain_history import CaptainHistoryDB
+
+    analytics = HistoryAnalytics(CaptainHistoryDB(args.db))
+    if args.rebuild:
+        print(f"Rebuilt summary tables from {analytics.rebuild()} meetings")
+
+    _, rounds = analytics.round_summary()
+    print(f"{'Round':<28} {'Groups':>6} {'People':>6} {'Roster':>6} {'Rate':>6} {'Cross-dept':>10}")
+    for round_date, groups, people, employees, rate, cross in rounds:
+        print(f"{round_date[:28]:<28} {groups:>6} {people:>6} {employees:>6} {rate:>5}% {cross:>10}")
+    _, never = analytics.never_matched()
+    print(f"{len(never)} employee(s) never matched")
+
+    if args.output:
+        for path in analytics.export(args.output):
+            print(f"Wrote {path}")
+    return 0
+
+
+def cmd_bench(args) -> int:
+    import contextlib
+    import io
+    import time
+    from src.coffee_matching import GroupMatcher
+    from src.compatibility import CompatibilityIndex
+    from src.history_store import InMemoryHistory
+    from src.synthetic import generate_participants
+    from src.utils import derive_seed
+
+    constraints = load_constraints(args)
+    participants = generate_participants(args.participants, seed=args.seed)
+    print(f"Benchmarking {args.participants} synthetic participants, solver={args.solver}")
+
+    start = time.perf_counter()
+    index = CompatibilityIndex(participants, constraints.min_overlap_hours)
+    print(f"Compatibility index: {time.perf_counter() - start:.3f}s")
+
+    for run in range(args.repeat):
+        roster = [p.copy() for p in participants]
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            matcher = GroupMatcher(roster, db=InMemoryHistory(), index=index, solver=args.solver,
+                                   seed=derive_seed(args.seed, 'bench', run),
+                                   constraints=constraints)
+            groups = matcher.create_groups()
+        elapsed = time.perf_counter() - start
+        matched = sum(len(g.members) for g in groups)
+        print(f"Run {run + 1}: {elapsed:.3f}s, {len(groups)} groups, "
+              f"{matched}/{len(roster)} matched")
+    return 0
+
+
+def cmd_simulate(args) -> int:
+    import json
+    from src.simulation import build_roster, print_report, simulate
+    from src.synthetic import generate_participants
+
+    if args.input:
+        from src.ingest import read_roster
+        base = read_roster(args.input)
+        if not base:
+            print("No participants found in Excel file!")
+            return 1
+    else:
+        base = generate_participants(args.participants, seed=args.seed)
+
+    if args.scenarios:
+        with open(args.scenarios) as f:
+            scenarios = [(s['name'], s.get('add', {})) for s in json.load(f)]
+    else:
+        additions = {}
+        for item in args.add:
+            name, _, count = item.rpartition('=')
+            if not name or not count.isdigit():
+                print(f"Invalid --add '{item}', expected NAME=COUNT")
+                return 1
+            additions[name] = additions.get(name, 0) + int(count)
+        scenarios = [("baseline", {})] + ([("scenario", additions)] if additions else [])
+
+    constraints = load_constraints(args)
+    reports = {}
+    for name, additions in scenarios:
+        roster = build_roster(base, additions, seed=args.seed)
+        reports[name] = simulate(roster, runs=args.runs, seed=args.seed, workers=args.workers,
+                                 max_meetings_per_hour=args.max_per_hour, constraints=constraints,
+                                 solver=args.solver)
+        print_report(name, reports[name])
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(reports, f, indent=2)
+        print(f"\nReports written to: {args.output}")
+    return 0
+
+
+def cmd_serve(args) -> int:
+    from src.service import run_service
+    run_service(args.host, args.port, args.db)
+    return 0
+
+
+def add_matching_options(parser: argparse.ArgumentParser) -> None:
+    """Options shared by every subcommand that runs the matcher"""
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible runs")
+    # Same names as coffee_matching.SOLVERS, spelled out so the CLI starts without importing the matcher
+    parser.add_argument("--solver", default="random", choices=("random", "classes", "constrained"),
+                        help="seed-selection strategy: random, classes or constrained (default: random)")
+    parser.add_argument("--min-group-size", type=int, default=None, help="smallest group to form (default: 2)")
+    parser.add_argument("--max-group-size", type=int, default=None,
+                        help="largest group to form, up to 6 (default: 3)")
+    parser.add_argument("--constraints", default=None, metavar="PATH",
+                        help="JSON constraint config (department mix, no repeats, fixed/do-not-pair lists)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="coffee-chats", description="Coffee chat matching tools")
+    sub = parser.add_subparsers(dest="command", metavar="command")
+    sub.required = True
+
+    p = sub.add_parser("template", help="create a blank participant template")
+    p.add_argument("--output", default="data/participant_template.xlsx")
+    p.add_argument("--weekly", action="store_true",
+                   help="add an optional day-of-week availability sheet")
+    p.set_defaults(func=cmd_template)
+
+    p = sub.add_parser("match", help="match participants from a roster workbook")
+    p.add_argument("--input", default="data/Coffee_Chats_ParticipantsList.xlsx")
+    p.add_argument("--output", default="data/Coffee_Chat_Matches.xlsx")
+    p.add_argument("--groups-json", default=None, help="also write group records as JSON")
+    p.add_argument("--db", default=DEFAULT_DB)
+    p.add_argument("--max-per-hour", type=int, default=None,
+                   help="most meetings allowed in the same UTC hour")
+    p.add_argument("--round-date", default=None, metavar="YYYY-MM-DD",
+                   help="date of the round, used for daylight saving in IANA timezones (default: today)")
+    p.add_argument("--time-limit", type=float, default=None, metavar="SECONDS",
+                   help="keep trying seeded attempts for this long and export the best (Ctrl-C also stops)")
+    p.add_argument("--max-attempts", type=int, default=None,
+                   help="stop the search after this many attempts in total")
+    p.add_argument("--checkpoint", default=None, metavar="PATH",
+                   help="save the search state and best grouping to this JSON file while searching")
+    p.add_argument("--resume", action="store_true", help="continue the search saved in --checkpoint")
+    p.add_argument("--notify", action="store_true",
+                   help="queue an email per group member in the outbox (send them with 'notify')")
+    p.add_argument("--event-log", default=None, metavar="PATH",
+                   help="append every matching decision to this JSONL file (read it with 'explain')")
+    add_matching_options(p)
+    p.set_defaults(func=cmd_match)
+
+    p = sub.add_parser("season", help="plan several rounds at once with no repeat pairings")
+    p.add_argument("--input", default="data/Coffee_Chats_ParticipantsList.xlsx")
+    p.add_argument("--output", default="data/Coffee_Chat_Season.xlsx")
+    p.add_argument("--db", default=DEFAULT_DB)
+    p.add_argument("--rounds", type=int, default=3)
+    p.add_argument("--attempts", type=int, default=4, help="seeded attempts per round")
+    p.add_argument("--workers", type=int, default=1)
+    p.add_argument("--start-date", default=None, help="first round date (YYYY-MM-DD)")
+    p.add_argument("--interval-days", type=int, default=30)
+    p.add_argument("--max-per-hour", type=int, default=None)
+    add_matching_options(p)
+    p.set_defaults(func=cmd_season)
+
+    p = sub.add_parser("export", help="export saved group records to Excel")
+    p.add_argument("--input", required=True, help="roster workbook the groups were matched from")
+    p.add_argument("--groups", required=True, help="JSON group records from 'match --groups-json'")
+    p.add_argument("--output", default="data/Coffee_Chat_Matches.xlsx")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("ingest", help="merge department roster workbooks/CSVs into one roster")
+    p.add_argument("--input", required=True, help="directory or glob of .xlsx/.csv rosters")
+    p.add_argument("--output", default="data/Merged_Roster.csv", help="merged roster (CSV, template columns)")
+    p.add_argument("--conflicts", default="data/Roster_Conflicts.csv", help="report of dropped duplicate rows")
+    p.add_argument("--workers", type=int, default=None, help="processes used to parse files")
+    p.add_argument("--limit", type=int, default=20, help="conflicts to print")
+    p.set_defaults(func=cmd_ingest)
+
+    p = sub.add_parser("notify", help="send queued group notifications over SMTP")
+    p.add_argument("--db", default=DEFAULT_DB)
+    p.add_argument("--smtp-host", default="localhost")
+    p.add_argument("--smtp-port", type=int, default=25)
+    p.add_argument("--sender", default="coffee-chats@localhost", help="From address")
+    p.add_argument("--username", default=None,
+                   help="SMTP login; the password is read from COFFEE_CHATS_SMTP_PASSWORD")
+    p.add_argument("--starttls", action="store_true")
+    p.add_argument("--connections", type=int, default=4, help="persistent SMTP connections")
+    p.add_argument("--rate", type=float, default=None, help="most messages per second")
+    p.add_argument("--max-retries", type=int, default=3)
+    p.add_argument("--limit", type=int, default=None, help="send at most this many messages")
+    p.add_argument("--retry-failed", action="store_true", help="re-queue messages that failed before")
+    p.set_defaults(func=cmd_notify)
+
+    p = sub.add_parser("explain", help="show how one participant was grouped, or why they were not")
+    p.add_argument("--log", required=True, help="event log written by match --event-log")
+    p.add_argument("--employee", required=True, help="employee ID to follow")
+    p.add_argument("--round", default=None, help="round ID (defaults to their latest round)")
+    p.set_defaults(func=cmd_explain)
+
+    p = sub.add_parser("history", help="show captain history")
+    p.add_argument("--db", default=DEFAULT_DB)
+    p.add_argument("--employee", default=None, help="show a single employee ID")
+    p.add_argument("--limit", type=int, default=50)
+    p.set_defaults(func=cmd_history)
+
+    p = sub.add_parser("analytics", help="show and export participation summaries")
+    p.add_argument("--db", default=DEFAULT_DB)
+    p.add_argument("--output", default=None, help=".xlsx workbook or directory for CSV files")
+    p.add_argument("--rebuild", action="store_true", help="recompute summaries from all meetings")
+    p.set_defaults(func=cmd_analytics)
+
+    p = sub.add_parser("bench", help="time matching on a synthetic roster")
+    p.add_argument("--participants", type=int, default=1000)
+    p.add_argument("--repeat", type=int, default=3)
+    add_matching_options(p)
+    p.set_defaults(func=cmd_bench, seed=0)
+
+    p = sub.add_parser("simulate", help="what-if capacity planning on synthetic additions")
+    p.add_argument("--input", default=None, help="base roster workbook (default: synthetic)")
+    p.add_argument("--participants", type=int, default=1000, help="synthetic base roster size")
+    p.add_argument("--add", action="append", default=[], metavar="NAME=COUNT",
+                   help="add COUNT synthetic people in a region (APAC, EMEA, AMER) or country")
+    p.add_argument("--scenarios", default=None,
+                   help='JSON list of scenarios: [{"name": "...", "add": {"APAC": 3000}}]')
+    p.add_argument("--runs", type=int, default=20, help="seeded matching rounds per scenario")
+    p.add_argument("--workers", type=int, default=1)
+    p.add_argument("--max-per-hour", type=int, default=None)
+    p.add_argument("--output", default=None, help="write the reports as JSON")
+    add_matching_options(p)
+    p.set_defaults(func=cmd_simulate, seed=0)
+
+    p = sub.add_parser("serve", help="run the HTTP/JSON matching service")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8080)
+    p.add_argument("--db", default=DEFAULT_DB)
+    p.set_defaults(func=cmd_serve)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
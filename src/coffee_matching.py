@@ -2,105 +2,355 @@
 Main script for the coffee chat matching system.
 Orchestrates the entire matching process using the modular components.
 """
-from typing import List, Dict, Set
+from datetime import date
+from typing import List, Dict, Set, Optional
 import random
+import uuid
 
 # Change relative imports (.) to absolute imports (src.)
-from src.models import CoffeeGroup, REGIONS
-from src.utils import convert_timezone_to_float
-from src.excel_handler import quick_read_participants as read_participants_from_excel, quick_export_matches as export_matches_to_excel
+from src.models import CoffeeGroup, get_region, is_weekly, preferred_mask, refresh_offsets, utc_mask
+from src.utils import (AVAILABLE, WEEKDAYS, at_round_date, convert_timezone_to_float, format_meeting_time,
+                       parse_meeting_time, round_date_scope)
 from src.captain_history import CaptainHistoryDB
+from src.history_store import HistoryStore, InMemoryHistory
+from src.compatibility import CAUSES, CompatibilityIndex, DegreeQueue, unmatched_cause
+from src.constraints import ConstraintSet
+from src.equivalence import AvailabilityClasses
+from src.event_log import EventLog, SearchTrace
+from src.rescue import RescuePass
+from src.scheduling import assign_meeting_times
+from src.tenure import NEWCOMER
+
+# Seed-selection strategies understood by GroupMatcher:
+#   random   - seed each group with a random remaining participant
+#   classes  - form groups on availability classes (see src/equivalence.py);
+#              falls back to 'random' when constraint rules are set, since
+#              rules tell individuals apart
+#   constrained - always seed the remaining participant with the fewest
+#              compatible partners left (see DegreeQueue)
+SOLVERS = ('random', 'classes', 'constrained')
+
+def load_captain_counts(participants: List[dict], db: HistoryStore) -> None:
+    """Refresh each participant's captain_count from history and register newcomers"""
+    for participant in participants:
+        stats = db.get_captain_stats(participant['id'])
+        if stats:
+            participant['captain_count'] = stats[0]
+        # Register new participants in the database
+        db.update_or_create_employee(participant)
 
 class GroupMatcher:
     """Main class for matching participants into compatible coffee chat groups"""
     
-    def __init__(self, participants: List[dict], min_group_size: int = 3, max_group_size: int = 3):
+    def __init__(self, participants: List[dict], min_group_size: int = 2, max_group_size: int = 3,
+                 db: Optional[HistoryStore] = None, index: Optional[CompatibilityIndex] = None,
+                 solver: str = 'random', seed: Optional[int] = None,
+                 rng: Optional[random.Random] = None,
+                 max_meetings_per_hour: Optional[int] = None,
+                 rescue: bool = True, rescue_time_budget: float = 1.0,
+                 constraints: Optional[ConstraintSet] = None,
+                 round_date: Optional[date] = None,
+                 event_log: Optional[EventLog] = None):
+        if solver not in SOLVERS:
+            raise ValueError(f"Unknown solver '{solver}', expected one of: {', '.join(SOLVERS)}")
+        # An explicit constraint set takes precedence over the group size arguments
+        if constraints is None:
+            constraints = ConstraintSet(min_group_size=min_group_size, max_group_size=max_group_size)
+        self.constraints = constraints
         self.participants = participants
-        self.min_group_size = min_group_size
-        self.max_group_size = max_group_size
+        self.solver = solver
+        # All randomness flows through this generator so a seed reproduces a run
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.min_group_size = constraints.min_group_size
+        self.max_group_size = constraints.max_group_size
+        self.max_meetings_per_hour = max_meetings_per_hour
+        self.rescue = rescue
+        self.rescue_time_budget = rescue_time_budget
         self.groups = []
+        self.schedule = {}
+        self.rescue_report = []
         self.used_participants = set()
-        self.db = CaptainHistoryDB()  # Initialize database connection
+        # Decisions are reported here when set (see src/event_log.py)
+        self.event_log = event_log
+        # Identifies this round in the history, so recording it twice counts it once
+        self.round_id = uuid.uuid4().hex
+        self.db = db if db is not None else CaptainHistoryDB()  # Initialize database connection
         
         # Update captain counts from database
-        for participant in self.participants:
-            stats = self.db.get_captain_stats(participant['id'])
-            if stats:
-                participant['captain_count'] = stats[0]
-            # Register new participants in the database
-            self.db.update_or_create_employee(participant)
+        load_captain_counts(self.participants, self.db)
+
+        # IANA zones resolve to their offset on the day the round takes place;
+        # the date is only in effect while this matcher works (see at_round_date)
+        self.round_date = round_date
+        with round_date_scope(round_date):
+            self._build_index(index)
+
+    def _build_index(self, index: Optional[CompatibilityIndex]) -> None:
+        """Refresh offsets for the round date and compile the rules against the index"""
+        participants, constraints, solver = self.participants, self.constraints, self.solver
+        if self.round_date is not None:
+            refreshed = refresh_offsets(participants)
+            if refreshed:
+                print(f"Updated timezone offsets of {refreshed} participants for {self.round_date.isoformat()}")
+
+        # Pairwise compatibility can be shared between runs over the same roster;
+        # compiling the rules prunes forbidden pairs from it once, up front
+        if index is None:
+            if solver == 'classes':
+                # Expanding the class matrix avoids a popcount per pair of people
+                weekly = any(is_weekly(p) for p in participants)
+                masks = [utc_mask(p, weekly) for p in participants]
+                classes = AvailabilityClasses(masks, constraints.min_overlap_hours)
+                index = CompatibilityIndex.from_masks(masks, classes.neighbors(),
+                                                      constraints.min_overlap_hours, participants,
+                                                      [preferred_mask(p, weekly) for p in participants])
+            else:
+                index = CompatibilityIndex(participants, constraints.min_overlap_hours)
+        self.rules = constraints.compile(index, self.db)
+        self.index = self.rules.index
+        if self.rules.tenure is not None:
+            print(f"Teamed {self.rules.mentored()} of {self.rules.tenure.role.count(NEWCOMER)} "
+                  f"newcomers with a senior")
 
     def get_member_region(self, participant: dict) -> str:
         """Determine which region a participant belongs to based on timezone"""
-        try:
-            timezone = convert_timezone_to_float(participant['timezone'])
-            for region_name, region in REGIONS.items():
-                if region.start_utc <= timezone <= region.end_utc:
-                    return region_name
-            return 'EMEA'  # Default to EMEA if no match
-        except ValueError:
-            return 'EMEA'
+        return get_region(participant['timezone'])
 
     def find_compatible_group(self, seed: dict, candidates: List[dict], size: int) -> List[dict]:
         """Find compatible participants to form a group with the seed participant"""
-        compatible = []
-        for candidate in candidates:
-            if candidate == seed or candidate['id'] in self.used_participants:
+        position = self.index.position
+        allowed = {position[c['id']] for c in candidates
+                   if c['id'] not in self.used_participants}
+        found = self.index.find_group(position[seed['id']], size, allowed, rng=self.rng,
+                                      constraints=self.rules)
+        if found is None:
+            return []
+        return [self.participants[i] for i in found]
+
+    def penalty(self, groups: List[CoffeeGroup]) -> int:
+        """Total soft-rule penalty of groups (0 when there are no soft rules)"""
+        if not self.rules.has_soft_rules:
+            return 0
+        position = self.index.position
+        return sum(self.rules.penalty([position[m['id']] for m in g.members]) for g in groups)
+
+    def _log(self, event: str, **fields) -> None:
+        self.event_log.emit(event, round=self.round_id, **fields)
+
+    def log_round(self) -> None:
+        """Log the start of this round (solver, roster size, group sizes)"""
+        self._log('round', solver=self.solver, participants=len(self.participants),
+                  min_group_size=self.min_group_size, max_group_size=self.max_group_size)
+
+    def log_group(self, group: CoffeeGroup, source: str, **seed) -> None:
+        """Log a committed group, formed by `source` (seed fields from the pick that led to it)"""
+        self._log('group', members=[m['id'] for m in group.members], source=source,
+                  common_hours=len(group.common_hours), **seed)
+
+    def log_outcome(self, groups: List[CoffeeGroup], counted: bool = True) -> None:
+        """
+        Log captain choices and the participants left out
+
+        counted tells whether captain counts already include this round's turn.
+        """
+        for group in groups:
+            if not group.captain:
                 continue
-            test_group = CoffeeGroup([seed, candidate])
-            if test_group.is_valid_group():
-                compatible.append(candidate)
-                
-        if len(compatible) >= size - 1:
-            selected = random.sample(compatible, size - 1)
-            group = CoffeeGroup([seed] + selected)
-            if group.is_valid_group():
-                return [seed] + selected
-        return []
+            captain = group.captain['id']
+            # Counts before this round's turn, which assign_captain has already added
+            counts = {m['id']: m['captain_count'] - (counted and m['id'] == captain) for m in group.members}
+            self._log('captain', captain=captain, captain_counts=counts,
+                      meeting_time=group.meeting_time_label)
+        matched = {m['id'] for g in groups for m in g.members}
+        for i, p in enumerate(self.participants):
+            if p['id'] not in matched:
+                self._log('unmatched', id=p['id'], reason=CAUSES[unmatched_cause(self.index, i)])
 
+    def _drop_reason(self, seed: int, remaining: Set[int], found: Optional[List[int]]) -> str:
+        """Why no group could be formed around a seed"""
+        if found:
+            return "the group found shares too few hours"
+        if not self.index.neighbors[seed]:
+            return "nobody else shares enough hours"
+        if not any(j in remaining for j in self.index.neighbors[seed]):
+            return "every compatible partner is already in a group"
+        if self.constraints.rules:
+            return "no group of compatible partners satisfies the constraint rules"
+        return "no large enough set of compatible partners is free"
+
+    @at_round_date
     def create_groups(self) -> List[CoffeeGroup]:
         """Create groups of participants with flexible group sizes"""
+        if self.event_log is not None:
+            self.log_round()
+        if self.solver == 'classes' and not self.constraints.rules:
+            formed_groups = self._form_class_groups()
+        else:
+            formed_groups = self._form_seeded_groups()
+        
+        if self.rescue:
+            formed_groups = self.rescue_unmatched(formed_groups)
+        if self.rules.has_soft_rules:
+            print(f"Soft-rule penalty of this round: {self.penalty(formed_groups)}")
+        
+        # Pick meeting hours for all groups at once, then persist them
+        self.schedule = assign_meeting_times(formed_groups, self.max_meetings_per_hour)
+        if self.event_log is not None:
+            self.log_outcome(formed_groups)
+        self.record_groups(formed_groups)
+        self.groups = formed_groups
+        return formed_groups
+
+    def _form_class_groups(self) -> List[CoffeeGroup]:
+        """Form groups on availability classes, then turn them into CoffeeGroups"""
+        position = self.index.position
+        positions = [position[p['id']] for p in self.participants
+                     if p['id'] not in self.used_participants]
+        classes = AvailabilityClasses(self.index.masks, self.index.min_overlap_hours, positions)
+        found_groups, leftover = classes.form_groups(self.rng, self.min_group_size, self.max_group_size)
+        print(f"{len(positions)} participants fall into {len(classes)} availability classes")
+
+        formed_groups = []
+        for found in found_groups:
+            group = CoffeeGroup([self.participants[i] for i in found],
+                                self.constraints.min_overlap_hours, rng=self.rng,
+                                weekly=self.index.weekly)
+            if group.is_valid_group():
+                formed_groups.append(group)
+                self.used_participants.update(self.participants[i]['id'] for i in found)
+                if self.event_log is not None:
+                    self.log_group(group, 'classes')
+        print(f"Formed {len(formed_groups)} groups, {len(leftover)} participants left over")
+        return formed_groups
+
+    def _form_seeded_groups(self) -> List[CoffeeGroup]:
+        """Grow one group at a time around a seed participant"""
+        position = self.index.position
         available = [p for p in self.participants if p['id'] not in self.used_participants]
+        # Positions still free, and where each one sits in `available`, so
+        # taking a participant out is O(1) rather than a list scan
+        remaining = {position[p['id']] for p in available}
+        slot = {position[p['id']]: k for k, p in enumerate(available)}
         formed_groups = []
+        # Hard-to-place people go first, before their few partners are taken
+        queue = DegreeQueue(self.index.neighbors, remaining, self.rng) if self.solver == 'constrained' else None
+        log = self.event_log is not None
+        trace = None
+
+        def take(i: int) -> None:
+            k = slot.pop(i)
+            last = available.pop()
+            if k < len(available):
+                available[k] = last
+                slot[position[last['id']]] = k
+            remaining.discard(i)
+            if queue is not None:
+                queue.remove(i)
+            self.used_participants.add(self.participants[i]['id'])
         
-        while len(available) >= 2:
-            seed = random.choice(available)
+        while len(available) >= self.min_group_size:
+            if queue is not None:
+                seed_position = queue.peek()
+            else:
+                seed_position = position[self.rng.choice(available)['id']]
+            if log:
+                trace = SearchTrace()
             
-            # First try to form a group of 3
-            if len(available) >= 3:
-                group_members = self.find_compatible_group(seed, available, 3)
-                if not group_members:  # If can't form trio, try pair
-                    group_members = self.find_compatible_group(seed, available, 2)
-            else:  # Only enough people left for a pair
-                group_members = self.find_compatible_group(seed, available, 2)
+            # Try the largest group first, falling back to smaller ones
+            found = None
+            for size in range(min(self.max_group_size, len(available)), self.min_group_size - 1, -1):
+                found = self.index.find_group(seed_position, size, remaining, rng=self.rng,
+                                              constraints=self.rules, trace=trace)
+                if found:
+                    break
+            if log:
+                # The seed pick is logged with the group (or drop) it leads to
+                seed = {'id': self.participants[seed_position]['id'], 'candidates': trace.candidates,
+                        'filtered': trace.filtered, 'remaining': len(available)}
+                for j, reason in trace.rejected.items():
+                    if not found or j not in found:
+                        self._log('reject', id=seed['id'], candidate=self.participants[j]['id'], reason=reason)
             
-            if group_members:
-                group = CoffeeGroup(group_members)
-                if group.is_valid_group():
-                    formed_groups.append(group)
-                    # Update database with new group
-                    if group.captain:
-                        member_ids = [m['id'] for m in group.members]
-                        self.db.record_meeting(
-                            group.captain['id'],
-                            member_ids,
-                            f"{group.optimal_meeting_time:02d}:00 UTC"
-                        )
-                    for member in group_members:
-                        self.used_participants.add(member['id'])
-                        available.remove(member)
-                else:
-                    available.remove(seed)
-                    self.used_participants.add(seed['id'])
+            group = None
+            if found:
+                group = CoffeeGroup([self.participants[i] for i in found],
+                                    self.constraints.min_overlap_hours, rng=self.rng,
+                                    weekly=self.index.weekly)
+            if group is not None and group.is_valid_group():
+                formed_groups.append(group)
+                for i in found:
+                    take(i)
+                if log:
+                    if trace.too_few_hours:
+                        seed['too_few_hours'] = [self.participants[j]['id'] for j in trace.too_few_hours]
+                    self.log_group(group, 'seeded', **seed)
             else:
-                available.remove(seed)
-                self.used_participants.add(seed['id'])
+                if log:
+                    self._log('dropped', reason=self._drop_reason(seed_position, remaining, found), **seed)
+                take(seed_position)
                 
             print(f"Remaining participants: {len(available)}")
         
-        self.groups = formed_groups
         return formed_groups
 
+    def rescue_unmatched(self, groups: List[CoffeeGroup]) -> List[CoffeeGroup]:
+        """Run the rescue pass over unmatched participants and rebuild changed groups"""
+        position = self.index.position
+        member_positions = [[position[m['id']] for m in g.members] for g in groups]
+        matched = {i for members in member_positions for i in members}
+        unmatched = [i for i in range(len(self.participants)) if i not in matched]
+        if not unmatched:
+            self.rescue_report = []
+            return groups
+
+        rescue = RescuePass(self.index, self.max_group_size, time_budget=self.rescue_time_budget,
+                            constraints=self.rules, min_group_size=self.min_group_size)
+        self.rescue_report = rescue.run(member_positions, unmatched)
+        if self.event_log is not None:
+            for entry in self.rescue_report:
+                self._log('rescue', id=entry['id'], action=entry['action'], group=entry['group'],
+                          displaced=entry['displaced'], overlap_hours=entry['overlap_hours'],
+                          reason=entry['reason'])
+
+        rebuilt = list(groups)
+        for gi in sorted(rescue.changed):
+            members = [self.participants[i] for i in member_positions[gi]]
+            old = groups[gi] if gi < len(groups) else None
+            captain = None
+            if old is not None and old.captain is not None:
+                if any(m['id'] == old.captain['id'] for m in members):
+                    captain = old.captain
+                else:
+                    old.captain['captain_count'] -= 1  # displaced captain, undo their turn
+            min_overlap = rescue.relaxed_overlap_hours if gi in rescue.relaxed else self.index.min_overlap_hours
+            group = CoffeeGroup(members, min_overlap_hours=min_overlap, rng=self.rng, captain=captain,
+                                weekly=self.index.weekly)
+            if gi < len(rebuilt):
+                rebuilt[gi] = group
+            else:
+                rebuilt.append(group)
+            if self.event_log is not None:
+                self.log_group(group, 'rescue')
+
+        rescued = sum(1 for entry in self.rescue_report if entry['action'] != 'unresolved')
+        print(f"Rescue pass placed {rescued} of {len(unmatched)} unmatched participants")
+        return rebuilt
+
+    def record_groups(self, groups: List[CoffeeGroup]) -> int:
+        """
+        Write captains and meetings for finished groups to the history database
+
+        Returns:
+            int: 1 if the round was written, 0 if its round ID was already recorded
+        """
+        written = self.db.record_meetings([
+            (group.captain['id'], [m['id'] for m in group.members], group.meeting_time_label)
+            for group in groups if group.captain
+        ], round_id=self.round_id)
+        if not written:
+            print(f"Round {self.round_id} is already in captain history; nothing was recorded")
+        return written
+
     def print_group_summary(self):
         """Print summary of all formed groups"""
         print(f"\nCreated {len(self.groups)} groups:")
@@ -111,25 +361,26 @@ class GroupMatcher:
                 other_members = [m for m in group.members if m != group.captain]
                 members_str = ", ".join([f"{m['name']} ({m['timezone']})" for m in other_members])
                 print(f"Members: {members_str}")
-                print(f"Meeting time (UTC): {group.optimal_meeting_time}:00")
+                print(f"Meeting time: {group.meeting_time_label}")
 
-    def get_unmatched_participants(self) -> List[dict]:
+    def get_unmatched_participants(self, verbose: bool = True) -> List[dict]:
         """Return list of participants who couldn't be matched into groups"""
         matched = {member['id'] for group in self.groups for member in group.members}
         unmatched = [p for p in self.participants if p['id'] not in matched]
-        if unmatched:
+        if unmatched and verbose:
             print("\nUnmatched participants:")
             for p in unmatched:
                 print(f"- {p['name']} ({p['timezone']})")
         return unmatched
     
+    @at_round_date
     def analyze_unmatched_participants(self) -> List[Dict]:
         """Analyze why participants couldn't be matched and provide recommendations"""
-        unmatched = self.get_unmatched_participants()
+        unmatched = self.get_unmatched_participants(verbose=False)
         analysis = []
         
         for participant in unmatched:
-            available_hours = sum(1 for status in participant['availability'].values() if status == 'Y')
+            available_hours = sum(1 for status in participant['availability'].values() if status in AVAILABLE)
             
             issue = {
                 'name': participant['name'],
@@ -150,36 +401,189 @@ class GroupMatcher:
         
         return analysis
 
+def groups_to_records(groups: List[CoffeeGroup]) -> List[Dict]:
+    """Convert formed groups into plain JSON-serialisable records"""
+    records = []
+    for idx, group in enumerate(groups, 1):
+        if not group.captain:
+            continue
+        records.append({
+            'group': idx,
+            'captain': group.captain['id'],
+            'members': [m['id'] for m in group.members],
+            'meeting_time': group.meeting_time_label,
+            'common_hours': sorted(group.common_hours)
+        })
+    return records
+
+def match_with_seed(participants: List[dict], seed: int, min_group_size: int = 2,
+                    max_group_size: int = 3, solver: str = 'random',
+                    max_meetings_per_hour: Optional[int] = None) -> List[Dict]:
+    """
+    Run one isolated, seeded matching round and return its group records
+    
+    The roster is copied and captain history lives in memory, so the result
+    depends only on the inputs and the seed and nothing touches the disk.
+    """
+    import copy
+
+    return _match_roster(copy.deepcopy(participants), seed, min_group_size, max_group_size,
+                         solver, max_meetings_per_hour)
+
+def _match_roster(roster: List[dict], seed: int, min_group_size: int, max_group_size: int,
+                  solver: str, max_meetings_per_hour: Optional[int]) -> List[Dict]:
+    """match_with_seed on a roster the round may modify"""
+    import contextlib
+    import io
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        matcher = GroupMatcher(roster, min_group_size, max_group_size,
+                               db=InMemoryHistory(), solver=solver, seed=seed,
+                               max_meetings_per_hour=max_meetings_per_hour)
+        groups = matcher.create_groups()
+    return groups_to_records(groups)
+
+# Shared roster a seeded-run worker attached to, set once per worker
+_SEEDED_ROSTER = None
+
+def _attach_seeded_roster(handle) -> None:
+    global _SEEDED_ROSTER
+    from src.shared_roster import SharedRoster
+    _SEEDED_ROSTER = SharedRoster.attach_worker(handle)
+
+def _match_shared(seed: int, min_group_size: int = 2, max_group_size: int = 3,
+                  solver: str = 'random', max_meetings_per_hour: Optional[int] = None) -> List[Dict]:
+    """match_with_seed in a worker, on fresh records rebuilt from the shared roster"""
+    return _match_roster(_SEEDED_ROSTER.participants(), seed, min_group_size, max_group_size,
+                         solver, max_meetings_per_hour)
+
+def run_seeded_matches(participants: List[dict], seeds: List[int], workers: int = 1,
+                       **options) -> List[List[Dict]]:
+    """
+    Run one isolated matching round per seed, optionally across worker processes
+    
+    Results are returned in seed order and are identical for any worker count.
+    Workers read the roster from shared memory (see src/shared_roster.py), so
+    only seeds and options are pickled per task.
+    """
+    if workers <= 1:
+        return [match_with_seed(participants, seed, **options) for seed in seeds]
+
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+    from src.shared_roster import SharedRoster
+    with SharedRoster.create(participants) as shared:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_seeded_roster,
+                                 initargs=(shared.handle,)) as pool:
+            return list(pool.map(partial(_match_shared, **options), seeds))
+
+def groups_from_records(records: List[Dict], participants: List[dict]) -> List[CoffeeGroup]:
+    """Rebuild CoffeeGroup objects from records produced by groups_to_records"""
+    by_id = {p['id']: p for p in participants}
+    groups = []
+    for record in records:
+        members = [by_id[member_id] for member_id in record['members'] if member_id in by_id]
+        if record['captain'] not in by_id or len(members) < 2:
+            print(f"Skipping group {record.get('group')}: members missing from roster")
+            continue
+        # Keep the recorded decisions rather than re-deriving them
+        weekly = record['meeting_time'].split()[0] in WEEKDAYS
+        group = CoffeeGroup(members, captain=by_id[record['captain']], weekly=weekly)
+        group.captain = by_id[record['captain']]
+        group.optimal_meeting_time = parse_meeting_time(record['meeting_time'])
+        groups.append(group)
+    return groups
+
 def run_matching_program(input_path: str = "data/Coffee_Chats_ParticipantsList.xlsx",
-                        output_path: str = "data/Coffee_Chat_Matches_session3.xlsx"):
-    """Main function to run the coffee chat matching program"""
+                        output_path: str = "data/Coffee_Chat_Matches.xlsx",
+                        min_group_size: int = 2, max_group_size: int = 3,
+                        solver: str = 'random', db_path: str = "data/captain_history.db",
+                        seed: Optional[int] = None, max_meetings_per_hour: Optional[int] = None,
+                        constraints: Optional[ConstraintSet] = None,
+                        round_date: Optional[date] = None,
+                        time_limit: Optional[float] = None, max_attempts: Optional[int] = None,
+                        checkpoint_path: Optional[str] = None, resume: bool = False,
+                        notify: bool = False, event_log_path: Optional[str] = None):
+    """
+    Main function to run the coffee chat matching program
+
+    With a time limit, an attempt budget or a checkpoint file the round is
+    searched by AnytimeMatcher (see src/anytime.py): the best of many seeded
+    attempts is exported, also after Ctrl-C, and only then recorded.
+
+    With notify, a message per group member is queued in the outbox once the
+    round is recorded; `coffee-chats notify` sends them (see src/notifications.py).
+
+    With event_log_path, every matching decision is appended to that JSONL
+    file; `coffee-chats explain` reads one participant's trail back.
+    """
+    # Excel support (openpyxl) is only imported when a run actually needs it
+    from src.excel_handler import export_match_report
+    from src.ingest import read_roster
+
     print("Starting coffee chat matching program...")
+    # IANA zones resolve on the round date for the whole run, then the previous date is back
+    with round_date_scope(round_date):
+        # Read participants
+        participants = read_roster(input_path)
+        if not participants:
+            print("No participants found in Excel file!")
+            return None
     
-    # Read participants
-    participants = read_participants_from_excel(input_path)
-    if not participants:
-        print("No participants found in Excel file!")
-        return
-    
-    # Create and run matcher
-    matcher = GroupMatcher(participants)
-    groups = matcher.create_groups()
-    matcher.print_group_summary()
+        # Create and run matcher
+        event_log = EventLog(event_log_path) if event_log_path else None
+        try:
+            if time_limit is not None or max_attempts is not None or checkpoint_path:
+                from src.anytime import AnytimeMatcher
+                search = AnytimeMatcher(participants, min_group_size, max_group_size,
+                                        db=CaptainHistoryDB(db_path), solver=solver, seed=seed,
+                                        max_meetings_per_hour=max_meetings_per_hour, constraints=constraints,
+                                        round_date=round_date, time_limit=time_limit,
+                                        max_attempts=max_attempts, checkpoint_path=checkpoint_path,
+                                        resume=resume, event_log=event_log)
+                search.run()
+                matcher = search.finalize()
+                groups = matcher.groups
+            else:
+                matcher = GroupMatcher(participants, min_group_size, max_group_size,
+                                       db=CaptainHistoryDB(db_path), solver=solver, seed=seed,
+                                       max_meetings_per_hour=max_meetings_per_hour, constraints=constraints,
+                                       round_date=round_date, event_log=event_log)
+                groups = matcher.create_groups()
+        finally:
+            # Whatever was decided before a failure is still worth keeping
+            if event_log is not None:
+                event_log.close()
+        if event_log is not None:
+            print(f"Logged {event_log.count} matching events to {event_log_path}")
+        matcher.print_group_summary()
+        if notify:
+            from src.notifications import Outbox
+            Outbox(matcher.db).enqueue_groups(groups, matcher.round_id)
+        if matcher.schedule:
+            # Week slots when any group is weekly, as in assign_meeting_times
+            weekly = any(g.weekly for g in groups)
+            per_hour = ", ".join(f"{format_meeting_time(h, weekly, zone=False)}={n}"
+                                 for h, n in matcher.schedule['per_hour'].items())
+            print(f"\nMeetings per UTC hour: {per_hour}")
+            print(f"Groups meeting at a regionally preferred hour: {matcher.schedule['preferred']}")
     
-    # Export results
-    export_matches_to_excel(groups, output_path)
-    print(f"\nExport complete! Check {output_path} for the full schedule.")
+        # Analyze unmatched participants
+        unmatched_analysis = matcher.analyze_unmatched_participants()
+
+        # Export results
+        export_match_report(groups, output_path, participants=participants, unmatched=unmatched_analysis)
+        print(f"\nExport complete! Check {output_path} for the full schedule.")
     
-    # Analyze unmatched participants
-    unmatched_analysis = matcher.analyze_unmatched_participants()
-    if unmatched_analysis:
-        print("\nAnalysis of unmatched participants:")
-        for analysis in unmatched_analysis:
-            print(f"\n{analysis['name']} ({analysis['timezone']}):")
-            print(f"Available hours: {analysis['available_hours']}")
-            print(f"Recommendation: {analysis['recommendation']}")
+        if unmatched_analysis:
+            print("\nAnalysis of unmatched participants:")
+            for analysis in unmatched_analysis:
+                print(f"\n{analysis['name']} ({analysis['timezone']}):")
+                print(f"Available hours: {analysis['available_hours']}")
+                print(f"Recommendation: {analysis['recommendation']}")
+        return matcher
 
 if __name__ == "__main__":
     import sys
-    print(f"Command line arguments: {sys.argv}")
-    run_matching_program()
+    from src.cli import main
+    main(["match"] + sys.argv[1:])
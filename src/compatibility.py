@@ -0,0 +1,345 @@
+"""
+Compatibility index for the coffee chat matching system.
+Precomputes each participant's UTC availability mask and the set of
+compatible partners so matching never has to rebuild CoffeeGroup objects
+just to test a pair.
+
+When anyone in the roster has a weekly grid, every mask is a 168-slot week
+mask and overlap is counted per day (utils.day_hours): two people are
+compatible if they share min_overlap_hours on at least one day.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from src.models import is_weekly, preferred_mask, utc_mask
+from src.utils import DAY_MASK, WEEK_MASK, day_hours, popcount
+
+# Why an unmatched participant was left out (see unmatched_cause)
+CAUSES = {
+    'few_hours': "fewer available hours than the minimum overlap",
+    'no_partner': "nobody else shares enough hours",
+    'partners_taken': "every compatible partner was already in a full group",
+}
+
+
+class CompatibilityIndex:
+    """Pairwise compatibility graph over a roster, keyed by list position"""
+
+    def __init__(self, participants: List[dict], min_overlap_hours: int = 2):
+        """
+        Build the index for a roster.
+
+        Args:
+            participants: List of participant dictionaries
+            min_overlap_hours: Minimum shared UTC hours for two people to be compatible
+        """
+        self.participants = participants
+        self.min_overlap_hours = min_overlap_hours
+        self.position: Dict[str, int] = {p['id']: i for i, p in enumerate(participants)}
+        self._set_weekly(any(is_weekly(p) for p in participants))
+        self.masks: List[int] = [utc_mask(p, self.weekly) for p in participants]
+        self._set_preferred([preferred_mask(p, self.weekly) for p in participants])
+        self.neighbors: List[Set[int]] = self._build_neighbors()
+
+    def _set_weekly(self, weekly: bool) -> None:
+        self.weekly = weekly
+        # Shared hours of a mask; per day for week masks, a plain popcount otherwise
+        self.count_hours = day_hours if weekly else popcount
+        self.full_mask = WEEK_MASK if weekly else DAY_MASK
+
+    def _set_preferred(self, preferred: Optional[List[int]]) -> None:
+        # Hours marked 'P', used to order candidates by shared preferred hours
+        self.preferred = preferred if preferred is not None else [0] * len(self.masks)
+        self.has_preferences = any(self.preferred)
+
+    def _build_neighbors(self) -> List[Set[int]]:
+        """Compute the compatible partners of every participant"""
+        masks = self.masks
+        count_hours = self.count_hours
+        neighbors = [set() for _ in masks]
+        for i, mask_i in enumerate(masks):
+            for j in range(i + 1, len(masks)):
+                if count_hours(mask_i & masks[j]) >= self.min_overlap_hours:
+                    neighbors[i].add(j)
+                    neighbors[j].add(i)
+        return neighbors
+
+    @classmethod
+    def from_masks(cls, masks: List[int], neighbors: List[Set[int]],
+                   min_overlap_hours: int = 2,
+                   participants: Optional[List[dict]] = None,
+                   preferred: Optional[List[int]] = None) -> 'CompatibilityIndex':
+        """
+        Build an index from precomputed masks and neighbour sets
+
+        Used by worker processes that only see a shared-memory roster (no
+        participants: callers work purely on positions), and with participants
+        when the neighbour sets were computed in bulk, e.g. by SharedRoster.
+        """
+        index = cls.__new__(cls)
+        index.participants = participants
+        index.min_overlap_hours = min_overlap_hours
+        index.position = {p['id']: i for i, p in enumerate(participants or [])}
+        index.masks = masks
+        index.neighbors = neighbors
+        index._set_weekly(any(m > DAY_MASK for m in masks))
+        index._set_preferred(preferred)
+        return index
+
+    def without_pairs(self, pairs: Iterable[Tuple[int, int]]) -> 'CompatibilityIndex':
+        """
+        Return a view of this index with some pairs marked incompatible
+
+        Masks and positions are shared; only the neighbour sets that change
+        are copied, so excluding last round's pairs is cheap.
+        """
+        view = CompatibilityIndex.__new__(CompatibilityIndex)
+        view.participants = self.participants
+        view.min_overlap_hours = self.min_overlap_hours
+        view.position = self.position
+        view.masks = self.masks
+        view._set_weekly(self.weekly)
+        view.preferred = self.preferred
+        view.has_preferences = self.has_preferences
+        view.neighbors = list(self.neighbors)
+        copied = set()
+        for i, j in pairs:
+            for a, b in ((i, j), (j, i)):
+                if a not in copied:
+                    view.neighbors[a] = set(view.neighbors[a])
+                    copied.add(a)
+                view.neighbors[a].discard(b)
+        return view
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+    def is_compatible(self, i: int, j: int) -> bool:
+        """Check whether two participants share enough hours"""
+        return j in self.neighbors[i]
+
+    def common_mask(self, indices: List[int]) -> int:
+        """Return the UTC hours shared by every participant in indices"""
+        mask = self.full_mask
+        for i in indices:
+            mask &= self.masks[i]
+        return mask
+
+    def is_valid_group(self, indices: List[int]) -> bool:
+        """Check whether a set of participants has enough shared hours"""
+        return self.count_hours(self.common_mask(indices)) >= self.min_overlap_hours
+
+    def degree(self, i: int) -> int:
+        """Number of compatible partners for a participant"""
+        return len(self.neighbors[i])
+
+    def find_group(self, seed: int, size: int, available: Iterable[int],
+                   rng=None, node_limit: int = 5000, constraints=None,
+                   trace=None) -> Optional[List[int]]:
+        """
+        Search for a group of `size` mutually compatible participants containing seed
+
+        A clique-style depth-first search over the compatibility graph. The
+        running AND of availability masks is carried down the search, so any
+        candidate that would leave fewer than min_overlap_hours shared hours
+        is pruned immediately rather than discovered after sampling.
+
+        Args:
+            seed: Position of the participant the group is built around
+            size: Exact group size wanted
+            available: Positions that may still be used
+            rng: Random generator used to shuffle candidates (keeps results varied)
+            node_limit: Upper bound on search steps, keeps large rosters bounded
+            constraints: Optional CompiledConstraints; its fixed partners are
+                placed first, hard rules prune candidates and candidates with
+                no soft penalty are tried first. With soft rules, the first
+                penalty-free group is returned, or else the group with the
+                lowest penalty seen within node_limit
+            trace: Optional SearchTrace (see src/event_log.py) told how many
+                candidates were free, how many free participants were filtered
+                out as incompatible with the seed, which free partners share
+                too few hours with the group found, and every other candidate
+                or fixed partner the search turned down, with the reason
+
+        When anyone marked preferred ('P') hours, candidates sharing the most
+        preferred hours with the seed are tried first.
+
+        Returns:
+            List of positions (seed first) or None if no group was found
+        """
+        masks = self.masks
+        neighbors = self.neighbors
+        min_overlap = self.min_overlap_hours
+        count_hours = self.count_hours
+        available = available if isinstance(available, (set, frozenset)) else set(available)
+
+        start = [seed]
+        if constraints is not None:
+            required = constraints.required(seed)
+            taken = [r for r in required if r not in available]
+            if taken:
+                if trace is not None:
+                    for r in taken:
+                        trace.reject(r, "fixed partner already in a group")
+                return None
+            start += required
+        if len(start) > size:
+            return None
+        start_mask = self.common_mask(start)
+        if len(start) > 1 and count_hours(start_mask) < min_overlap:
+            if trace is not None:
+                for r in start[1:]:
+                    trace.reject(r, "fixed partners share too few hours")
+            return None
+        if len(start) == size:
+            return start
+
+        if len(start) == 1:
+            # Neighbours of the seed already share enough hours with it
+            candidates = [j for j in neighbors[seed] if j in available]
+        else:
+            candidates = [j for j in neighbors[seed] if j in available and j not in start
+                          and count_hours(start_mask & masks[j]) >= min_overlap
+                          and all(j in neighbors[r] for r in start[1:])]
+        if trace is not None:
+            trace.candidates = len(candidates)
+            # Too few shared hours, or a pair rule (do_not_pair, no_repeats)
+            trace.filtered = len(available) - len(start) - len(candidates)
+            if len(start) > 1:
+                for j in neighbors[seed]:
+                    if j in available and j not in start and count_hours(start_mask & masks[j]) < min_overlap:
+                        trace.reject(j, "shares too few hours with the seed's fixed partners")
+        candidates.sort()
+        if rng is not None:
+            rng.shuffle(candidates)
+        if self.has_preferences:
+            # Most shared preferred hours first; the sort is stable, so ties stay shuffled
+            seed_preferred = self.preferred[seed]
+            preferred = self.preferred
+            candidates.sort(key=lambda j: -count_hours(seed_preferred & preferred[j]))
+        budget = [node_limit]
+        weigh = constraints is not None and constraints.has_soft_rules
+        best: List = [None, None]  # lowest-penalty complete group seen, and its penalty
+
+        def complete(group: List[int]) -> bool:
+            """Whether to stop at this complete group (no soft rule is broken)"""
+            if not weigh:
+                return True
+            penalty = constraints.penalty(group)
+            if penalty == 0:
+                return True
+            if best[1] is None or penalty < best[1]:
+                best[0], best[1] = group, penalty
+            return False
+
+        def extend(group: List[int], mask: int, pool: List[int]) -> Optional[List[int]]:
+            if len(group) == size:
+                return group
+            if len(group) + len(pool) < size:
+                return None
+            if weigh:
+                preferred = [c for c in pool if constraints.prefers(group, c)]
+                if len(preferred) < len(pool):
+                    preferred_set = set(preferred)
+                    pool = preferred + [c for c in pool if c not in preferred_set]
+            for k, candidate in enumerate(pool):
+                budget[0] -= 1
+                if budget[0] < 0:
+                    return None
+                if constraints is not None and not constraints.accepts(group, candidate):
+                    if trace is not None:
+                        trace.reject(candidate, "a hard constraint rule forbids it")
+                    continue
+                new_mask = mask & masks[candidate]
+                if len(group) + 1 == size:
+                    if complete(group + [candidate]):
+                        return group + [candidate]
+                    continue
+                candidate_neighbors = neighbors[candidate]
+                rest = [d for d in pool[k + 1:]
+                        if d in candidate_neighbors and count_hours(new_mask & masks[d]) >= min_overlap]
+                found = extend(group + [candidate], new_mask, rest)
+                if found:
+                    return found
+            return None
+
+        found = extend(start, start_mask, candidates) or best[0]
+        if trace is not None and found:
+            # Free partners of the seed that could not have joined the group found
+            group_mask = self.common_mask(found)
+            # Without removed pairs, sharing the group's hours implies being every member's neighbour
+            pair_rules = constraints is not None and bool(constraints.forbidden)
+            for j in candidates:
+                if j in found:
+                    continue
+                if count_hours(group_mask & masks[j]) < min_overlap:
+                    trace.too_few_hours.append(j)
+                elif pair_rules and not all(j in neighbors[m] for m in found):
+                    trace.reject(j, "a pair rule keeps them apart from a member")
+        return found
+
+
+def unmatched_cause(index: CompatibilityIndex, i: int) -> str:
+    """Classify why participant i could not be placed (a CAUSES key)"""
+    if index.count_hours(index.masks[i]) < index.min_overlap_hours:
+        return 'few_hours'
+    if index.degree(i) == 0:
+        return 'no_partner'
+    return 'partners_taken'
+
+
+class DegreeQueue:
+    """
+    Remaining participants bucketed by how many compatible partners they have left
+
+    A bucket queue over degrees: peek() returns a participant with the fewest
+    remaining partners, and remove() updates the degrees of that person's
+    remaining neighbours in O(degree). Used for most-constrained-first seeding.
+    """
+
+    def __init__(self, neighbors: List[Set[int]], positions: Iterable[int], rng=None):
+        """
+        Args:
+            neighbors: Compatible partners of every position (e.g. CompatibilityIndex.neighbors)
+            positions: Positions still to be placed
+            rng: Random generator that orders ties between equally constrained people
+        """
+        order = sorted(positions)
+        if rng is not None:
+            rng.shuffle(order)
+        remaining = set(order)
+        self.neighbors = neighbors
+        self.degree: Dict[int, int] = {i: sum(1 for j in neighbors[i] if j in remaining) for i in order}
+        # Dicts keep insertion order, so ties are served in the shuffled order
+        self.buckets: List[Dict[int, None]] = [{} for _ in range(max(self.degree.values(), default=0) + 1)]
+        for i in order:
+            self.buckets[self.degree[i]][i] = None
+        self.low = 0
+
+    def __len__(self) -> int:
+        return len(self.degree)
+
+    def __contains__(self, i: int) -> bool:
+        return i in self.degree
+
+    def peek(self) -> Optional[int]:
+        """The most constrained remaining participant, or None if empty"""
+        while self.low < len(self.buckets) and not self.buckets[self.low]:
+            self.low += 1
+        if self.low == len(self.buckets):
+            return None
+        return next(iter(self.buckets[self.low]))
+
+    def remove(self, i: int) -> None:
+        """Take a participant out and lower their remaining neighbours' degrees"""
+        d = self.degree.pop(i, None)
+        if d is None:
+            return
+        del self.buckets[d][i]
+        for j in self.neighbors[i]:
+            dj = self.degree.get(j)
+            if dj is not None:
+                del self.buckets[dj][j]
+                self.buckets[dj - 1][j] = None
+                self.degree[j] = dj - 1
+                if dj - 1 < self.low:
+                    self.low = dj - 1
@@ -0,0 +1,244 @@
+"""
+Declarative matching constraints for the coffee chat matching system.
+
+A ConstraintSet holds the rules (minimum overlap, group sizes, department mix,
+no repeats, fixed pairs, do-not-pair lists). It is usually loaded from a JSON
+config file:
+
+    {
+        "min_overlap_hours": 2,
+        "group_size": {"min": 2, "max": 3},
+        "rules": [
+            {"type": "department_mix", "max_same": 1, "hard": false, "weight": 1},
+            {"type": "do_not_pair", "pairs": [["00000003", "00000004"]]},
+            {"type": "fixed_pairs", "pairs": [["00000001", "00000002"]]},
+            {"type": "no_repeats", "rounds": 3},
+            {"type": "tenure_mix", "newcomer_days": 180, "senior_days": 1095, "hard": false}
+        ]
+    }
+
+compile() turns the rules into a CompiledConstraints object for one roster.
+Pair rules (do_not_pair, no_repeats) are applied once by removing edges from
+the compatibility index, so they cost nothing in the search loop. The rest
+become small predicates over integer positions and department codes that the
+matcher, season planner and rescue pass all call.
+
+tenure_mix reads each participant's start_date (see src/tenure.py). Newcomers
+are teamed with a compatible senior by a maximum bipartite matching, and
+teams are placed together like fixed pairs. Hard: no group may have a
+newcomer without a senior. Soft: such groups cost `weight`.
+"""
+
+import json
+from itertools import combinations
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.compatibility import CompatibilityIndex
+from src.tenure import NEWCOMER_DAYS, SENIOR, SENIOR_DAYS, TenureRule, assign_mentors, classify, tenure_days
+
+RULE_TYPES = ('department_mix', 'do_not_pair', 'fixed_pairs', 'no_repeats', 'tenure_mix')
+
+
+class ConstraintSet:
+    """Matching rules shared by every solver"""
+
+    def __init__(self, min_overlap_hours: int = 2, min_group_size: int = 2,
+                 max_group_size: int = 3, rules: Optional[List[Dict]] = None):
+        if min_overlap_hours < 1:
+            raise ValueError(f"min_overlap_hours must be at least 1, got {min_overlap_hours}")
+        if not 2 <= min_group_size <= max_group_size:
+            raise ValueError(f"Invalid group sizes: min {min_group_size}, max {max_group_size}")
+        for rule in rules or []:
+            if rule.get('type') not in RULE_TYPES:
+                raise ValueError(f"Unknown constraint type '{rule.get('type')}', "
+                                 f"expected one of: {', '.join(RULE_TYPES)}")
+        self.min_overlap_hours = min_overlap_hours
+        self.min_group_size = min_group_size
+        self.max_group_size = max_group_size
+        self.rules = list(rules or [])
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ConstraintSet':
+        sizes = data.get('group_size', {})
+        return cls(min_overlap_hours=data.get('min_overlap_hours', 2),
+                   min_group_size=sizes.get('min', 2),
+                   max_group_size=sizes.get('max', 3),
+                   rules=data.get('rules', []))
+
+    @classmethod
+    def from_file(cls, path: str) -> 'ConstraintSet':
+        """Load a constraint set from a JSON config file"""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self) -> Dict:
+        return {
+            'min_overlap_hours': self.min_overlap_hours,
+            'group_size': {'min': self.min_group_size, 'max': self.max_group_size},
+            'rules': self.rules
+        }
+
+    def compile(self, index: CompatibilityIndex, db=None) -> 'CompiledConstraints':
+        """
+        Compile the rules against one roster
+
+        Args:
+            index: Compatibility index of the roster (rebuilt if its minimum
+                overlap differs from this constraint set's)
+            db: History database, needed only by the no_repeats rule
+
+        Returns:
+            CompiledConstraints whose .index has forbidden pairs removed
+        """
+        if index.min_overlap_hours != self.min_overlap_hours:
+            index = CompatibilityIndex(index.participants, self.min_overlap_hours)
+        position = index.position
+
+        def to_positions(id_pairs) -> List[Tuple[int, int]]:
+            pairs = []
+            for a, b in id_pairs:
+                if a in position and b in position and a != b:
+                    pairs.append((position[a], position[b]))
+            return pairs
+
+        forbidden: Set[Tuple[int, int]] = set()
+        fixed: Dict[int, List[int]] = {}
+        max_same, hard, weight = None, False, 1
+        tenure = None
+        for rule in self.rules:
+            kind = rule['type']
+            if kind == 'department_mix':
+                max_same = int(rule.get('max_same', 1))
+                hard = bool(rule.get('hard', False))
+                weight = int(rule.get('weight', 1))
+            elif kind == 'do_not_pair':
+                forbidden.update(to_positions(rule.get('pairs', [])))
+            elif kind == 'fixed_pairs':
+                for i, j in to_positions(rule.get('pairs', [])):
+                    fixed.setdefault(i, []).append(j)
+                    fixed.setdefault(j, []).append(i)
+            elif kind == 'no_repeats' and db is not None:
+                for members in db.get_recent_groups(int(rule.get('rounds', 1))):
+                    forbidden.update(to_positions(combinations(members, 2)))
+            elif kind == 'tenure_mix':
+                role = classify(tenure_days(index.participants),
+                                int(rule.get('newcomer_days', NEWCOMER_DAYS)),
+                                int(rule.get('senior_days', SENIOR_DAYS)))
+                tenure = TenureRule(role, bool(rule.get('hard', False)), int(rule.get('weight', 1)),
+                                    self.max_group_size)
+
+        if forbidden:
+            index = index.without_pairs(forbidden)
+        forbidden = {(min(i, j), max(i, j)) for i, j in forbidden}
+        return CompiledConstraints(index, forbidden, fixed, max_same, hard, weight, tenure=tenure)
+
+
+class CompiledConstraints:
+    """Rules compiled to predicates over participant positions"""
+
+    def __init__(self, index: CompatibilityIndex, forbidden: Set[Tuple[int, int]],
+                 fixed: Dict[int, List[int]], max_same: Optional[int] = None,
+                 department_hard: bool = False, department_weight: int = 1,
+                 department: Optional[List[int]] = None, tenure: Optional[TenureRule] = None):
+        self.index = index
+        self.forbidden = forbidden
+        self.fixed = fixed
+        self.max_same = max_same
+        self.department_hard = department_hard
+        self.department_weight = department_weight
+        # Departments as small integer codes, one per position
+        if department is None:
+            codes: Dict[str, int] = {}
+            department = [codes.setdefault(p.get('department'), len(codes)) for p in index.participants]
+        self.department = department
+        self.tenure = tenure
+        # Senior -> newcomers and newcomer -> senior (and fellow newcomers), placed like fixed pairs
+        self.mentors: Dict[int, List[int]] = {}
+        if tenure is not None:
+            for senior, newcomers in assign_mentors(index, tenure.role, tenure.team_size, fixed).items():
+                team = [senior] + newcomers
+                for m in team:
+                    self.mentors[m] = [t for t in team if t != m]
+        self.has_soft_rules = (max_same is not None and not department_hard) or \
+            (tenure is not None and not tenure.hard)
+
+    @property
+    def min_overlap_hours(self) -> int:
+        return self.index.min_overlap_hours
+
+    def settings(self) -> Tuple:
+        """Picklable rule settings, used to rebuild the rules in a worker process"""
+        return (self.forbidden, self.fixed, self.max_same, self.department_hard, self.department_weight,
+                self.tenure)
+
+    def for_index(self, index: CompatibilityIndex) -> 'CompiledConstraints':
+        """The same rules over another index of the roster (e.g. with more pairs removed); mentors are reassigned"""
+        return CompiledConstraints(index, *self.settings()[:5], department=self.department, tenure=self.tenure)
+
+    def mentored(self) -> int:
+        """Number of newcomers placed in a team with a senior"""
+        return sum(1 for i in self.mentors if self.tenure.role[i] != SENIOR)
+
+    def required(self, i: int) -> List[int]:
+        """Partners that must be in the same group as participant i"""
+        return self.fixed.get(i) or self.mentors.get(i, [])
+
+    def _same_department(self, group: List[int], candidate: int) -> int:
+        code = self.department[candidate]
+        return sum(1 for m in group if self.department[m] == code)
+
+    def accepts(self, group: List[int], candidate: int) -> bool:
+        """Hard rules: may candidate be added to a partially built group?"""
+        # People with fixed partners are only grouped together with them, by their own search
+        if candidate in self.fixed or candidate in self.mentors:
+            return False
+        if self.department_hard and self._same_department(group, candidate) >= self.max_same:
+            return False
+        # A newcomer never waits for a senior to join later: every partial group is mentored
+        if self.tenure is not None and self.tenure.hard and self.tenure.unmentored(group + [candidate]):
+            return False
+        return True
+
+    def prefers(self, group: List[int], candidate: int) -> bool:
+        """Soft rules: is candidate a penalty-free addition (no department overflow, no newcomer left without a senior)?"""
+        if self.max_same is not None and self._same_department(group, candidate) >= self.max_same:
+            return False
+        if self.tenure is not None and self.tenure.unmentored(group + [candidate]):
+            return False
+        return True
+
+    def pair_allowed(self, i: int, j: int) -> bool:
+        return (min(i, j), max(i, j)) not in self.forbidden
+
+    def group_allowed(self, members: List[int]) -> bool:
+        """Check a complete group against every hard rule"""
+        member_set = set(members)
+        for i in members:
+            if any(partner not in member_set for partner in self.fixed.get(i, ())):
+                return False
+        for i, j in combinations(members, 2):
+            if not self.pair_allowed(i, j):
+                return False
+        if self.department_hard:
+            counts: Dict[int, int] = {}
+            for m in members:
+                counts[self.department[m]] = counts.get(self.department[m], 0) + 1
+            if max(counts.values()) > self.max_same:
+                return False
+        if self.tenure is not None and self.tenure.hard and self.tenure.unmentored(members):
+            return False
+        return True
+
+    def penalty(self, members: List[int]) -> int:
+        """Soft-rule penalty of a complete group (0 when every preference is met)"""
+        if not self.has_soft_rules:
+            return 0
+        penalty = 0
+        if self.max_same is not None and not self.department_hard:
+            counts: Dict[int, int] = {}
+            for m in members:
+                counts[self.department[m]] = counts.get(self.department[m], 0) + 1
+            penalty += self.department_weight * sum(max(0, c - self.max_same) for c in counts.values())
+        if self.tenure is not None and not self.tenure.hard and self.tenure.unmentored(members):
+            penalty += self.tenure.weight
+        return penalty
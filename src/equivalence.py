@@ -0,0 +1,162 @@
+"""
+Equivalence-class compression of a roster.
+
+Two people with the same UTC availability mask are interchangeable to the
+matcher: they are compatible with exactly the same people and make exactly
+the same groups valid. A timezone offset plus a local Y/N pattern reduces to
+that mask, so a large roster collapses into a few hundred classes. Overlap
+is counted with utils.day_hours, so daily and week masks both work.
+
+AvailabilityClasses computes compatibility once per pair of classes and
+forms groups on class counts. Concrete people are assigned to the class
+slots afterwards, so group formation costs depend on the number of distinct
+patterns rather than the number of people.
+"""
+
+import random
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.models import is_weekly, utc_mask
+from src.utils import day_hours
+
+
+class AvailabilityClasses:
+    """Participants bucketed by UTC availability mask, with a class compatibility matrix"""
+
+    def __init__(self, masks: List[int], min_overlap_hours: int = 2,
+                 positions: Optional[List[int]] = None):
+        """
+        Args:
+            masks: UTC availability mask of every roster position
+            min_overlap_hours: Minimum shared UTC hours for two people to be compatible
+            positions: Roster positions to include (defaults to all of them)
+        """
+        self.min_overlap_hours = min_overlap_hours
+        self.size = len(masks)
+        by_mask: Dict[int, int] = {}
+        # Per class: its mask and the roster positions in it
+        self.masks: List[int] = []
+        self.members: List[List[int]] = []
+        for i in range(len(masks)) if positions is None else positions:
+            c = by_mask.get(masks[i])
+            if c is None:
+                c = by_mask[masks[i]] = len(self.masks)
+                self.masks.append(masks[i])
+                self.members.append([])
+            self.members[c].append(i)
+        self.compatible: List[Set[int]] = self._build_compatible()
+
+    @classmethod
+    def from_participants(cls, participants: List[dict],
+                          min_overlap_hours: int = 2) -> 'AvailabilityClasses':
+        weekly = any(is_weekly(p) for p in participants)
+        return cls([utc_mask(p, weekly) for p in participants], min_overlap_hours)
+
+    def _build_compatible(self) -> List[Set[int]]:
+        """Classes whose masks share enough hours; a class is compatible with itself if it has enough hours"""
+        masks = self.masks
+        compatible = [set() for _ in masks]
+        for a, mask_a in enumerate(masks):
+            for b in range(a, len(masks)):
+                if day_hours(mask_a & masks[b]) >= self.min_overlap_hours:
+                    compatible[a].add(b)
+                    compatible[b].add(a)
+        return compatible
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+    def neighbors(self) -> List[Set[int]]:
+        """
+        Compatible partners of every roster position, expanded from the class matrix
+
+        Produces the same sets as CompatibilityIndex without a popcount per pair
+        of people. Positions outside this roster subset get empty sets.
+        """
+        neighbors: List[Set[int]] = [set() for _ in range(self.size)]
+        for c, members in enumerate(self.members):
+            partners = set()
+            for d in self.compatible[c]:
+                partners.update(self.members[d])
+            for i in members:
+                neighbors[i] = partners - {i}
+        return neighbors
+
+    def _find_combo(self, seed: int, size: int, counts: List[int], rng: random.Random,
+                    node_limit: int) -> Optional[List[int]]:
+        """
+        Choose `size` class slots (seed class first, classes may repeat) whose masks share enough hours
+
+        Classes are extended in a fixed shuffled order with non-decreasing
+        index, so every multiset is visited once.
+        """
+        masks = self.masks
+        min_overlap = self.min_overlap_hours
+        pool = sorted(c for c in self.compatible[seed] if counts[c] > (c == seed))
+        rng.shuffle(pool)
+        used = {seed: 1}
+        budget = [node_limit]
+
+        def extend(combo: List[int], mask: int, start: int) -> Optional[List[int]]:
+            if len(combo) == size:
+                return combo
+            for k in range(start, len(pool)):
+                budget[0] -= 1
+                if budget[0] < 0:
+                    return None
+                c = pool[k]
+                if used.get(c, 0) >= counts[c]:
+                    continue
+                new_mask = mask & masks[c]
+                # A shared mask covers every pair, so no pairwise check is needed
+                if day_hours(new_mask) < min_overlap:
+                    continue
+                used[c] = used.get(c, 0) + 1
+                found = extend(combo + [c], new_mask, k)
+                if found:
+                    return found
+                used[c] -= 1
+            return None
+
+        return extend([seed], masks[seed], 0)
+
+    def form_groups(self, rng: random.Random, min_group_size: int = 2, max_group_size: int = 3,
+                    node_limit: int = 5000) -> Tuple[List[List[int]], List[int]]:
+        """
+        Form groups on class counts, then assign concrete people to each slot
+
+        Seeds are drawn like the per-person solver (a uniformly random remaining
+        person, i.e. a class weighted by its remaining count). A class that cannot
+        seed any group is set aside whole, since all of its members would fail
+        the same way.
+
+        Returns:
+            (groups as lists of roster positions, positions left unmatched)
+        """
+        pools = [rng.sample(members, len(members)) for members in self.members]
+        counts = [len(members) for members in self.members]
+        remaining = sum(counts)
+        groups: List[List[int]] = []
+        leftover: List[int] = []
+
+        while remaining >= min_group_size:
+            seed = rng.choices(range(len(counts)), weights=counts)[0]
+            combo = None
+            for size in range(min(max_group_size, remaining), min_group_size - 1, -1):
+                combo = self._find_combo(seed, size, counts, rng, node_limit)
+                if combo:
+                    break
+            if combo:
+                groups.append([pools[c].pop() for c in combo])
+                for c in combo:
+                    counts[c] -= 1
+                remaining -= len(combo)
+            else:
+                leftover.extend(pools[seed])
+                pools[seed] = []
+                remaining -= counts[seed]
+                counts[seed] = 0
+
+        for pool in pools:
+            leftover.extend(pool)
+        return groups, sorted(leftover)
@@ -0,0 +1,217 @@
+"""
+Append-only log of matching decisions.
+
+GroupMatcher reports every decision it makes to an EventLog, one JSON
+object per line:
+
+    round       a matching round starts (solver, roster size)
+    reject      a candidate the search around a seed turned down, with the
+                reason (a hard rule, a fixed partner already taken, ...)
+    group       a group is committed (how it was formed, shared hours, and
+                the seed's free partners who share too few hours with it)
+    dropped     a seed no group could be formed around; they leave the pool
+    rescue      the rescue pass placed (or failed to place) someone
+    captain     a captain is chosen, with every member's captain count
+    unmatched   a participant is left out at the end, with the cause
+
+Seed picks are part of the group or dropped event they lead to: 'id' is
+the seed, 'candidates' the compatible partners still free, 'filtered' the
+free participants ruled out for sharing too few hours (or a pair rule) and
+'remaining' the participants not yet placed. Every event carries the round ID.
+
+emit() only appends to an in-memory batch; full batches go to a background
+thread that encodes and writes them, so logging at full detail adds a few
+percent to matching time. A write error stops the log: the next hand-over,
+flush() or close() raises it.
+
+trail() reads a log back and picks out the events that concern one
+participant, answering "why was I grouped with X" or "why was I unmatched".
+"""
+
+import json
+import queue
+import threading
+from typing import Dict, Iterator, List, Optional
+
+BATCH_SIZE = 1024  # events handed to the writer thread at a time
+
+# Event fields that may hold the employee IDs an event concerns
+ID_FIELDS = ('id', 'candidate', 'captain', 'displaced')
+LIST_FIELDS = ('members', 'captain_counts', 'too_few_hours')
+
+
+class EventLog:
+    """Buffered JSONL writer; decisions are encoded and written off the matching thread"""
+
+    def __init__(self, path: str, batch_size: int = BATCH_SIZE):
+        """
+        Args:
+            path: JSONL file; events are appended to whatever it already holds
+            batch_size: Events collected before they are handed to the writer
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.count = 0
+        self._batch: List[Dict] = []
+        self._queue: queue.Queue = queue.Queue()
+        self._error: Optional[BaseException] = None
+        self._file = open(path, 'a', encoding='utf-8')
+        self._writer = threading.Thread(target=self._write_batches, name="event-log", daemon=True)
+        self._writer.start()
+
+    def emit(self, event: str, **fields) -> None:
+        """Record one event (cheap: the event is only buffered)"""
+        fields['event'] = event
+        self._batch.append(fields)
+        if len(self._batch) >= self.batch_size:
+            self._check()
+            self._queue.put(self._batch)
+            self._batch = []
+
+    def _write_batches(self) -> None:
+        encode = json.JSONEncoder(separators=(',', ':'), default=str).encode
+        while True:
+            batch = self._queue.get()
+            try:
+                if batch is None:
+                    return
+                if self._error is None:
+                    self._file.write("".join(encode(e) + "\n" for e in batch))
+                    self._file.flush()
+                    self.count += len(batch)
+            except Exception as e:
+                # Keep draining the queue, so flush() never waits on a dead writer
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _check(self) -> None:
+        """Raise the writer's error, if it hit one"""
+        if self._error is not None:
+            raise OSError(f"Could not write event log {self.path}: {self._error}") from self._error
+
+    def flush(self) -> None:
+        """Wait until every event emitted so far is on disk"""
+        if self._batch:
+            self._queue.put(self._batch)
+            self._batch = []
+        self._queue.join()
+        self._check()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._queue.put(None)
+            self._writer.join()
+            self._file.close()
+
+    def __enter__(self) -> 'EventLog':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class SearchTrace:
+    """What one group search saw: free candidates and rejections (see CompatibilityIndex.find_group)"""
+    __slots__ = ('candidates', 'filtered', 'too_few_hours', 'rejected')
+
+    def __init__(self):
+        self.candidates = 0
+        self.filtered = 0  # free participants incompatible with the seed
+        self.too_few_hours: List[int] = []  # free partners of the seed the group found leaves out
+        self.rejected: Dict[int, str] = {}  # position -> first reason, in rejection order
+
+    def reject(self, position: int, reason: str) -> None:
+        self.rejected.setdefault(position, reason)
+
+
+def read_events(path: str) -> Iterator[Dict]:
+    """Events in the order they were written (a torn last line is skipped)"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def concerns(event: Dict, employee_id: str) -> bool:
+    """Whether an event is about the employee"""
+    return (any(event.get(field) == employee_id for field in ID_FIELDS) or
+            any(employee_id in event.get(field, ()) for field in LIST_FIELDS))
+
+
+def trail(path: str, employee_id: str, round_id: Optional[str] = None) -> List[Dict]:
+    """
+    Decision trail of one participant
+
+    Args:
+        path: Event log written by EventLog
+        employee_id: Participant to follow
+        round_id: Only this round (defaults to the last round the participant appears in)
+
+    Returns:
+        List[Dict]: The round's start event followed by every event about the participant
+    """
+    rounds: Dict[str, List[Dict]] = {}
+    starts: Dict[str, Dict] = {}
+    last_round = None
+    for event in read_events(path):
+        if event['event'] == 'round':
+            starts[event['round']] = event
+        elif concerns(event, employee_id):
+            rounds.setdefault(event['round'], []).append(event)
+            last_round = event['round']
+    round_id = round_id or last_round
+    if round_id not in rounds:
+        return []
+    return ([starts[round_id]] if round_id in starts else []) + rounds[round_id]
+
+
+def describe(event: Dict, employee_id: str) -> str:
+    """One line of a trail in plain words"""
+    kind = event['event']
+    others = ", ".join(m for m in event.get('members', []) if m != employee_id)
+    seed = ""
+    if event.get('id') == employee_id and 'candidates' in event:
+        filtered = (f", {event['filtered']} others ruled out for too few shared hours or a pair rule"
+                    if event.get('filtered') else "")
+        seed = (f"Picked as a seed with {event['candidates']} compatible partners free "
+                f"({event['remaining']} participants left{filtered}). ")
+    if kind == 'round':
+        return (f"Round {event['round']} ({event['solver']} solver, "
+                f"{event['participants']} participants)")
+    if kind == 'reject':
+        if event['candidate'] == employee_id:
+            return f"Turned down as a partner of {event['id']}: {event['reason']}"
+        return f"Could not be grouped with {event['candidate']}: {event['reason']}"
+    if kind == 'dropped':
+        return f"{seed}No group could be formed around them: {event['reason']}"
+    if kind == 'group' and employee_id not in event['members']:
+        return (f"Could not join the group of {', '.join(event['members'])}: "
+                f"shares too few hours with it")
+    if kind == 'group':
+        return (f"{seed}Grouped with {others} ({event['source']}, "
+                f"{event['common_hours']} shared hours)")
+    if kind == 'rescue':
+        if event.get('displaced') == employee_id:
+            # A swap logs the newcomer's entry and, if the displaced person paired up, their partner's
+            if event['action'] == 'paired_with_displaced':
+                return f"Paired with {event['id']} after being moved out of their group"
+            return f"Moved out of their group so {event['id']} could join it"
+        reason = f" ({event['reason']})" if event.get('reason') else ""
+        return f"Rescue pass: {event['action'].replace('_', ' ')}{reason}"
+    if kind == 'captain':
+        counts = event['captain_counts']
+        if event['captain'] == employee_id:
+            return (f"Chosen as captain (captain {counts[employee_id]} times before, "
+                    f"fewest in the group), meeting {event['meeting_time']}")
+        return (f"{event['captain']} was chosen as captain (captain {counts[event['captain']]} times "
+                f"before, against {counts[employee_id]}), meeting {event['meeting_time']}")
+    if kind == 'unmatched':
+        return f"Left unmatched: {event['reason']}"
+    return json.dumps(event)
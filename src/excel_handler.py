@@ -1,14 +1,24 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 import openpyxl 
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, Protection
 from openpyxl.worksheet.datavalidation import DataValidation
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.utils import get_column_letter
 from openpyxl.formatting.rule import CellIsRule
 import os
-from src.models import CoffeeGroup
-from src.utils import convert_local_to_utc, generate_time_ranges
+from datetime import date
+from src.models import CoffeeGroup, Participant, get_region, utc_mask
+from src.utils import (AVAILABLE, WEEKDAYS, convert_timezone_to_float, day_hours, format_meeting_time,
+                       generate_slot_ranges, generate_time_ranges, mask_to_hours)
 
 
+# Optional sheet with day-of-week availability (see create_weekly_sheet)
+WEEKLY_SHEET = "Weekly Availability"
+
+# Availability cell fills: available ('Y') and available + preferred ('P')
+AVAILABLE_FILL = PatternFill(start_color='92D050', end_color='92D050', fill_type='solid')
+PREFERRED_FILL = PatternFill(start_color='00B050', end_color='00B050', fill_type='solid')
+
 
 class ExcelTemplateHandler:
     basic_headers = ["Employee ID", "Name", "Email", "Department", "Country", "Timezone", "Start Date", "Status"]
@@ -64,7 +74,7 @@ class ExcelTemplateHandler:
             top=Side(style='thin'), 
             bottom=Side(style='thin')
         )
-    def create_template(self, output_path: str = "data/participant_template.xlsx"):
+    def create_template(self, output_path: str = "data/participant_template.xlsx", weekly: bool = False):
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         wb = openpyxl.Workbook()
     
@@ -80,6 +90,13 @@ class ExcelTemplateHandler:
         participants_ws = wb.create_sheet("Participants")
         self.create_participants_sheet(participants_ws)
 
+        # Optional day-of-week grid for people whose hours differ between days
+        if weekly:
+            instructions_ws['B8'] = ("4. Optional: if your hours differ between days, add one row per day "
+                                     "to the Weekly Availability sheet. Days you leave out count as unavailable.")
+            instructions_ws['B9'] = "5. For support, contact: GlobalBI.Engagement@smb.nielseniq.com"
+            self.create_weekly_sheet(wb.create_sheet(WEEKLY_SHEET))
+
         wb.save(output_path)
         print(f"Template created at: {output_path}")
     def create_instructions_sheet(self, ws):
@@ -100,7 +117,8 @@ class ExcelTemplateHandler:
         ws['B3'] = "Instructions:"
         ws['B3'].font = Font(size=16, bold=True)
         ws['B5'] = "1. Fill out your personal information in the Participants sheet."
-        ws['B6'] = "2. Select your availability for each hour (Y for available, N for unavailable)."
+        ws['B6'] = ("2. Select your availability for each hour (Y for available, P for available and "
+                     "preferred, N for unavailable).")
         ws['B7'] = "3. Your total available hours will be calculated automatically."
         ws['B8'] = "4. For support, contact: GlobalBI.Engagement@smb.nielseniq.com"
 
@@ -134,7 +152,7 @@ class ExcelTemplateHandler:
         availability_start_col = total_hours_col + 1
         for row in range(2, 1002):  # Assuming up to 1000 participants
             cell = ws.cell(row=row, column=total_hours_col)
-            cell.value = f'=COUNTIF({get_column_letter(availability_start_col)}{row}:{get_column_letter(availability_start_col+23)}{row},"Y")'
+            cell.value = f'=COUNTIF({get_column_letter(availability_start_col)}{row}:{get_column_letter(availability_start_col+23)}{row},"Y")+COUNTIF({get_column_letter(availability_start_col)}{row}:{get_column_letter(availability_start_col+23)}{row},"P")'
 
         # Freeze panes
         ws.freeze_panes = 'D2'
@@ -146,13 +164,65 @@ class ExcelTemplateHandler:
         for row in ws['A2:AG1001']:
             for cell in row:
                 cell.protection = Protection(locked=False)
+    def create_weekly_sheet(self, ws):
+        """Sheet with one row per (employee, weekday) and a Y/P/N column per local hour"""
+        headers = ["Employee ID", "Day"] + [f"{h:02d}:00" for h in range(24)]
+        for col, header in enumerate(headers, 1):
+            cell = ws.cell(row=1, column=col, value=header)
+            cell.font = self.header_font
+            cell.fill = self.header_fill
+            cell.border = self.border
+            cell.alignment = Alignment(horizontal='center', vertical='center')
+        ws.column_dimensions['A'].width = 20
+        ws.column_dimensions['B'].width = 10
+        for col in range(3, len(headers) + 1):
+            ws.column_dimensions[get_column_letter(col)].width = 5
+
+        dv_day = DataValidation(type="list", formula1=f'"{",".join(WEEKDAYS)}"', allow_blank=False)
+        dv_yn = DataValidation(type="list", formula1='"Y,P,N"', allow_blank=True)
+        ws.add_data_validation(dv_day)
+        ws.add_data_validation(dv_yn)
+        dv_day.add('B2:B7001')
+        dv_yn.add('C2:Z7001')
+        ws.conditional_formatting.add('C2:Z7001', CellIsRule(operator='equal', formula=['"Y"'], fill=AVAILABLE_FILL))
+        ws.conditional_formatting.add('C2:Z7001', CellIsRule(operator='equal', formula=['"P"'], fill=PREFERRED_FILL))
+        ws.freeze_panes = 'C2'
+
+    def read_weekly_availability(self, ws) -> Dict[str, Dict[str, str]]:
+        """
+        Read the Weekly Availability sheet
+
+        Returns:
+            Dict of employee ID to weekly availability (local week slot
+            '0'-'167' -> 'Y' or 'P'); days without a row are unavailable
+        """
+        weekly: Dict[str, Dict[str, str]] = {}
+        for row in ws.iter_rows(min_row=2, values_only=True):
+            if not row or row[0] is None:
+                continue
+            try:
+                employee_id = self.validate_employee_id(row[0])
+            except ValueError as e:
+                print(f"Skipping weekly row due to validation error: {e}")
+                continue
+            day = str(row[1]).strip()[:3].title() if row[1] else None
+            if day not in WEEKDAYS:
+                print(f"Skipping weekly row with unknown day for ID {employee_id}: {row[1]}")
+                continue
+            grid = weekly.setdefault(employee_id, {})
+            first_slot = WEEKDAYS.index(day) * 24
+            for hour, value in enumerate(row[2:26]):
+                if value in AVAILABLE:
+                    grid[str(first_slot + hour)] = value
+        return weekly
+
     def add_data_validation(self, ws):
         dv_dept = DataValidation(type="list", formula1=f'"{",".join(self.departments)}"', allow_blank=False)
         dv_country = DataValidation(type="list", formula1=f'"{",".join(self.locations.keys())}"', allow_blank=False)
         dv_tz = DataValidation(type="list", formula1=f'"{",".join(self.timezones)}"', allow_blank=False)
         dv_date = DataValidation(type="date", allow_blank=True)
         dv_status = DataValidation(type="list", formula1='"Active,Opted Out"', allow_blank=False)
-        dv_yn = DataValidation(type="list", formula1='"Y,N"', allow_blank=False)
+        dv_yn = DataValidation(type="list", formula1='"Y,P,N"', allow_blank=False)
 
         for dv in [dv_dept, dv_country, dv_tz, dv_date, dv_status, dv_yn]:
             ws.add_data_validation(dv)
@@ -165,11 +235,12 @@ class ExcelTemplateHandler:
         for col in range(9, 33):  # Columns I to AF
             dv_yn.add(f'{get_column_letter(col)}2:{get_column_letter(col)}1001')
     def add_conditional_formatting(self, ws):
-        green_fill = PatternFill(start_color='92D050', end_color='92D050', fill_type='solid')
-        rule = CellIsRule(operator='equal', formula=['"Y"'], fill=green_fill)
+        available = CellIsRule(operator='equal', formula=['"Y"'], fill=AVAILABLE_FILL)
+        preferred = CellIsRule(operator='equal', formula=['"P"'], fill=PREFERRED_FILL)
         
         for col in range(9, 33):  # Columns I to AF
-            ws.conditional_formatting.add(f'{get_column_letter(col)}2:{get_column_letter(col)}1001', rule)
+            ws.conditional_formatting.add(f'{get_column_letter(col)}2:{get_column_letter(col)}1001', available)
+            ws.conditional_formatting.add(f'{get_column_letter(col)}2:{get_column_letter(col)}1001', preferred)
     def validate_employee_id(self, id_value) -> str:
         """
         Validate and format employee ID
@@ -189,9 +260,10 @@ class ExcelTemplateHandler:
         if not id_str:
             raise ValueError("Employee ID cannot be empty")
         
-        # Special case for your exact format which starts with zeros
-        if isinstance(id_value, str) and id_value.isdigit():
-            return id_value
+        # Digit strings keep their leading zeros and are padded like numbers,
+        # so '1', 1 and '00000001' (e.g. from CSV and workbooks) are one employee
+        if id_str.isdigit():
+            return id_str.zfill(8)
         
         try:
             # Check if it's a valid number
@@ -202,7 +274,65 @@ class ExcelTemplateHandler:
             
         except ValueError:
             raise ValueError(f"Invalid Employee ID format: {id_value}")   
-    def read_participants_from_excel(self, filepath: str) -> List[Dict]:
+    def participant_from_row(self, values: list) -> Optional[Participant]:
+        """
+        Build a participant from one row in the Participants sheet layout
+
+        Shared by the workbook and CSV readers. Returns None (after printing
+        why) for empty or invalid rows.
+        """
+        values = list(values) + [None] * (9 + 24 - len(values))
+        # Skip rows without an Employee ID, and rows that are completely empty
+        if values[0] is None or not any(values):
+            return None
+            
+        try:
+            # Validate employee ID first
+            employee_id = self.validate_employee_id(values[0])
+        except ValueError as e:
+            print(f"Skipping row due to validation error: {e}")
+            return None
+            
+        # If ID is valid, create participants
+        participant = {
+            'id': employee_id,
+            'name': values[1],
+            'email': values[2],
+            'department': values[3],
+            'country': values[4],
+            'timezone': values[5],
+            'availability': {},
+            'captain_count': 0
+        }
+        
+        # Basic validation of required fields
+        if not all([participant['name'], participant['email'], 
+                participant['department'], participant['country'], 
+                participant['timezone']]):
+            print(f"Skipping row with missing required fields: ID {employee_id}")
+            return None
+        
+        # Validate timezone: 'UTC±HH:MM' or an IANA zone name such as 'Europe/Paris'
+        try:
+            convert_timezone_to_float(participant['timezone'])
+        except (ValueError, TypeError):
+            print(f"Invalid timezone format for {participant['name']}: {participant['timezone']}")
+            return None
+
+        # Optional; used to pick the newest row when rosters are merged
+        start_date = parse_start_date(values[6])
+        if start_date:
+            participant['start_date'] = start_date
+        
+        # Convert availability to Y/P/N format
+        availability_start = 9  # Column where availability starts
+        for hour in range(24):
+            value = values[availability_start + hour]
+            participant['availability'][str(hour)] = value if value in AVAILABLE else 'N'
+        
+        return Participant.from_dict(participant)
+
+    def read_participants_from_excel(self, filepath: str) -> List[Participant]:
         """Read participant data from Excel template and convert to internal format"""
         try:
             print(f"Opening file: {filepath}")
@@ -231,55 +361,17 @@ class ExcelTemplateHandler:
                 print(f"Row {row_idx+2} details: {cell_details}")
             
             for row in ws.iter_rows(min_row=2):
-                # Skip rows without an Employee ID
-                if row[0].value is None:
-                    continue
-                    
-                # Skip rows that are completely empty
-                if not any(cell.value for cell in row):
-                    continue
-                    
-                try:
-                    # Validate employee ID first
-                    employee_id = self.validate_employee_id(row[0].value)
-                    
-                    # If ID is valid, create participants
-                    participant = {
-                        'id': employee_id,
-                        'name': row[1].value,
-                        'email': row[2].value,
-                        'department': row[3].value,
-                        'country': row[4].value,
-                        'timezone': row[5].value,
-                        'availability': {},
-                        'captain_count': 0
-                    }
-                    
-                    # Basic validation of required fields
-                    if not all([participant['name'], participant['email'], 
-                            participant['department'], participant['country'], 
-                            participant['timezone']]):
-                        print(f"Skipping row with missing required fields: ID {employee_id}")
-                        continue
-                    
-                    # Validate timezone format
-                    if not participant['timezone'].startswith('UTC'):
-                        print(f"Invalid timezone format for {participant['name']}: {participant['timezone']}")
-                        continue
-                    
-                    # Convert availability to Y/N format
-                    availability_start = 9  # Column where availability starts
-                    for hour in range(24):
-                        col_index = availability_start + hour
-                        value = row[col_index].value
-                        participant['availability'][str(hour)] = 'Y' if value == 'Y' else 'N'
-                    
+                participant = self.participant_from_row([cell.value for cell in row])
+                if participant is not None:
                     participants.append(participant)
-                    
-                except ValueError as e:
-                    print(f"Skipping row due to validation error: {e}")
-                    continue
             
+            if WEEKLY_SHEET in wb.sheetnames:
+                weekly = self.read_weekly_availability(wb[WEEKLY_SHEET])
+                for participant in participants:
+                    if participant['id'] in weekly:
+                        participant['weekly_availability'] = weekly[participant['id']]
+                print(f"Loaded weekly availability for {sum(p['id'] in weekly for p in participants)} participants")
+
             print(f"Successfully loaded {len(participants)} participants")
             return participants
             
@@ -287,81 +379,45 @@ class ExcelTemplateHandler:
             print(f"Error reading Excel file: {e}")
             return []
 
-        def export_matches_to_excel(self, groups: List[CoffeeGroup], output_path: str = "data/coffee_chat_matches.xlsx"):
-            """Export matches to Excel with UTC availability ranges"""
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Coffee Chat Groups"
-
-            header_font = Font(bold=True)
-            border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-            
-            headers = ["Group", "Captain", "Captain Dept", "Members", 
-                    "Member Departments", "Suggested Meeting Time", "UTC Working Hours"]
-            
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col)
-                cell.value = header
-                cell.font = header_font
-                cell.border = border
-
-            for idx, group in enumerate(groups, 1):
-                if not group.captain:
-                    continue
-                    
-                row = idx + 1
-                
-                ws.cell(row=row, column=1, value=f"Group {idx}")
-                ws.cell(row=row, column=2, value=f"{group.captain['name']} ({group.captain['timezone']})")
-                ws.cell(row=row, column=3, value=f"{group.captain['department']}")
-                
-                other_members = [f"{m['name']} ({m['timezone']})" for m in group.members if m != group.captain]
-                ws.cell(row=row, column=4, value="\n".join(other_members))
-                
-                member_depts = [f"{m['name']}: {m['department']}" for m in group.members if m != group.captain]
-                ws.cell(row=row, column=5, value="\n".join(member_depts))
-                
-                if group.optimal_meeting_time is not None:
-                    ws.cell(row=row, column=6, value=f"{group.optimal_meeting_time:02d}:00 UTC")
-                
-                utc_hours = []
-                for member in group.members:
-                    member_utc_hours = set()
-                    for hour, status in member['availability'].items():
-                        if status == 'Y':
-                            utc_hour = convert_local_to_utc(hour, member['timezone'])
-                            if utc_hour is not None:
-                                member_utc_hours.add(utc_hour)
-                    time_ranges = generate_time_ranges(sorted(member_utc_hours))
-                    utc_hours.append(f"{member['name']}: {time_ranges}")
-                    
-                ws.cell(row=row, column=7, value="\n".join(utc_hours))
-
-                for col in range(1, 8):
-                    cell = ws.cell(row=row, column=col)
-                    cell.border = border
-                    cell.alignment = Alignment(wrapText=True, vertical='center')
-
-            for column in ws.columns:
-                max_length = 0
-                column = [cell for cell in column]
-                for cell in column:
-                    if cell.value:
-                        lines = str(cell.value).count('\n') + 1
-                        max_length = max(max_length, 
-                                    max(len(line) for line in str(cell.value).split('\n')))
-                        ws.row_dimensions[cell.row].height = max(15 * lines, 20)
-                ws.column_dimensions[column[0].column_letter].width = max_length + 2
-
-            wb.save(output_path)
-            print(f"Match results exported to: {output_path}")
-
-def quick_read_participants(filepath: str) -> List[Dict]:
+    def export_matches_to_excel(self, groups: List[CoffeeGroup], output_path: str = "data/coffee_chat_matches.xlsx",
+                                participants: Optional[List[dict]] = None,
+                                unmatched: Optional[List[Dict]] = None):
+        """Export matches to Excel as a full match report (see export_match_report)"""
+        export_match_report(groups, output_path, participants=participants, unmatched=unmatched)
+
+    def read_participants_from_csv(self, filepath: str) -> List[Participant]:
+        """Read participants from a CSV file with the Participants sheet columns (e.g. a saved copy of the sheet)"""
+        import csv
+
+        try:
+            with open(filepath, newline='', encoding='utf-8-sig') as f:
+                rows = list(csv.reader(f))
+        except OSError as e:
+            print(f"Error reading CSV file: {e}")
+            return []
+        participants = []
+        for row in rows[1:]:
+            # Empty cells are blank strings in CSV, None in a workbook
+            participant = self.participant_from_row([value.strip() or None for value in row])
+            if participant is not None:
+                participants.append(participant)
+        print(f"Successfully loaded {len(participants)} participants from {filepath}")
+        return participants
+
+def parse_start_date(value) -> Optional[str]:
+    """Start Date cell (a date, datetime or 'YYYY-MM-DD' text) as an ISO date string, or None"""
+    if value is None:
+        return None
+    if hasattr(value, 'date') and callable(value.date):
+        value = value.date()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    try:
+        return date.fromisoformat(str(value).strip()[:10]).isoformat()
+    except ValueError:
+        return None
+
+def quick_read_participants(filepath: str) -> List[Participant]:
     """Convenience function to read participants without creating a handler manually"""
     handler = ExcelTemplateHandler()
     return handler.read_participants_from_excel(filepath)
@@ -371,11 +427,226 @@ def quick_export_matches(groups: List[CoffeeGroup], output_path: str):
     wb = openpyxl.Workbook()
     ws = wb.active
     ws.title = "Coffee Chat Groups"
+    write_groups_sheet(ws, groups)
     
-    # Add headers
-    headers = ["Group", "Captain", "Captain Dept", "Members", 
-              "Member Departments", "Suggested Meeting Time", "UTC Working Hours"]
-    
+    # Save the file
+    wb.save(output_path)
+    print(f"Match results exported to: {output_path}")
+
+def export_rounds_to_excel(rounds: List[tuple], output_path: str):
+    """Export several rounds of matches to one workbook, one sheet per (title, groups) round"""
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for title, groups in rounds:
+        write_groups_sheet(wb.create_sheet(title[:31]), groups)
+    wb.save(output_path)
+    print(f"{len(rounds)} rounds exported to: {output_path}")
+
+GROUP_HEADERS = ["Group", "Captain", "Captain Dept", "Members",
+                 "Member Departments", "Suggested Meeting Time", "UTC Working Hours"]
+PEOPLE_HEADERS = ["Name", "Employee ID", "Email", "Department", "Country", "Timezone", "Region",
+                  "Group", "Role", "Meeting Time (UTC)", "Group Members"]
+UNMATCHED_HEADERS = ["Name", "Timezone", "Department", "Available Hours", "Recommendation"]
+
+
+def build_report_data(groups: List[CoffeeGroup], participants: Optional[List[dict]] = None,
+                      unmatched: Optional[List[Dict]] = None) -> Dict:
+    """
+    Compute everything the match report shows, in one pass over the groups
+
+    Each person's UTC range string and region are derived once, from their
+    availability mask, and reused by every sheet.
+
+    Args:
+        groups: Formed groups, in export order
+        participants: Full roster; people in no group become unmatched rows
+        unmatched: Output of GroupMatcher.analyze_unmatched_participants, used
+            for the unmatched sheet when given
+
+    Returns:
+        Dict with 'groups', 'people' and 'unmatched' row lists and a 'summary' dict
+    """
+    person_info: Dict[str, tuple] = {}
+
+    weekly = any(g.weekly for g in groups)
+
+    def info(person) -> tuple:
+        cached = person_info.get(person['id'])
+        if cached is None:
+            mask = utc_mask(person, weekly)
+            hours = mask_to_hours(mask)
+            ranges = generate_slot_ranges(hours) if weekly else generate_time_ranges(hours)
+            cached = (ranges, get_region(person['timezone']), day_hours(mask))
+            person_info[person['id']] = cached
+        return cached
+
+    group_rows = []
+    people_rows = []
+    per_hour: Dict[int, int] = {}
+    region_counts: Dict[str, Dict[str, int]] = {}
+
+    def count(region: str, key: str) -> None:
+        counts = region_counts.setdefault(region, {'participants': 0, 'matched': 0,
+                                                   'unmatched': 0, 'captains': 0})
+        counts[key] += 1
+
+    matched = 0
+    for idx, group in enumerate(groups, 1):
+        if not group.captain:
+            continue
+        captain = group.captain
+        others = [m for m in group.members if m != captain]
+        label = f"Group {idx}"
+        meeting = group.meeting_time_label
+        if group.optimal_meeting_time is not None:
+            per_hour[group.optimal_meeting_time] = per_hour.get(group.optimal_meeting_time, 0) + 1
+        group_rows.append([
+            label,
+            f"{captain['name']} ({captain['timezone']})",
+            f"{captain['department']}",
+            "\n".join(f"{m['name']} ({m['timezone']})" for m in others),
+            "\n".join(f"{m['name']}: {m['department']}" for m in others),
+            meeting,
+            "\n".join(f"{m['name']}: {info(m)[0]}" for m in group.members),
+        ])
+        names = [m['name'] for m in group.members]
+        for member in group.members:
+            region = info(member)[1]
+            is_captain = member == captain
+            count(region, 'matched')
+            if is_captain:
+                count(region, 'captains')
+            people_rows.append([
+                member['name'], member['id'], member.get('email'), member['department'],
+                member.get('country'), member['timezone'], region, label,
+                "Captain" if is_captain else "Member", meeting,
+                ", ".join(n for n in names if n != member['name']),
+            ])
+        matched += len(group.members)
+
+    placed = {row[1] for row in people_rows}
+    unplaced = [p for p in participants or [] if p['id'] not in placed]
+    for person in unplaced:
+        region = info(person)[1]
+        count(region, 'unmatched')
+        people_rows.append([
+            person['name'], person['id'], person.get('email'), person['department'],
+            person.get('country'), person['timezone'], region, "Unmatched", None, None, None,
+        ])
+    for counts in region_counts.values():
+        counts['participants'] = counts['matched'] + counts['unmatched']
+    people_rows.sort(key=lambda row: (str(row[0]).lower(), str(row[1])))
+
+    if unmatched is not None:
+        unmatched_rows = [[u['name'], u['timezone'], u['department'], u['available_hours'],
+                           u['recommendation']] for u in unmatched]
+    else:
+        unmatched_rows = [[p['name'], p['timezone'], p['department'], info(p)[2], None]
+                          for p in unplaced]
+
+    total = matched + len(unplaced)
+    return {
+        'groups': group_rows,
+        'people': people_rows,
+        'unmatched': unmatched_rows,
+        'summary': {
+            'participants': total,
+            'matched': matched,
+            'unmatched': len(unplaced),
+            'matched_pct': round(100.0 * matched / total, 1) if total else 0.0,
+            'groups': len(group_rows),
+            'average_group_size': round(matched / len(group_rows), 2) if group_rows else 0.0,
+            'per_hour': dict(sorted(per_hour.items())),
+            'weekly': weekly,
+            'regions': dict(sorted(region_counts.items())),
+        },
+    }
+
+
+def _write_table(ws, headers: List[str], rows: List[list], wrap: bool = False):
+    """Append a bordered table with a bold header row to a write-only worksheet"""
+    header_font = Font(bold=True)
+    border = Border(left=Side(style='thin'), right=Side(style='thin'),
+                    top=Side(style='thin'), bottom=Side(style='thin'))
+    alignment = Alignment(wrapText=True, vertical='center')
+
+    # Widths must be set before any row is streamed out
+    widths = [len(h) for h in headers]
+    for row in rows:
+        for col, value in enumerate(row):
+            if value is not None:
+                widths[col] = max(widths[col], max(len(line) for line in str(value).split('\n')))
+    for col, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(col)].width = width + 2
+
+    def styled(value, font=None):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.border = border
+        if font:
+            cell.font = font
+        if wrap:
+            cell.alignment = alignment
+        return cell
+
+    ws.append([styled(h, header_font) for h in headers])
+    for row in rows:
+        ws.append([styled(v) for v in row])
+
+
+def _summary_rows(summary: Dict) -> List[list]:
+    rows = [
+        ["Participants", summary['participants']],
+        ["Matched", summary['matched']],
+        ["Unmatched", summary['unmatched']],
+        ["Matched %", summary['matched_pct']],
+        ["Groups", summary['groups']],
+        ["Average group size", summary['average_group_size']],
+        [],
+        ["UTC Hour", "Groups"],
+    ]
+    rows += [[format_meeting_time(hour, summary['weekly'], zone=False), n] for hour, n in summary['per_hour'].items()]
+    rows += [[], ["Region", "Participants", "Matched", "Unmatched", "Captains"]]
+    rows += [[region, c['participants'], c['matched'], c['unmatched'], c['captains']]
+             for region, c in summary['regions'].items()]
+    return rows
+
+
+def export_match_report(groups: List[CoffeeGroup], output_path: str,
+                        participants: Optional[List[dict]] = None,
+                        unmatched: Optional[List[Dict]] = None) -> Dict:
+    """
+    Export a multi-sheet match report
+
+    Sheets:
+        Coffee Chat Groups - one row per group (same layout as quick_export_matches)
+        People             - one row per person, sorted by name, with their group
+        Unmatched          - unmatched people and the recommendation for each
+        Summary            - matched %, groups per UTC hour and per-region counts
+
+    The report data is computed once by build_report_data and the workbook is
+    streamed in write-only mode, so large rosters stay cheap to export.
+
+    Returns:
+        Dict: The report data, for callers that also want the numbers
+    """
+    data = build_report_data(groups, participants, unmatched)
+    wb = openpyxl.Workbook(write_only=True)
+    _write_table(wb.create_sheet("Coffee Chat Groups"), GROUP_HEADERS, data['groups'], wrap=True)
+    _write_table(wb.create_sheet("People"), PEOPLE_HEADERS, data['people'])
+    _write_table(wb.create_sheet("Unmatched"), UNMATCHED_HEADERS, data['unmatched'])
+    summary_ws = wb.create_sheet("Summary")
+    summary_ws.column_dimensions['A'].width = 20
+    for row in _summary_rows(data['summary']):
+        summary_ws.append(row)
+    if os.path.dirname(output_path):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    wb.save(output_path)
+    print(f"Match report exported to: {output_path}")
+    return data
+
+
+def write_groups_sheet(ws, groups: List[CoffeeGroup]):
+    """Write a table of groups to a worksheet"""
     header_font = Font(bold=True)
     border = Border(
         left=Side(style='thin'),
@@ -384,47 +655,16 @@ def quick_export_matches(groups: List[CoffeeGroup], output_path: str):
         bottom=Side(style='thin')
     )
     
-    for col, header in enumerate(headers, 1):
+    for col, header in enumerate(GROUP_HEADERS, 1):
         cell = ws.cell(row=1, column=col)
         cell.value = header
         cell.font = header_font
         cell.border = border
     
     # Add data
-    for idx, group in enumerate(groups, 1):
-        if not group.captain:
-            continue
-            
-        row = idx + 1
-        
-        ws.cell(row=row, column=1, value=f"Group {idx}")
-        ws.cell(row=row, column=2, value=f"{group.captain['name']} ({group.captain['timezone']})")
-        ws.cell(row=row, column=3, value=f"{group.captain['department']}")
-        
-        other_members = [f"{m['name']} ({m['timezone']})" for m in group.members if m != group.captain]
-        ws.cell(row=row, column=4, value="\n".join(other_members))
-        
-        member_depts = [f"{m['name']}: {m['department']}" for m in group.members if m != group.captain]
-        ws.cell(row=row, column=5, value="\n".join(member_depts))
-        
-        if group.optimal_meeting_time is not None:
-            ws.cell(row=row, column=6, value=f"{group.optimal_meeting_time:02d}:00 UTC")
-        
-        utc_hours = []
-        for member in group.members:
-            member_utc_hours = set()
-            for hour, status in member['availability'].items():
-                if status == 'Y':
-                    utc_hour = convert_local_to_utc(hour, member['timezone'])
-                    if utc_hour is not None:
-                        member_utc_hours.add(utc_hour)
-            time_ranges = generate_time_ranges(sorted(member_utc_hours))
-            utc_hours.append(f"{member['name']}: {time_ranges}")
-            
-        ws.cell(row=row, column=7, value="\n".join(utc_hours))
-
-        for col in range(1, 8):
-            cell = ws.cell(row=row, column=col)
+    for row, values in enumerate(build_report_data(groups)['groups'], 2):
+        for col, value in enumerate(values, 1):
+            cell = ws.cell(row=row, column=col, value=value)
             cell.border = border
             cell.alignment = Alignment(wrapText=True, vertical='center')
 
@@ -439,7 +679,3 @@ def quick_export_matches(groups: List[CoffeeGroup], output_path: str):
                               max(len(line) for line in str(cell.value).split('\n')))
                 ws.row_dimensions[cell.row].height = max(15 * lines, 20)
         ws.column_dimensions[column[0].column_letter].width = max_length + 2
-    
-    # Save the file
-    wb.save(output_path)
-    print(f"Match results exported to: {output_path}")
\ No newline at end of file
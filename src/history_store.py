@@ -0,0 +1,169 @@
+"""
+Storage interface for captain and meeting history.
+
+GroupMatcher, SeasonPlanner and the constraint compiler only talk to a
+HistoryStore, so the backend can be swapped:
+
+    CaptainHistoryDB  - SQLite file (src/captain_history.py), the default
+    InMemoryHistory   - plain dicts, for tests, simulations and multi-start
+                        search where nothing should touch the filesystem
+    ReadOnlyHistory   - reads another store but never writes to it, for trial
+                        runs that must see real history (see src/anytime.py)
+"""
+
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+# (captain_id, group_member_ids, meeting_time)
+Meeting = Tuple[str, List[str], str]
+
+
+class HistoryStore(ABC):
+    """Captain counts and meeting history, whatever the backend"""
+
+    @abstractmethod
+    def get_captain_stats(self, employee_id: str) -> Optional[Tuple[int, str]]:
+        """Captain count and last captain date for an employee, or None if unknown"""
+
+    @abstractmethod
+    def list_employees(self) -> List[Tuple]:
+        """(employee_id, name, department, captain_count, meetings attended) for everyone,
+        most-captained first"""
+
+    @abstractmethod
+    def get_recent_groups(self, rounds: int) -> List[List[str]]:
+        """Member ID lists of every meeting in the most recent rounds (meeting dates)"""
+
+    @abstractmethod
+    def update_or_create_employee(self, employee_data: Dict) -> None:
+        """Register an employee, or refresh their name and department"""
+
+    @abstractmethod
+    def record_rounds(self, rounds: List[Tuple[Optional[str], List[Meeting]]],
+                      round_ids: Optional[List[str]] = None) -> int:
+        """
+        Record several rounds of meetings, each with its own date, atomically
+
+        Args:
+            rounds: (date, meetings) per round; a None date means now
+            round_ids: Unique ID per round. A round whose ID is already
+                recorded is skipped, so repeating a commit is harmless
+                (defaults to fresh random IDs)
+
+        Returns:
+            int: Number of rounds actually written
+        """
+
+    def record_meeting(self, captain_id: str, group_members: List[str], meeting_time: str) -> None:
+        """Record a new meeting with captain and participants"""
+        self.record_meetings([(captain_id, group_members, meeting_time)])
+
+    def record_meetings(self, meetings: List[Meeting], date: Optional[str] = None,
+                        round_id: Optional[str] = None) -> int:
+        """
+        Record many meetings at once, as one round
+
+        Args:
+            meetings: (captain_id, group_member_ids, meeting_time) for each group
+            date: ISO date stored with the meetings (defaults to now)
+            round_id: Makes the write idempotent, see record_rounds
+
+        Returns:
+            int: 1 if the round was written, 0 if it was already recorded
+        """
+        return self.record_rounds([(date, meetings)], [round_id] if round_id else None)
+
+    def close(self) -> None:
+        """Release any resources held by the store"""
+
+
+class InMemoryHistory(HistoryStore):
+    """History kept in dictionaries; nothing is written to disk"""
+
+    def __init__(self):
+        # employee_id -> [name, department, captain_count, last_captain_date, meetings attended]
+        self.employees: Dict[str, list] = {}
+        # (date, captain_id, member_ids, meeting_time) in insertion order
+        self.meetings: List[Tuple[str, str, List[str], str]] = []
+        self.round_ids: Set[str] = set()
+
+    def get_captain_stats(self, employee_id: str) -> Optional[Tuple[int, str]]:
+        record = self.employees.get(employee_id)
+        return (record[2], record[3]) if record else None
+
+    def list_employees(self) -> List[Tuple]:
+        rows = [(employee_id, name, department, captain_count, meetings)
+                for employee_id, (name, department, captain_count, _, meetings) in self.employees.items()]
+        return sorted(rows, key=lambda row: (-row[3], row[1]))
+
+    def get_recent_groups(self, rounds: int) -> List[List[str]]:
+        recent = set(sorted({date for date, _, _, _ in self.meetings}, reverse=True)[:rounds])
+        return [list(members) for date, _, members, _ in self.meetings if date in recent]
+
+    def update_or_create_employee(self, employee_data: Dict) -> None:
+        record = self.employees.get(employee_data['id'])
+        if record is None:
+            self.employees[employee_data['id']] = [employee_data['name'], employee_data['department'], 0, None, 0]
+        else:
+            record[0] = employee_data['name']
+            record[1] = employee_data['department']
+
+    def record_rounds(self, rounds: List[Tuple[Optional[str], List[Meeting]]],
+                      round_ids: Optional[List[str]] = None) -> int:
+        round_ids = round_ids or [uuid.uuid4().hex for _ in rounds]
+        written = 0
+        for (date, meetings), round_id in zip(rounds, round_ids):
+            if round_id in self.round_ids:
+                continue
+            self.round_ids.add(round_id)
+            written += 1
+            date = date or datetime.now().isoformat()
+            for captain_id, group_members, meeting_time in meetings:
+                captain = self.employees.get(captain_id)
+                if captain is not None:
+                    captain[2] += 1
+                    captain[3] = date
+                    captain[4] += 1
+                for member_id in group_members:
+                    record = self.employees.get(member_id)
+                    if record is not None and member_id != captain_id:
+                        record[4] += 1
+                self.meetings.append((date, captain_id, list(group_members), meeting_time))
+        return written
+
+
+class ReadOnlyHistory(HistoryStore):
+    """
+    Read-through view of another store that never writes to it
+
+    Employee registrations and recorded rounds are dropped. Since the view
+    cannot change the underlying data, reads are cached, so repeated trial
+    runs over one roster query the backend once per employee.
+    """
+
+    def __init__(self, store: HistoryStore):
+        self.store = store
+        self._captain_stats: Dict[str, Optional[Tuple[int, str]]] = {}
+        self._recent_groups: Dict[int, List[List[str]]] = {}
+
+    def get_captain_stats(self, employee_id: str) -> Optional[Tuple[int, str]]:
+        if employee_id not in self._captain_stats:
+            self._captain_stats[employee_id] = self.store.get_captain_stats(employee_id)
+        return self._captain_stats[employee_id]
+
+    def list_employees(self) -> List[Tuple]:
+        return self.store.list_employees()
+
+    def get_recent_groups(self, rounds: int) -> List[List[str]]:
+        if rounds not in self._recent_groups:
+            self._recent_groups[rounds] = self.store.get_recent_groups(rounds)
+        return [list(members) for members in self._recent_groups[rounds]]
+
+    def update_or_create_employee(self, employee_data: Dict) -> None:
+        pass
+
+    def record_rounds(self, rounds: List[Tuple[Optional[str], List[Meeting]]],
+                      round_ids: Optional[List[str]] = None) -> int:
+        return 0
@@ -0,0 +1,197 @@
+"""
+Multi-file roster ingestion.
+
+Each department fills in its own copy of the participant template.
+ingest_rosters() takes a directory or a glob of workbooks (.xlsx, template
+layout) and CSV files (same columns), parses them in a process pool and
+merges them into one roster:
+
+    - rows are deduplicated by employee ID, normalised with
+      ExcelTemplateHandler.validate_employee_id
+    - when an employee appears more than once, the row with the latest
+      Start Date wins; rows with equal (or no) dates fall back to the most
+      recently modified file, then to the later row
+    - every dropped row is listed in a conflict report, with the fields that
+      differ from the kept one
+
+The merged roster keeps the order in which employees first appear.
+"""
+
+import contextlib
+import csv
+import glob
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from src.models import Participant
+
+ROSTER_EXTENSIONS = ('.xlsx', '.csv')
+
+# Fields compared between duplicate rows for the conflict report
+COMPARED_FIELDS = ('name', 'email', 'department', 'country', 'timezone', 'start_date',
+                   'availability', 'weekly_availability')
+
+CONFLICT_HEADERS = ["Employee ID", "Kept File", "Kept Start Date", "Dropped File",
+                    "Dropped Start Date", "Reason", "Differing Fields"]
+
+# (path, modification time, participants in file order)
+RosterFile = Tuple[str, float, List[Participant]]
+
+
+def find_roster_files(source: str) -> List[str]:
+    """Workbooks and CSV files in a directory, or matching a glob, in name order"""
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source)]
+    elif glob.has_magic(source):
+        paths = glob.glob(source)
+    else:
+        paths = [source] if os.path.exists(source) else []
+    # Skip Excel's lock files ('~$Roster.xlsx') left by an open workbook
+    return sorted(p for p in paths if os.path.isfile(p) and p.lower().endswith(ROSTER_EXTENSIONS)
+                  and not os.path.basename(p).startswith('~$'))
+
+
+def read_roster_file(path: str) -> RosterFile:
+    """Parse one workbook or CSV file (runs inside a worker process)"""
+    from src.excel_handler import ExcelTemplateHandler
+
+    handler = ExcelTemplateHandler()
+    # The readers report every row; keep worker output from interleaving
+    with contextlib.redirect_stdout(io.StringIO()):
+        if path.lower().endswith('.csv'):
+            participants = handler.read_participants_from_csv(path)
+        else:
+            participants = handler.read_participants_from_excel(path)
+    return path, os.path.getmtime(path), participants
+
+
+def merge_rosters(files: List[RosterFile]) -> Tuple[List[Participant], List[Dict]]:
+    """
+    Merge parsed roster files into one roster, one row per employee
+
+    Returns:
+        (merged participants, conflict report rows as dicts)
+    """
+    kept: Dict[str, Tuple[Tuple, str, Participant]] = {}
+    order: List[str] = []
+    conflicts: List[Dict] = []
+    row = 0
+    for path, mtime, participants in files:
+        for participant in participants:
+            row += 1
+            key = (participant.get('start_date') or '', mtime, row)
+            current = kept.get(participant['id'])
+            if current is None:
+                kept[participant['id']] = (key, path, participant)
+                order.append(participant['id'])
+                continue
+            if key > current[0]:
+                kept[participant['id']] = (key, path, participant)
+                winner, loser = (key, path, participant), current
+            else:
+                winner, loser = current, (key, path, participant)
+            conflicts.append(_conflict(winner, loser))
+    return [kept[employee_id][2] for employee_id in order], conflicts
+
+
+def _conflict(winner: Tuple, loser: Tuple) -> Dict:
+    (kept_key, kept_path, kept), (dropped_key, dropped_path, dropped) = winner, loser
+    if kept_key[0] != dropped_key[0]:
+        reason = "later start date"
+    elif kept_key[1] != dropped_key[1]:
+        reason = "newer file"
+    else:
+        reason = "later row"
+    return {
+        'id': kept['id'],
+        'kept_file': kept_path,
+        'kept_start_date': kept.get('start_date'),
+        'dropped_file': dropped_path,
+        'dropped_start_date': dropped.get('start_date'),
+        'reason': reason,
+        'fields': [f for f in COMPARED_FIELDS if kept.get(f) != dropped.get(f)],
+    }
+
+
+def ingest_rosters(source: str, workers: Optional[int] = None) -> Tuple[List[Participant], List[Dict]]:
+    """
+    Read every roster file in a directory or glob and merge them
+
+    Args:
+        source: Directory, glob pattern (e.g. 'data/rosters/*.xlsx') or a single file
+        workers: Processes used to parse files (defaults to one per file, up to the CPU count)
+
+    Returns:
+        (merged participants, conflict report rows), see merge_rosters
+    """
+    paths = find_roster_files(source)
+    if not paths:
+        print(f"No roster workbooks or CSV files found in {source}")
+        return [], []
+    if workers is None:
+        workers = min(len(paths), os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            files = list(pool.map(read_roster_file, paths))
+    else:
+        files = [read_roster_file(path) for path in paths]
+
+    for path, _, participants in files:
+        print(f"{path}: {len(participants)} participants")
+    merged, conflicts = merge_rosters(files)
+    print(f"Merged {sum(len(f[2]) for f in files)} rows from {len(files)} files into "
+          f"{len(merged)} participants ({len(conflicts)} duplicate rows dropped)")
+    return merged, conflicts
+
+
+def read_roster(source: str) -> List[Participant]:
+    """Read a roster from a workbook, a CSV file, or a directory/glob of them (merged)"""
+    if os.path.isdir(source) or glob.has_magic(source):
+        return ingest_rosters(source)[0]
+    if source.lower().endswith('.csv'):
+        from src.excel_handler import ExcelTemplateHandler
+        return ExcelTemplateHandler().read_participants_from_csv(source)
+    from src.excel_handler import quick_read_participants
+    return quick_read_participants(source)
+
+
+def write_roster_csv(participants: List[dict], output_path: str) -> None:
+    """
+    Write a roster as CSV in the Participants sheet layout, readable by read_roster
+
+    Weekly availability grids have no place in this layout and are not written.
+    """
+    from src.excel_handler import ExcelTemplateHandler
+
+    headers = ExcelTemplateHandler().basic_headers + ["Total Available Hours"] + \
+        [f"{h:02d}:00" for h in range(24)]
+    if os.path.dirname(output_path):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        for p in participants:
+            availability = p['availability']
+            hours = [availability[str(h)] for h in range(24)]
+            writer.writerow([p['id'], p['name'], p.get('email'), p.get('department'), p.get('country'),
+                             p['timezone'], p.get('start_date'), "Active",
+                             sum(1 for status in hours if status != 'N')] + hours)
+    weekly = sum(1 for p in participants if p.get('weekly_availability'))
+    if weekly:
+        print(f"Note: weekly availability of {weekly} participants is not included in {output_path}")
+    print(f"Merged roster written to: {output_path}")
+
+
+def write_conflict_report(conflicts: List[Dict], output_path: str) -> None:
+    """Write the conflict report from merge_rosters as CSV"""
+    if os.path.dirname(output_path):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(CONFLICT_HEADERS)
+        for c in conflicts:
+            writer.writerow([c['id'], c['kept_file'], c['kept_start_date'], c['dropped_file'],
+                             c['dropped_start_date'], c['reason'], ", ".join(c['fields'])])
+    print(f"Conflict report written to: {output_path}")
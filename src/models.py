@@ -1,12 +1,16 @@
 """
 Core data models for the coffee chat matching system.
-Contains TimeRegion and CoffeeGroup classes that define the fundamental structures.
+Contains TimeRegion, Participant and CoffeeGroup classes that define the fundamental structures.
 """
 
 from dataclasses import dataclass
-from typing import List, Dict, Set
+from typing import Any, Iterator, List, Dict, Set, Optional, Tuple
 import random
-from src.utils import convert_local_to_utc, generate_time_ranges # Fixed during review if import statments
+import sys
+from src.utils import (AVAILABLE, DAY_MASK, PREFERRED, SLOTS_PER_WEEK, WEEK_MASK, availability_to_mask,
+                       convert_local_to_utc,
+                       convert_timezone_to_float, day_hours, format_meeting_time, generate_slot_ranges,
+                       generate_time_ranges, mask_to_hours, utc_shift, week_mask, weekly_availability_to_mask)
 
 @dataclass
 class TimeRegion:
@@ -31,37 +35,345 @@ REGIONS = {
     'AMER': TimeRegion('AMER', -12, -2, [14, 15, 16])   # Americas: later UTC hours
 }
 
+def get_region(timezone: str) -> str:
+    """Determine which region a timezone string belongs to (defaults to EMEA)"""
+    try:
+        offset = convert_timezone_to_float(timezone)
+    except ValueError:
+        return 'EMEA'
+    for region_name, region in REGIONS.items():
+        if region.start_utc <= offset <= region.end_utc:
+            return region_name
+    return 'EMEA'  # Default to EMEA if no match
+
+class Participant:
+    """
+    Compact participant record.
+
+    Stores availability as integer masks instead of a 24-entry dict of
+    strings, interns the strings many people share (department, country,
+    timezone) and compares by employee ID, so `member != captain` is a
+    single string comparison.
+
+    Attributes:
+        mask: UTC availability bitmask (bit h set if free at h:00 UTC)
+        local_mask: Local availability bitmask (bit h set if free at local hour h)
+        offset: Timezone offset in decimal hours
+        week: UTC week bitmask (bit 24 * day + hour) for people who filled in
+            the weekly grid, otherwise None
+        local_week: Local week bitmask matching `week`, or None
+        preferred, local_preferred, week_preferred, local_week_preferred:
+            The same masks restricted to hours marked 'P' (preferred); every
+            preferred hour is also set in the availability masks
+
+    The record also behaves like the participant dicts used before it:
+    p['name'], p.get('country'), p['captain_count'] += 1 and
+    p['availability'] (rebuilt on demand from local_mask) all still work, as
+    does p['weekly_availability'] for people with a weekly grid.
+    Keys other than the standard ones are kept in a small side dict.
+    """
+
+    __slots__ = ('id', 'name', 'email', 'department', 'country', 'timezone',
+                 'captain_count', 'local_mask', 'mask', 'offset', 'local_week', 'week',
+                 'local_preferred', 'preferred', 'local_week_preferred', 'week_preferred', '_extra')
+
+    FIELDS = ('id', 'name', 'email', 'department', 'country', 'timezone', 'captain_count')
+
+    def __init__(self, id: str, name: str, email: Optional[str] = None,
+                 department: Optional[str] = None, country: Optional[str] = None,
+                 timezone: str = 'UTC+00:00', availability: Optional[Dict[str, str]] = None,
+                 captain_count: int = 0, weekly_availability: Optional[Dict[str, str]] = None,
+                 **extra: Any):
+        self.id = id
+        self.name = name
+        self.email = email
+        self.department = _intern(department)
+        self.country = _intern(country)
+        self.timezone = _intern(timezone)
+        self.captain_count = captain_count
+        self._extra = extra or None
+        self._set_availability(availability or {})
+        self._set_weekly(weekly_availability)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Participant':
+        """Build a record from a participant dict (records are returned unchanged)"""
+        if isinstance(data, Participant):
+            return data
+        return cls(**data)
+
+    @classmethod
+    def from_masks(cls, id: str, timezone: str, mask: int, preferred: int = 0,
+                   week: Optional[int] = None, week_preferred: Optional[int] = None,
+                   **fields: Any) -> 'Participant':
+        """
+        Build a record from UTC masks, e.g. read back from a SharedRoster
+
+        Local masks are the UTC masks shifted back by the zone's offset, the
+        inverse of availability_to_mask. Other fields are passed on to the
+        constructor (the name defaults to the ID).
+        """
+        fields.setdefault('name', id)
+        record = cls(id=id, timezone=timezone, **fields)
+        record.mask, record.preferred = mask, preferred
+        # UTC hour (week slot) of local hour 0, the shift availability_to_mask applies
+        shift = convert_local_to_utc('0', record.timezone) or 0
+        record.local_mask = _rotate(mask, -shift, 24)
+        record.local_preferred = _rotate(preferred, -shift, 24)
+        if week is not None:
+            shift = weekly_availability_to_mask({'0': 'Y'}, record.timezone).bit_length() - 1
+            record.week, record.week_preferred = week, week_preferred or 0
+            record.local_week = _rotate(week, -shift, SLOTS_PER_WEEK)
+            record.local_week_preferred = _rotate(record.week_preferred, -shift, SLOTS_PER_WEEK)
+        return record
+
+    def _set_availability(self, availability: Dict[str, str]) -> None:
+        self.local_mask = sum(1 << int(hour) for hour, status in availability.items() if status in AVAILABLE)
+        self.local_preferred = sum(1 << int(hour) for hour, status in availability.items() if status in PREFERRED)
+        self.offset = convert_timezone_to_float(self.timezone)
+        self.mask = availability_to_mask(availability, self.timezone)
+        self.preferred = availability_to_mask(availability, self.timezone, PREFERRED)
+
+    def _set_weekly(self, weekly: Optional[Dict[str, str]]) -> None:
+        if not weekly:
+            self.local_week = self.week = self.local_week_preferred = self.week_preferred = None
+            return
+        self.local_week = sum(1 << int(slot) for slot, status in weekly.items() if status in AVAILABLE)
+        self.local_week_preferred = sum(1 << int(slot) for slot, status in weekly.items() if status in PREFERRED)
+        self.week = weekly_availability_to_mask(weekly, self.timezone)
+        self.week_preferred = weekly_availability_to_mask(weekly, self.timezone, PREFERRED)
+
+    @property
+    def availability(self) -> Dict[str, str]:
+        """Local hour ('0'-'23') to 'Y'/'P'/'N'; a fresh dict, assign it back to change availability"""
+        return {str(h): _status(self.local_mask, self.local_preferred, h) for h in range(24)}
+
+    @property
+    def weekly_availability(self) -> Optional[Dict[str, str]]:
+        """Local week slot ('0'-'167') to 'Y'/'P'/'N', or None without a weekly grid"""
+        if self.local_week is None:
+            return None
+        return {str(s): _status(self.local_week, self.local_week_preferred, s) for s in range(SLOTS_PER_WEEK)}
+
+    @property
+    def week_mask(self) -> int:
+        """UTC week mask: the weekly grid if given, else the daily mask on every day"""
+        return self.week if self.week is not None else week_mask(self.mask)
+
+    @property
+    def preferred_week_mask(self) -> int:
+        """UTC week mask of preferred hours, like week_mask"""
+        return self.week_preferred if self.week is not None else week_mask(self.preferred)
+
+    # ------------------------------------------------------------------
+    # Dict adapter
+    # ------------------------------------------------------------------
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        if key == 'availability':
+            return self.availability
+        if key == 'weekly_availability' and self.local_week is not None:
+            return self.weekly_availability
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key == 'availability':
+            self._set_availability(value)
+        elif key == 'weekly_availability':
+            self._set_weekly(value)
+        elif key == 'timezone':
+            availability, weekly = self.availability, self.weekly_availability
+            self.timezone = _intern(value)
+            self._set_availability(availability)
+            self._set_weekly(weekly)
+        elif key in self.FIELDS:
+            setattr(self, key, _intern(value) if key in ('department', 'country') else value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return (key in self.FIELDS or key == 'availability'
+                or (key == 'weekly_availability' and self.local_week is not None)
+                or bool(self._extra and key in self._extra))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def keys(self) -> List[str]:
+        weekly = ['weekly_availability'] if self.local_week is not None else []
+        return list(self.FIELDS) + ['availability'] + weekly + list(self._extra or ())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_dict(self) -> Dict:
+        """Plain participant dict, e.g. for JSON output"""
+        return dict(self.items())
+
+    def copy(self) -> 'Participant':
+        return Participant(**self.to_dict())
+
+    # ------------------------------------------------------------------
+    # Identity
+    # ------------------------------------------------------------------
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if isinstance(other, Participant):
+            return self.id == other.id
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __repr__(self) -> str:
+        return f"Participant(id={self.id!r}, name={self.name!r}, timezone={self.timezone!r})"
+
+
+_FIELD_SET = frozenset(Participant.FIELDS)
+
+
+def _status(mask: int, preferred: int, bit: int) -> str:
+    if preferred >> bit & 1:
+        return 'P'
+    return 'Y' if mask >> bit & 1 else 'N'
+
+
+def _rotate(mask: int, shift: int, width: int) -> int:
+    """Rotate a width-bit mask left by shift bits (right when negative)"""
+    shift %= width
+    full = (1 << width) - 1
+    return ((mask << shift) | (mask >> (width - shift))) & full
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def utc_mask(participant, weekly: bool = False) -> int:
+    """
+    UTC availability mask of a Participant or a plain participant dict
+
+    With weekly=True the 168-slot week mask is returned; people without a
+    weekly grid are free at their daily hours on every day.
+    """
+    if isinstance(participant, Participant):
+        return participant.week_mask if weekly else participant.mask
+    daily = availability_to_mask(participant['availability'], participant['timezone'])
+    if not weekly:
+        return daily
+    grid = participant.get('weekly_availability')
+    return weekly_availability_to_mask(grid, participant['timezone']) if grid else week_mask(daily)
+
+
+def refresh_offsets(participants: List[dict]) -> int:
+    """
+    Re-resolve timezone offsets for the current round date (utils.set_round_date)
+
+    Participants resolve their zone once, when built. Records whose IANA
+    zone has a different offset on the round date (a DST switch in between)
+    get their masks rebuilt; fixed 'UTC±HH:MM' zones never change.
+
+    Returns:
+        int: Number of participants updated
+    """
+    changed = 0
+    for participant in participants:
+        if isinstance(participant, Participant) and \
+                convert_timezone_to_float(participant.timezone) != participant.offset:
+            participant['timezone'] = participant.timezone
+            changed += 1
+    return changed
+
+
+def preferred_mask(participant, weekly: bool = False) -> int:
+    """UTC mask of the hours a participant marked 'P' (preferred), like utc_mask"""
+    if isinstance(participant, Participant):
+        return participant.preferred_week_mask if weekly else participant.preferred
+    daily = availability_to_mask(participant['availability'], participant['timezone'], PREFERRED)
+    if not weekly:
+        return daily
+    grid = participant.get('weekly_availability')
+    return weekly_availability_to_mask(grid, participant['timezone'], PREFERRED) if grid else week_mask(daily)
+
+
+def is_weekly(participant) -> bool:
+    """Whether a participant filled in the weekly grid"""
+    if isinstance(participant, Participant):
+        return participant.week is not None
+    return bool(participant.get('weekly_availability'))
+
+
 class CoffeeGroup:
     """
     Represents a group of participants who will meet for coffee chat.
     Handles availability matching, captain assignment, and meeting time selection.
     """
     
-    def __init__(self, members: List[dict], min_overlap_hours: int = 2):
+    def __init__(self, members: List[dict], min_overlap_hours: int = 2,
+                 rng: Optional[random.Random] = None, captain: Optional[dict] = None,
+                 weekly: Optional[bool] = None):
         """
         Initialize a coffee chat group.
         
         Args:
             members: List of participant dictionaries
             min_overlap_hours: Minimum required overlapping hours for valid group
+            rng: Random generator used for captain tie-breaks (defaults to the
+                global random module)
+            captain: Member already chosen as captain (e.g. when a group is
+                rebuilt); their captain_count is not incremented again
+            weekly: Match on 168-slot week masks, so common_hours and the
+                meeting time are week slots (defaults to whether any member
+                has a weekly grid; pass the roster's mode to keep it uniform)
         """
         self.members = members
+        self.weekly = any(is_weekly(m) for m in members) if weekly is None else weekly
         self.min_overlap_hours = min_overlap_hours
+        self.rng = rng if rng is not None else random
+        self.common_mask = 0  # AND of the members' week masks, set for weekly groups
         self.common_hours = self.find_common_hours()
         self.captain = None
         if self.is_valid_group():
             self.optimal_meeting_time = self.find_optimal_meeting_time()
-            self.captain = self.assign_captain()
+            self.captain = captain if captain is not None else self.assign_captain()
             if self.captain:
                 self.generate_captain_message()
 
     def find_common_hours(self) -> Set[int]:
         """Find hours when all group members are available"""
+        if self.weekly:
+            mask = WEEK_MASK
+            for member in self.members:
+                mask &= utc_mask(member, weekly=True)
+            self.common_mask = mask
+            return set(mask_to_hours(mask))
+        if self.members and all(isinstance(m, Participant) for m in self.members):
+            mask = (1 << 24) - 1
+            for member in self.members:
+                mask &= member.mask
+            return set(mask_to_hours(mask))
         all_available_hours = []
         for member in self.members:
             member_utc_hours = set()
             for hour, status in member['availability'].items():
-                if status == 'Y':
+                if status in AVAILABLE:
                     utc_hour = convert_local_to_utc(hour, member['timezone'])
                     if utc_hour is not None:
                         member_utc_hours.add(utc_hour)
@@ -73,13 +385,41 @@ class CoffeeGroup:
 
     def is_valid_group(self) -> bool:
         """Check if group has enough overlapping hours"""
+        if self.weekly:
+            # Enough hours on a single day, not spread over the week
+            return day_hours(self.common_mask) >= self.min_overlap_hours
         return len(self.common_hours) >= self.min_overlap_hours
 
+    def meeting_slots(self) -> List[int]:
+        """
+        Common hours a meeting may be placed in, in order
+
+        For weekly groups only slots on days with enough common hours count,
+        the days the group was matched on.
+        """
+        hours = sorted(self.common_hours)
+        if self.weekly:
+            mask = self.common_mask
+            days = {shift for shift in range(0, SLOTS_PER_WEEK, 24)
+                    if day_hours(mask >> shift & DAY_MASK) >= self.min_overlap_hours}
+            hours = [s for s in hours if s - s % 24 in days] or hours
+        return hours
+
     def find_optimal_meeting_time(self) -> int:
         """Find best meeting time based on common availability"""
         if not self.common_hours:
             return None
-        return min(self.common_hours)  # Start with earliest common hour
+        hours = self.meeting_slots()
+        preferred = [preferred_mask(m, self.weekly) for m in self.members]
+        if any(preferred):
+            # The hour most members marked as preferred, earliest on ties
+            return max(hours, key=lambda h: sum(p >> h & 1 for p in preferred))
+        return hours[0]  # Start with earliest common hour
+
+    @property
+    def meeting_time_label(self) -> Optional[str]:
+        """Meeting time as shown to people, e.g. '09:00 UTC' or 'Tue 09:00 UTC'"""
+        return format_meeting_time(getattr(self, 'optimal_meeting_time', None), self.weekly)
 
     def assign_captain(self):
         """Assign a captain, preferring those who haven't been captain before"""
@@ -89,7 +429,7 @@ class CoffeeGroup:
         # Select captain with lowest captain_count
         min_count = min(m['captain_count'] for m in self.members)
         eligible_captains = [m for m in self.members if m['captain_count'] == min_count]
-        captain = random.choice(eligible_captains)
+        captain = self.rng.choice(eligible_captains)
         captain['captain_count'] += 1
         return captain
 
@@ -108,6 +448,12 @@ class CoffeeGroup:
         
         # Calculate and add available time ranges
         message.append("\nAvailable time ranges (local time):")
+        if self.weekly:
+            for member in self.members:
+                offset = utc_shift(convert_timezone_to_float(member['timezone']))
+                local_slots = [(slot + offset) % SLOTS_PER_WEEK for slot in self.common_hours]
+                message.append(f"{member['name']}: {generate_slot_ranges(local_slots)}")
+            return "\n".join(message)
         for member in self.members:
             local_hours = []
             for utc_hour in self.common_hours:
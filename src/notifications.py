@@ -0,0 +1,267 @@
+"""
+Email notifications for committed groups.
+
+Sending is split in two so a crash never resends a message:
+
+    Outbox.enqueue_groups()  one message per group member (the captain gets
+                             the captain message) is stored in the outbox
+                             table of captain_history.db. Message IDs derive
+                             from the round ID and employee ID, so enqueueing
+                             a round twice adds nothing.
+    dispatch()               an asyncio stage that sends pending messages over
+                             a small pool of persistent SMTP connections, at
+                             a configurable rate, retrying transient failures
+                             with exponential backoff. Each message is marked
+                             sent right after the server accepts it, so a
+                             restarted dispatch carries on where it stopped.
+
+smtplib is blocking, so every connection runs its commands in a worker
+thread of its own while the event loop schedules sends and rate limiting.
+Each outcome is written to the outbox by one more thread before that
+connection takes its next message, so a crash can resend at most the
+messages whose write was still in flight. Tens of thousands of
+messages go out over `connections` sockets rather than one per email.
+"""
+
+import asyncio
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from src.models import CoffeeGroup
+
+CAPTAIN_SUBJECT = "You are this round's coffee chat captain"
+MEMBER_SUBJECT = "Your coffee chat group"
+
+# (message_id, recipient, subject, body)
+OutboxMessage = Tuple[str, str, str, str]
+
+
+class SMTPSettings(NamedTuple):
+    """Where and how to deliver mail"""
+    host: str = "localhost"
+    port: int = 25
+    sender: str = "coffee-chats@localhost"
+    username: Optional[str] = None
+    password: Optional[str] = None
+    starttls: bool = False
+    timeout: float = 30.0
+
+    def connect(self) -> smtplib.SMTP:
+        """Open and authenticate one connection (blocking)"""
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                conn.starttls()
+            if self.username:
+                conn.login(self.username, self.password or "")
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+
+def member_message(group: CoffeeGroup, member: dict) -> str:
+    """Notification text for a group member who is not the captain"""
+    others = [m for m in group.members if m['id'] != member['id']]
+    lines = [f"Hello {member['name']},", "",
+             "You have been matched for this round of coffee chats with:"]
+    lines += [f"- {m['name']} ({m['timezone']})" for m in others]
+    lines += ["", f"Suggested meeting time: {group.meeting_time_label}",
+              f"Your captain, {group.captain['name']}, will send the invite."]
+    return "\n".join(lines)
+
+
+class Outbox:
+    """Notification queue stored next to the captain history"""
+
+    def __init__(self, db):
+        """
+        Args:
+            db: CaptainHistoryDB holding the outbox table (a persistent
+                connection is much faster for large dispatches)
+        """
+        self.db = db
+
+    def enqueue_groups(self, groups: List[CoffeeGroup], round_id: str) -> int:
+        """
+        Queue one message per member of every group with a captain
+
+        Returns:
+            int: Messages added (members without an email address are skipped)
+        """
+        rows = []
+        skipped = 0
+        for group in groups:
+            if not group.captain:
+                continue
+            for member in group.members:
+                if not member.get('email'):
+                    skipped += 1
+                    continue
+                if member['id'] == group.captain['id']:
+                    subject = CAPTAIN_SUBJECT
+                    body = (f"{group.generate_captain_message().strip()}\n\n"
+                            f"Suggested meeting time: {group.meeting_time_label}")
+                else:
+                    subject, body = MEMBER_SUBJECT, member_message(group, member)
+                rows.append((f"{round_id}:{member['id']}", round_id, member['id'], member['email'],
+                             subject, body))
+
+        added = self.db.enqueue_messages(rows)
+        if skipped:
+            print(f"Skipped {skipped} group members without an email address")
+        print(f"Queued {added} notifications for round {round_id}")
+        return added
+
+    def pending(self, limit: Optional[int] = None) -> List[OutboxMessage]:
+        """Messages not yet sent or given up on, oldest first"""
+        return self.db.pending_messages(limit)
+
+    def counts(self) -> Dict[str, int]:
+        """Number of messages per status"""
+        return self.db.message_counts()
+
+    def update(self, updates: List[Tuple[str, str, Optional[str]]]) -> None:
+        """Record (message_id, status, error) for a batch of send attempts, in one transaction"""
+        self.db.update_messages(updates)
+
+    def retry_failed(self) -> int:
+        """Put messages that were given up on back in the queue. Returns how many"""
+        return self.db.retry_failed_messages()
+
+
+class RateLimiter:
+    """Token bucket shared by the sending tasks: `rate` messages per second, bursts of up to `burst`"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def is_permanent(error: Exception) -> bool:
+    """Whether retrying cannot help (the server rejected the sender, a recipient or the content)"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+def build_email(message: OutboxMessage, sender: str) -> EmailMessage:
+    message_id, recipient, subject, body = message
+    email = EmailMessage()
+    email['From'] = sender
+    email['To'] = recipient
+    email['Subject'] = subject
+    # Stable per outbox row, so a duplicate delivery is recognisable as one
+    email['Message-ID'] = f"<{message_id.replace(':', '.')}@coffee-chats>"
+    email.set_content(body)
+    return email
+
+
+async def _record(outbox: Outbox, executor: ThreadPoolExecutor, message_id: str,
+                  status: str, error: Optional[str] = None) -> None:
+    """Write one send outcome in the database thread, so its lock retries never block the event loop"""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(executor, outbox.update, [(message_id, status, error)])
+
+
+async def _sender(queue: asyncio.Queue, outbox: Outbox, settings: SMTPSettings,
+                  executor: ThreadPoolExecutor, db_executor: ThreadPoolExecutor, limiter: Optional[RateLimiter],
+                  max_retries: int, backoff: float, stats: Dict[str, int]) -> None:
+    """One persistent connection working through the shared queue"""
+    loop = asyncio.get_running_loop()
+    conn: Optional[smtplib.SMTP] = None
+    try:
+        while not queue.empty():
+            message = queue.get_nowait()
+            email = build_email(message, settings.sender)
+            for attempt in range(max_retries + 1):
+                if limiter is not None:
+                    await limiter.acquire()
+                try:
+                    if conn is None:
+                        conn = await loop.run_in_executor(executor, settings.connect)
+                        stats['connections'] += 1
+                    await loop.run_in_executor(executor, conn.send_message, email)
+                except smtplib.SMTPAuthenticationError:
+                    raise  # no message can go out, stop the whole dispatch
+                except (smtplib.SMTPException, OSError) as e:
+                    permanent = is_permanent(e)
+                    if not permanent and conn is not None:
+                        # The connection may be unusable; open a fresh one for the retry
+                        await loop.run_in_executor(executor, conn.close)
+                        conn = None
+                    if permanent or attempt == max_retries:
+                        await _record(outbox, db_executor, message[0], 'failed', str(e))
+                        stats['failed'] += 1
+                        break
+                    await _record(outbox, db_executor, message[0], 'pending', str(e))
+                    stats['retried'] += 1
+                    await asyncio.sleep(backoff * 2 ** attempt)
+                else:
+                    # Marked sent before the next message, to keep the resend window to this write
+                    await _record(outbox, db_executor, message[0], 'sent')
+                    stats['sent'] += 1
+                    break
+    finally:
+        if conn is not None:
+            try:
+                await loop.run_in_executor(executor, conn.quit)
+            except (smtplib.SMTPException, OSError):
+                conn.close()
+
+
+async def dispatch(outbox: Outbox, settings: SMTPSettings, connections: int = 4,
+                   rate: Optional[float] = None, max_retries: int = 3, backoff: float = 1.0,
+                   limit: Optional[int] = None) -> Dict[str, int]:
+    """
+    Send every pending outbox message
+
+    Args:
+        outbox: Queue to drain
+        settings: SMTP server and credentials
+        connections: Persistent connections (and sending tasks) to use
+        rate: Most messages per second across all connections (None: unlimited)
+        max_retries: Retries of a message after transient failures
+        backoff: Delay before the first retry in seconds, doubled on each retry
+        limit: Send at most this many messages
+
+    Returns:
+        Dict with 'sent', 'failed', 'retried' and 'connections' counts
+    """
+    pending = outbox.pending(limit)
+    stats = {'sent': 0, 'failed': 0, 'retried': 0, 'connections': 0}
+    if not pending:
+        return stats
+    queue: asyncio.Queue = asyncio.Queue()
+    for message in pending:
+        queue.put_nowait(message)
+    limiter = RateLimiter(rate, burst=connections) if rate else None
+    workers = min(connections, len(pending))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="smtp") as executor, \
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="outbox") as db_executor:
+        await asyncio.gather(*[_sender(queue, outbox, settings, executor, db_executor, limiter,
+                                       max_retries, backoff, stats) for _ in range(workers)])
+    return stats
+
+
+def send_pending(outbox: Outbox, settings: SMTPSettings, **options) -> Dict[str, int]:
+    """Run dispatch() to completion from synchronous code"""
+    stats = asyncio.run(dispatch(outbox, settings, **options))
+    print(f"Sent {stats['sent']} notifications over {stats['connections']} connections "
+          f"({stats['failed']} failed, {stats['retried']} retries)")
+    return stats
@@ -0,0 +1,191 @@
+"""
+Rescue pass for participants left unmatched by the main matching loop.
+
+For each unmatched person the compatibility index is used to find the
+cheapest fix, in this order:
+
+1. join   - add them to an existing group that has room (a pair becomes a trio)
+2. swap   - take the place of a group member who can be placed elsewhere
+            (in another group with room, or paired with another unmatched person)
+3. relax  - pair them with another unmatched person at a reduced
+            min_overlap_hours
+
+Fixes that form a new pair are skipped when min_group_size is above 2.
+
+The pass works on participant positions and precomputed masks only. It is
+bounded by a wall-clock budget, and it returns a structured report of every
+change it made.
+"""
+
+import time
+from typing import Dict, List, Optional, Set
+
+from src.compatibility import CompatibilityIndex
+
+
+class RescuePass:
+    """Repairs a grouping in place so fewer participants are left out"""
+
+    def __init__(self, index: CompatibilityIndex, max_group_size: int = 3,
+                 relaxed_overlap_hours: Optional[int] = None, time_budget: float = 1.0,
+                 constraints=None, min_group_size: int = 2):
+        """
+        Args:
+            index: Compatibility index the groups were built from
+            max_group_size: Groups are never grown beyond this size
+            relaxed_overlap_hours: Overlap accepted for last-resort pairs
+                (defaults to one hour less than the index minimum)
+            time_budget: Seconds allowed for the whole pass
+            constraints: Optional CompiledConstraints every changed group must satisfy
+            min_group_size: Smallest group allowed; new pairs are only formed
+                when it is at most 2
+        """
+        self.index = index
+        self.constraints = constraints
+        self.min_group_size = min_group_size
+        self.max_group_size = max_group_size
+        self.relaxed_overlap_hours = (relaxed_overlap_hours if relaxed_overlap_hours is not None
+                                      else max(1, index.min_overlap_hours - 1))
+        self.time_budget = time_budget
+        self.groups: List[List[int]] = []
+        self.changed: Set[int] = set()
+        self.relaxed: Set[int] = set()
+
+    def run(self, groups: List[List[int]], unmatched: List[int]) -> List[Dict]:
+        """
+        Try to place every unmatched participant
+
+        Args:
+            groups: Member positions of each group; modified in place and
+                extended with any new groups
+            unmatched: Positions of participants not in any group
+
+        Returns:
+            List[Dict]: One entry per unmatched participant with 'id', 'action'
+            ('joined', 'swapped', 'paired_with_displaced', 'paired',
+            'relaxed_pair' or 'unresolved'), 'group' (index into groups), 'displaced' and
+            'overlap_hours'
+        """
+        index = self.index
+        self.groups = groups
+        self.changed = set()
+        self.relaxed = set()
+        self.group_of = {m: gi for gi, members in enumerate(groups) for m in members}
+        self.group_masks = [index.common_mask(members) for members in groups]
+        self.waiting = set(unmatched)
+        deadline = time.perf_counter() + self.time_budget
+
+        report = []
+        # Hardest to place first: they have the fewest ways to be rescued
+        for u in sorted(unmatched, key=lambda i: (index.degree(i), i)):
+            if u not in self.waiting:
+                continue
+            if time.perf_counter() > deadline:
+                report.append(self._entry(u, 'unresolved', reason="time budget exhausted"))
+                continue
+            entries = self._join(u) or self._swap(u) or self._relaxed_pair(u)
+            if entries:
+                report.extend(entries)
+            else:
+                report.append(self._entry(u, 'unresolved', reason="no compatible group or partner"))
+        return report
+
+    # ------------------------------------------------------------------
+    def _entry(self, u: int, action: str, group: Optional[int] = None,
+               displaced: Optional[int] = None, reason: str = "") -> Dict:
+        participants = self.index.participants
+        overlap = self.index.count_hours(self.group_masks[group]) if group is not None else 0
+        return {
+            'id': participants[u]['id'],
+            'name': participants[u].get('name'),
+            'action': action,
+            'group': group,
+            'displaced': participants[displaced]['id'] if displaced is not None else None,
+            'overlap_hours': overlap,
+            'reason': reason
+        }
+
+    def _candidate_groups(self, u: int) -> List[int]:
+        """Groups containing at least one compatible partner of u (no other group can accept u)"""
+        return sorted({self.group_of[n] for n in self.index.neighbors[u] if n in self.group_of})
+
+    def _set_members(self, gi: int, members: List[int]) -> None:
+        if gi == len(self.groups):
+            self.groups.append(members)
+            self.group_masks.append(0)
+        self.groups[gi] = members
+        self.group_masks[gi] = self.index.common_mask(members)
+        for m in members:
+            self.group_of[m] = gi
+            self.waiting.discard(m)
+        self.changed.add(gi)
+
+    def _fits(self, mask: int, person: int) -> bool:
+        return self.index.count_hours(mask & self.index.masks[person]) >= self.index.min_overlap_hours
+
+    def _allowed(self, members: List[int]) -> bool:
+        return self.constraints is None or self.constraints.group_allowed(members)
+
+    def _join(self, u: int) -> List[Dict]:
+        options = [gi for gi in self._candidate_groups(u)
+                   if len(self.groups[gi]) < self.max_group_size
+                   and self._fits(self.group_masks[gi], u)
+                   and self._allowed(self.groups[gi] + [u])]
+        if not options:
+            return []
+        mask_u = self.index.masks[u]
+        count_hours = self.index.count_hours
+        # Prefer the smallest group, then the one keeping the most shared hours
+        gi = min(options, key=lambda g: (len(self.groups[g]), -count_hours(self.group_masks[g] & mask_u), g))
+        self._set_members(gi, self.groups[gi] + [u])
+        return [self._entry(u, 'joined', gi)]
+
+    def _swap(self, u: int) -> List[Dict]:
+        index = self.index
+        for gi in self._candidate_groups(u):
+            members = self.groups[gi]
+            for m in members:
+                rest = [x for x in members if x != m]
+                if not self._fits(index.common_mask(rest), u) or not self._allowed(rest + [u]):
+                    continue
+                # Displaced member pairs up with another waiting person...
+                partner = None
+                if self.min_group_size <= 2:
+                    partner = next((v for v in sorted(index.neighbors[m])
+                                    if v in self.waiting and v != u and self._allowed([m, v])), None)
+                if partner is not None:
+                    self._set_members(gi, rest + [u])
+                    new_gi = len(self.groups)
+                    self._set_members(new_gi, [m, partner])
+                    return [self._entry(u, 'swapped', gi, displaced=m),
+                            self._entry(partner, 'paired_with_displaced', new_gi, displaced=m)]
+                # ...or moves to another group with room
+                for gj in self._candidate_groups(m):
+                    if gj != gi and len(self.groups[gj]) < self.max_group_size \
+                            and self._fits(self.group_masks[gj], m) \
+                            and self._allowed(self.groups[gj] + [m]):
+                        self._set_members(gi, rest + [u])
+                        self._set_members(gj, self.groups[gj] + [m])
+                        return [self._entry(u, 'swapped', gi, displaced=m)]
+        return []
+
+    def _relaxed_pair(self, u: int) -> List[Dict]:
+        if self.min_group_size > 2:
+            return []
+        masks = self.index.masks
+        best, best_overlap = None, self.relaxed_overlap_hours - 1
+        for v in sorted(self.waiting):
+            if v == u or not self._allowed([u, v]):
+                continue
+            overlap = self.index.count_hours(masks[u] & masks[v])
+            if overlap > best_overlap:
+                best, best_overlap = v, overlap
+        if best is None:
+            return []
+        gi = len(self.groups)
+        self._set_members(gi, [u, best])
+        action = 'paired'
+        if best_overlap < self.index.min_overlap_hours:
+            self.relaxed.add(gi)
+            action = 'relaxed_pair'
+        return [self._entry(u, action, gi), self._entry(best, action, gi)]
@@ -0,0 +1,202 @@
+"""
+Global meeting-time assignment for the coffee chat matching system.
+
+Runs after groups are formed. Every group gets one UTC hour from its common
+hours so that meetings land in hours their members' regions prefer and no
+single hour gets overloaded. This is solved as one min-cost flow instead of
+a loop over groups:
+
+    source -> group class -> UTC hour -> sink
+
+Groups with identical common hours and member regions are merged into a
+single "class" node whose supply is the number of such groups. That keeps
+the network small (a few hundred nodes at most) however many groups there
+are. Arcs into the sink are split into blocks with rising cost, so load is
+spread across hours. The optional hard cap per hour is enforced by making
+any overflow arc very expensive.
+
+Weekly groups (CoffeeGroup.weekly) have common week slots rather than
+hours. The network then has 168 slot nodes instead of 24, regional
+preferences apply to the hour of each slot, and the cap is per slot.
+"""
+
+import heapq
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from src.models import CoffeeGroup, REGIONS, get_region, preferred_mask
+from src.utils import SLOTS_PER_WEEK
+
+HOURS = 24
+PREFERENCE_WEIGHT = 10   # cost per member meeting outside their region's preferred hours
+PREFERRED_HOUR_WEIGHT = 20  # cost per member meeting outside the hours they marked 'P' (if they marked any)
+LOAD_WEIGHT = 1          # extra cost for each additional block of meetings in one hour
+OVERFLOW_COST = 10 ** 6  # cost of exceeding max_per_hour (only used when unavoidable)
+
+
+class MinCostFlow:
+    """Successive-shortest-path min-cost flow with Dijkstra and node potentials"""
+
+    def __init__(self, num_nodes: int):
+        self.num_nodes = num_nodes
+        # Each arc: [to, capacity, cost, index of reverse arc]
+        self.graph: List[List[list]] = [[] for _ in range(num_nodes)]
+
+    def add_edge(self, u: int, v: int, capacity: int, cost: int) -> Tuple[int, int]:
+        """Add an arc and return a handle for reading its flow later"""
+        self.graph[u].append([v, capacity, cost, len(self.graph[v])])
+        self.graph[v].append([u, 0, -cost, len(self.graph[u]) - 1])
+        return u, len(self.graph[u]) - 1
+
+    def flow_on(self, handle: Tuple[int, int]) -> int:
+        """Flow currently pushed through an arc returned by add_edge"""
+        u, i = handle
+        v, _, _, rev = self.graph[u][i]
+        return self.graph[v][rev][1]
+
+    def solve(self, source: int, sink: int, max_flow: int) -> Tuple[int, int]:
+        """Push up to max_flow units at minimum cost. Returns (flow, cost)"""
+        n = self.num_nodes
+        potential = [0] * n  # all initial costs are non-negative
+        flow = cost = 0
+        while flow < max_flow:
+            dist = [None] * n
+            prev = [None] * n
+            dist[source] = 0
+            heap = [(0, source)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d != dist[u]:
+                    continue
+                for i, (v, capacity, arc_cost, _) in enumerate(self.graph[u]):
+                    if capacity <= 0:
+                        continue
+                    nd = d + arc_cost + potential[u] - potential[v]
+                    if dist[v] is None or nd < dist[v]:
+                        dist[v] = nd
+                        prev[v] = (u, i)
+                        heapq.heappush(heap, (nd, v))
+            if dist[sink] is None:
+                break
+            for v in range(n):
+                if dist[v] is not None:
+                    potential[v] += dist[v]
+
+            # Bottleneck along the path
+            push = max_flow - flow
+            v = sink
+            while v != source:
+                u, i = prev[v]
+                push = min(push, self.graph[u][i][1])
+                v = u
+            v = sink
+            while v != source:
+                u, i = prev[v]
+                arc = self.graph[u][i]
+                arc[1] -= push
+                self.graph[v][arc[3]][1] += push
+                cost += push * arc[2]
+                v = u
+            flow += push
+        return flow, cost
+
+
+def hour_costs(group: CoffeeGroup, regions: Dict = REGIONS, slots: int = HOURS) -> Tuple[int, ...]:
+    """
+    Preference cost of each UTC hour (or week slot) for a group (lower is better)
+
+    Members pay PREFERENCE_WEIGHT outside their region's preferred hours and,
+    when anyone in the group marked hours as 'P', PREFERRED_HOUR_WEIGHT per
+    member who did not mark the hour.
+    """
+    member_regions = [get_region(m['timezone']) for m in group.members]
+    costs = []
+    for hour in range(HOURS):
+        unhappy = sum(1 for r in member_regions if hour not in regions[r].preferred_meeting_times)
+        costs.append(unhappy * PREFERENCE_WEIGHT)
+    costs = costs * (slots // HOURS)
+    preferred = [preferred_mask(m, slots > HOURS) for m in group.members]
+    if any(preferred):
+        for slot in range(slots):
+            costs[slot] += PREFERRED_HOUR_WEIGHT * sum(1 for p in preferred if not p >> slot & 1)
+    return tuple(costs)
+
+
+def assign_meeting_times(groups: List[CoffeeGroup], max_per_hour: Optional[int] = None,
+                         regions: Dict = REGIONS) -> Dict:
+    """
+    Choose a meeting hour for every valid group in one global optimisation
+
+    Args:
+        groups: Formed groups. Each group's optimal_meeting_time is updated in place
+        max_per_hour: Room/VC capacity - most meetings allowed in one UTC hour
+        regions: Region table whose preferred_meeting_times are honoured
+
+    Returns:
+        Dict: 'per_hour' meeting counts, 'preferred' number of groups meeting at an
+        hour every member's region prefers (and every member marked 'P', if any did), and 'over_capacity' groups placed
+        beyond max_per_hour because their hours were full
+    """
+    schedulable = [g for g in groups if g.common_hours]
+    if not schedulable:
+        return {'per_hour': {}, 'preferred': 0, 'over_capacity': 0}
+
+    slots = SLOTS_PER_WEEK if any(g.weekly for g in schedulable) else HOURS
+
+    # Compress groups with the same options into classes
+    classes: Dict[Tuple, List[CoffeeGroup]] = defaultdict(list)
+    for group in schedulable:
+        # Weekly groups only meet on a day they share enough hours (CoffeeGroup.meeting_slots)
+        hours = tuple(group.meeting_slots())
+        costs = hour_costs(group, regions, slots)
+        classes[(hours, tuple(costs[h] for h in hours))].append(group)
+    class_keys = list(classes)
+
+    total = len(schedulable)
+    source = 0
+    first_class = 1
+    first_hour = first_class + len(class_keys)
+    sink = first_hour + slots
+    network = MinCostFlow(sink + 1)
+
+    arcs = {}
+    for c, key in enumerate(class_keys):
+        hours, costs = key
+        network.add_edge(source, first_class + c, len(classes[key]), 0)
+        for hour, cost in zip(hours, costs):
+            arcs[c, hour] = network.add_edge(first_class + c, first_hour + hour, len(classes[key]), cost)
+
+    # Rising cost per block of meetings in an hour spreads load between equally good hours
+    block = max(1, -(-total // slots))
+    capacity = max_per_hour if max_per_hour is not None else total
+    for hour in range(slots):
+        placed = 0
+        level = 0
+        while placed < min(capacity, total):
+            size = min(block, capacity - placed, total - placed)
+            network.add_edge(first_hour + hour, sink, size, level * LOAD_WEIGHT)
+            placed += size
+            level += 1
+        if capacity < total:
+            network.add_edge(first_hour + hour, sink, total - capacity, OVERFLOW_COST)
+
+    network.solve(source, sink, total)
+
+    per_hour = defaultdict(int)
+    preferred = 0
+    for c, key in enumerate(class_keys):
+        hours, costs = key
+        members = iter(classes[key])
+        for hour, cost in zip(hours, costs):
+            for _ in range(network.flow_on(arcs[c, hour])):
+                group = next(members)
+                group.optimal_meeting_time = hour
+                per_hour[hour] += 1
+                if cost == 0:
+                    preferred += 1
+
+    over_capacity = 0
+    if max_per_hour is not None:
+        over_capacity = sum(max(0, count - max_per_hour) for count in per_hour.values())
+    return {'per_hour': dict(sorted(per_hour.items())), 'preferred': preferred,
+            'over_capacity': over_capacity}
@@ -0,0 +1,226 @@
+"""
+Multi-round season planner for the coffee chat matching system.
+
+Plans K rounds (e.g. a quarter of monthly chats) from one compatibility
+graph. Nobody meets the same person twice, and captaincy rotates evenly.
+This is a social-golfer-style design solved greedily round by round. After
+each round its pairs are removed from the graph, and every round is the best
+of several independently seeded attempts. The attempts run in a process
+pool. The roster lives in shared memory (see src/shared_roster.py): workers
+attach to it once, work purely on integer positions, and afterwards only
+receive the list of pairs to exclude. Groups are mapped back to participant
+dicts in the parent.
+
+All rounds are written to the history database in a single transaction and
+exported to one workbook with a sheet per round.
+"""
+
+import random
+import uuid
+from datetime import date, timedelta
+from itertools import combinations
+from typing import List, Optional, Set, Tuple
+
+from src.captain_history import CaptainHistoryDB
+from src.history_store import HistoryStore
+from src.coffee_matching import load_captain_counts
+from src.compatibility import CompatibilityIndex
+from src.constraints import CompiledConstraints, ConstraintSet
+from src.shared_roster import RosterHandle, SharedRoster
+from src.models import CoffeeGroup, refresh_offsets
+from src.scheduling import assign_meeting_times
+from src.utils import at_round_date, derive_seed, round_date_scope
+
+# Compiled rules (and their index) and the shared roster, set once per worker
+_WORKER_RULES: Optional[CompiledConstraints] = None
+_WORKER_ROSTER: Optional[SharedRoster] = None
+
+
+def _use_rules(rules: CompiledConstraints, roster: SharedRoster) -> None:
+    global _WORKER_RULES, _WORKER_ROSTER
+    _WORKER_RULES = rules
+    _WORKER_ROSTER = roster
+
+
+def _init_worker(handle: RosterHandle, min_overlap_hours: int, settings: Tuple) -> None:
+    """Attach to the shared roster (until the worker exits) and rebuild the compiled rules from it"""
+    roster = SharedRoster.attach_worker(handle)
+    forbidden, fixed, max_same, hard, weight, tenure = settings
+    index = CompatibilityIndex.from_masks(roster.masks(), roster.neighbors(min_overlap_hours),
+                                          min_overlap_hours)
+    if forbidden:
+        index = index.without_pairs(forbidden)
+    _use_rules(CompiledConstraints(index, forbidden, fixed, max_same, hard, weight,
+                                   department=roster.department.tolist(), tenure=tenure), roster)
+
+
+def form_round(index: CompatibilityIndex, rng: random.Random,
+               min_group_size: int, max_group_size: int,
+               constraints: Optional[CompiledConstraints] = None) -> List[List[int]]:
+    """Greedily split everyone in the index into compatible groups (positions)"""
+    available = list(range(len(index)))
+    remaining = set(available)
+    # Where each position sits in `available`, so taking one out is O(1) (as in GroupMatcher)
+    slot = list(range(len(index)))
+
+    def take(i: int) -> None:
+        k = slot[i]
+        last = available.pop()
+        if k < len(available):
+            available[k] = last
+            slot[last] = k
+        remaining.discard(i)
+
+    groups = []
+    while len(remaining) >= min_group_size:
+        seed = rng.choice(available)
+        found = None
+        for size in range(min(max_group_size, len(remaining)), min_group_size - 1, -1):
+            found = index.find_group(seed, size, remaining, rng=rng, constraints=constraints)
+            if found:
+                break
+        if found:
+            groups.append(found)
+        for i in found or [seed]:
+            take(i)
+    return groups
+
+
+def _attempt_round(excluded: List[Tuple[int, int]], seed: int,
+                   min_group_size: int, max_group_size: int) -> Tuple[Tuple[int, int, int], List[List[int]]]:
+    """
+    One seeded attempt at a round, run inside a worker process
+
+    Returns the attempt's score and its groups. The score ranks attempts by
+    people matched, then by the lowest soft-rule penalty, then by how evenly
+    captaincy can rotate: groups whose least-experienced member has
+    captained least score best.
+    """
+    index = _WORKER_RULES.index.without_pairs(excluded)
+    # Mentors who already met are paired afresh on what is left of the graph
+    rules = _WORKER_RULES.for_index(index) if _WORKER_RULES.tenure is not None else _WORKER_RULES
+    groups = form_round(index, random.Random(seed), min_group_size, max_group_size, rules)
+    counts = _WORKER_ROSTER.captain_count.tolist()
+    score = (sum(len(g) for g in groups), -sum(rules.penalty(g) for g in groups),
+             -sum(min(counts[i] for i in g) for g in groups))
+    return score, groups
+
+
+class SeasonPlanner:
+    """Plans several rounds of coffee chats at once"""
+
+    def __init__(self, participants: List[dict], rounds: int,
+                 min_group_size: int = 2, max_group_size: int = 3,
+                 db: Optional[HistoryStore] = None, seed: Optional[int] = None,
+                 attempts: int = 4, workers: int = 1,
+                 max_meetings_per_hour: Optional[int] = None,
+                 start_date: Optional[date] = None, interval_days: int = 30,
+                 constraints: Optional[ConstraintSet] = None):
+        """
+        Args:
+            participants: List of participant dictionaries
+            rounds: Number of rounds (K) to plan
+            attempts: Independently seeded attempts per round; the best is kept
+            workers: Processes used to run attempts in parallel
+            start_date: Date of the first round (defaults to today)
+            interval_days: Days between rounds
+            constraints: Rules for every round (takes precedence over the group sizes)
+        """
+        if constraints is None:
+            constraints = ConstraintSet(min_group_size=min_group_size, max_group_size=max_group_size)
+        self.constraints = constraints
+        self.participants = participants
+        self.rounds = rounds
+        self.min_group_size = constraints.min_group_size
+        self.max_group_size = constraints.max_group_size
+        self.db = db if db is not None else CaptainHistoryDB()
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.attempts = max(1, attempts)
+        self.workers = workers
+        self.max_meetings_per_hour = max_meetings_per_hour
+        self.start_date = start_date or date.today()
+        self.interval_days = interval_days
+        self.season: List[List[CoffeeGroup]] = []
+        self.plan_id = None
+        load_captain_counts(self.participants, self.db)
+        # IANA zones resolve on the first round's date while the planner works
+        # (see at_round_date); the graph is shared by every round
+        self.round_date = self.start_date
+        with round_date_scope(self.round_date):
+            refresh_offsets(self.participants)
+            # Availability is computed once; each round only removes pairs that already met
+            self.rules = constraints.compile(
+                CompatibilityIndex(participants, constraints.min_overlap_hours), self.db)
+        self.index = self.rules.index
+
+    def round_dates(self) -> List[str]:
+        return [(self.start_date + timedelta(days=r * self.interval_days)).isoformat()
+                for r in range(self.rounds)]
+
+    @at_round_date
+    def plan(self) -> List[List[CoffeeGroup]]:
+        """Plan every round. Returns one list of groups per round"""
+        met: Set[Tuple[int, int]] = set()
+        rng = random.Random(self.seed)
+        roster = SharedRoster.create(self.participants)
+        pool = None
+        if self.workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                       initargs=(roster.handle, self.rules.min_overlap_hours,
+                                                 self.rules.settings()))
+        else:
+            _use_rules(self.rules, roster)
+
+        try:
+            self.season = []
+            # Round IDs are derived from this, so committing the same plan twice is harmless
+            self.plan_id = uuid.uuid4().hex
+            for r in range(self.rounds):
+                excluded = sorted(met)
+                seeds = [derive_seed(self.seed, 'round', r, 'attempt', a) for a in range(self.attempts)]
+                args = ([excluded] * len(seeds), seeds,
+                        [self.min_group_size] * len(seeds), [self.max_group_size] * len(seeds))
+                results = list(pool.map(_attempt_round, *args)) if pool else list(map(_attempt_round, *args))
+                # Best score wins, the first attempt on ties
+                best = max(results, key=lambda result: result[0])[1]
+
+                round_groups = []
+                for positions in best:
+                    members = [self.participants[i] for i in positions]
+                    # Captain counts carry over between rounds, so captaincy rotates
+                    round_groups.append(CoffeeGroup(members, self.constraints.min_overlap_hours, rng=rng,
+                                                    weekly=self.index.weekly))
+                    met.update(combinations(sorted(positions), 2))
+                # Workers read captain counts straight from shared memory next round
+                roster.captain_count[:] = [p['captain_count'] for p in self.participants]
+                assign_meeting_times(round_groups, self.max_meetings_per_hour)
+                self.season.append(round_groups)
+
+                matched = sum(len(g) for g in best)
+                print(f"Round {r + 1}: {len(best)} groups, {matched}/{len(self.participants)} matched")
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            _use_rules(None, None)
+            roster.close()
+        return self.season
+
+    def commit(self) -> None:
+        """Write every planned round to the history database in one transaction"""
+        rounds = []
+        for round_date, groups in zip(self.round_dates(), self.season):
+            meetings = [(g.captain['id'], [m['id'] for m in g.members], g.meeting_time_label)
+                        for g in groups if g.captain]
+            rounds.append((round_date, meetings))
+        written = self.db.record_rounds(rounds, [f"{self.plan_id}-{r + 1}" for r in range(len(rounds))])
+        print(f"Recorded {written} rounds in captain history")
+        if written < len(rounds):
+            print(f"{len(rounds) - written} rounds of plan {self.plan_id} were already recorded and were skipped")
+
+    @at_round_date
+    def export(self, output_path: str) -> None:
+        """Export all rounds to a single workbook"""
+        from src.excel_handler import export_rounds_to_excel
+        export_rounds_to_excel([(f"Round {r + 1} ({d})", groups) for r, (d, groups)
+                                in enumerate(zip(self.round_dates(), self.season))], output_path)
@@ -0,0 +1,226 @@
+"""
+Long-running matching service for the coffee chat matching system.
+Exposes a small HTTP/JSON API on top of asyncio so other tools can upload a
+roster, run GroupMatcher and fetch results without paying interpreter,
+openpyxl import and roster load costs on every call.
+
+Endpoints:
+    GET  /health            - service status and roster size
+    POST /roster            - upload a roster (JSON participant list or .xlsx bytes)
+    POST /match             - run GroupMatcher on the loaded roster (options may
+                              include a "constraints" config, see src/constraints.py)
+    GET  /groups            - groups from the last match as JSON
+    GET  /export            - groups from the last match as an .xlsx workbook
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from src.captain_history import CaptainHistoryDB
+from src.coffee_matching import GroupMatcher, groups_to_records
+from src.compatibility import CompatibilityIndex
+from src.constraints import ConstraintSet
+from src.models import Participant
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 500: "Internal Server Error"}
+
+
+class MatchingService:
+    """Keeps the parsed roster, compatibility index and history DB warm between requests"""
+
+    def __init__(self, db_path: str = "data/captain_history.db", max_workers: int = 2):
+        self.db = CaptainHistoryDB(db_path, persistent=True)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.participants: List[dict] = []
+        self.index: Optional[CompatibilityIndex] = None
+        self.groups = []
+        self.unmatched: List[Dict] = []
+        self.rescue_report: List[Dict] = []
+        self._match_lock = asyncio.Lock()
+
+    # ------------------------------------------------------------------
+    # Roster and matching (blocking work runs in the executor)
+    # ------------------------------------------------------------------
+    def _load_participants(self, participants: List[dict]) -> None:
+        participants = [Participant.from_dict(p) for p in participants]
+        self.participants = participants
+        self.index = CompatibilityIndex(participants)
+        self.groups = []
+        self.unmatched = []
+
+    def _load_workbook(self, data: bytes) -> List[dict]:
+        from src.excel_handler import quick_read_participants
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            return quick_read_participants(path)
+        finally:
+            os.remove(path)
+
+    def _match(self, min_group_size: int, max_group_size: int, seed: Optional[int],
+               max_per_hour: Optional[int], constraints: Optional[Dict] = None) -> Dict:
+        constraint_set = None
+        if constraints is not None:
+            constraint_set = ConstraintSet.from_dict(constraints)
+        matcher = GroupMatcher(self.participants, min_group_size, max_group_size,
+                               db=self.db, index=self.index, seed=seed,
+                               max_meetings_per_hour=max_per_hour,
+                               constraints=constraint_set)
+        self.groups = matcher.create_groups()
+        self.unmatched = matcher.analyze_unmatched_participants()
+        self.rescue_report = matcher.rescue_report
+        return self.summary()
+
+    def _export(self) -> bytes:
+        from src.excel_handler import export_match_report
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+        try:
+            export_match_report(self.groups, path, participants=self.participants,
+                                unmatched=self.unmatched or None)
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+    def summary(self) -> Dict:
+        """Current roster and match state"""
+        matched = sum(len(g.members) for g in self.groups)
+        return {
+            'participants': len(self.participants),
+            'groups': len(self.groups),
+            'matched': matched,
+            'unmatched': len(self.participants) - matched if self.groups else 0
+        }
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def load_roster(self, body: bytes, content_type: str) -> Dict:
+        async with self._match_lock:
+            if content_type.startswith(XLSX_CONTENT_TYPE):
+                participants = await self._run(self._load_workbook, body)
+            else:
+                participants = json.loads(body or b"{}").get('participants', [])
+            await self._run(self._load_participants, participants)
+            return self.summary()
+
+    async def match(self, options: Dict) -> Dict:
+        async with self._match_lock:
+            return await self._run(self._match,
+                                   int(options.get('min_group_size', 2)),
+                                   int(options.get('max_group_size', 3)),
+                                   options.get('seed'),
+                                   options.get('max_per_hour'),
+                                   options.get('constraints'))
+
+    async def export(self) -> bytes:
+        async with self._match_lock:
+            return await self._run(self._export)
+
+    # ------------------------------------------------------------------
+    # HTTP handling
+    # ------------------------------------------------------------------
+    async def handle_request(self, method: str, path: str, headers: Dict[str, str],
+                             body: bytes) -> Tuple[int, str, bytes]:
+        """Route one request and return (status, content type, body)"""
+        route = (method, path.split('?', 1)[0])
+        try:
+            if route == ("GET", "/health"):
+                return _json(200, dict(self.summary(), status="ok"))
+            if route == ("POST", "/roster"):
+                return _json(200, await self.load_roster(body, headers.get('content-type', '')))
+            if route == ("POST", "/match"):
+                if not self.participants:
+                    return _json(409, {'error': "No roster loaded"})
+                return _json(200, await self.match(json.loads(body or b"{}")))
+            if route == ("GET", "/groups"):
+                return _json(200, {'groups': groups_to_records(self.groups),
+                                   'unmatched': self.unmatched,
+                                   'rescue': self.rescue_report})
+            if route == ("GET", "/export"):
+                if not self.groups:
+                    return _json(409, {'error': "No groups to export"})
+                return 200, XLSX_CONTENT_TYPE, await self.export()
+        except (ValueError, KeyError) as e:
+            return _json(400, {'error': str(e)})
+        if route[1] in ("/health", "/roster", "/match", "/groups", "/export"):
+            return _json(405, {'error': f"{method} not allowed on {route[1]}"})
+        return _json(404, {'error': f"Unknown endpoint {route[1]}"})
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve HTTP/1.1 requests on one connection until the client closes it"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                body = await reader.readexactly(length) if length else b""
+
+                try:
+                    status, content_type, payload = await self.handle_request(method, path, headers, body)
+                except Exception as e:
+                    status, content_type, payload = _json(500, {'error': str(e)})
+
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write((
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                ).encode('latin-1') + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080):
+        """Start the server and run until cancelled"""
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Coffee chat matching service listening on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.db.close()
+
+
+def _json(status: int, data) -> Tuple[int, str, bytes]:
+    return status, "application/json", json.dumps(data).encode('utf-8')
+
+
+def run_service(host: str = "127.0.0.1", port: int = 8080, db_path: str = "data/captain_history.db"):
+    """Run the matching service until interrupted"""
+    service = MatchingService(db_path)
+    try:
+        asyncio.run(service.serve(host, port))
+    except KeyboardInterrupt:
+        print("\nService stopped.")
+
+
+if __name__ == "__main__":
+    run_service()
@@ -0,0 +1,217 @@
+"""
+Shared-memory roster for multiprocess matching.
+
+Worker processes never need names, emails or the 24-key availability dicts,
+only numbers. SharedRoster packs what the solvers use into NumPy arrays
+that live in a single multiprocessing.shared_memory block:
+
+    mask           uint32   UTC availability bitmask (bit h = free at h:00 UTC),
+                            one column per day (7) when the roster is weekly
+    preferred      uint32   the same for hours marked 'P'
+    department     int32    department category code
+    timezone       int32    timezone category code
+    start_day      int32    start date as a proleptic ordinal, 0 if unknown
+    captain_count  int32    times captain so far
+    id             bytes    employee ID
+
+The parent creates the block once and passes workers a small picklable
+RosterHandle. Workers attach without copying (attach_worker() also detaches
+when the worker exits) and either work on integer positions (season) or
+rebuild lightweight Participant records with participants() (simulation,
+seeded runs); positions map back to the parent's participants by index.
+"""
+
+import multiprocessing.util
+from datetime import date
+from multiprocessing import shared_memory
+from typing import Dict, List, NamedTuple, Set, Tuple
+
+import numpy as np
+
+from src.models import Participant, is_weekly, preferred_mask, utc_mask
+from src.utils import DAY_MASK, HOURS_PER_DAY, WEEKDAYS
+
+# (field, dtype, one column per day)
+FIELDS = (
+    ('mask', np.uint32, True),
+    ('preferred', np.uint32, True),
+    ('department', np.int32, False),
+    ('timezone', np.int32, False),
+    ('start_day', np.int32, False),
+    ('captain_count', np.int32, False),
+)
+
+# Number of set bits in every byte value, used to popcount whole arrays at once
+_BYTE_POPCOUNT = np.array([bin(b).count('1') for b in range(256)], dtype=np.uint8)
+
+
+class RosterHandle(NamedTuple):
+    """Everything a worker needs to attach to a shared roster"""
+    name: str
+    size: int
+    departments: Tuple[str, ...]
+    timezones: Tuple[str, ...]
+    days: int = 1      # mask columns: 1 for daily masks, 7 for week masks
+    id_width: int = 8  # bytes per employee ID
+
+
+def category_codes(values: List) -> Tuple[List[int], List]:
+    """Encode values as small integers in order of first appearance"""
+    codes: Dict = {}
+    encoded = [codes.setdefault(v, len(codes)) for v in values]
+    return encoded, list(codes)
+
+
+def _layout(handle: RosterHandle) -> List[Tuple[str, np.dtype, Tuple[int, ...]]]:
+    """Every array in the block, in order; IDs go last so the numeric arrays stay aligned"""
+    arrays = [(field, np.dtype(dtype), (handle.size, handle.days) if per_day else (handle.size,))
+              for field, dtype, per_day in FIELDS]
+    arrays.append(('id', np.dtype(f'S{handle.id_width}'), (handle.size,)))
+    return arrays
+
+
+def _start_day(participant) -> int:
+    start = participant.get('start_date')
+    try:
+        return date.fromisoformat(str(start)[:10]).toordinal() if start else 0
+    except ValueError:
+        return 0
+
+
+def _split_days(masks: List[int], days: int) -> List[List[int]]:
+    return [[m >> (HOURS_PER_DAY * day) & DAY_MASK for day in range(days)] for m in masks]
+
+
+def _join_days(rows: List[List[int]]) -> List[int]:
+    return [sum(day << (HOURS_PER_DAY * d) for d, day in enumerate(row)) for row in rows]
+
+
+class SharedRoster:
+    """NumPy views over a roster stored in shared memory"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, handle: RosterHandle, owner: bool):
+        self.shm = shm
+        self.handle = handle
+        self.owner = owner
+        self.departments = list(handle.departments)
+        self.timezones = list(handle.timezones)
+        offset = 0
+        for field, dtype, shape in _layout(handle):
+            array = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            setattr(self, field, array)
+            offset += array.nbytes
+
+    @classmethod
+    def create(cls, participants: List[dict]) -> 'SharedRoster':
+        """Pack a roster into a new shared memory block (the caller must unlink it)"""
+        size = len(participants)
+        weekly = any(is_weekly(p) for p in participants)
+        days = len(WEEKDAYS) if weekly else 1
+        ids = [str(p['id']).encode('utf-8') for p in participants]
+        departments, department_names = category_codes([p.get('department') for p in participants])
+        timezones, timezone_names = category_codes([p['timezone'] for p in participants])
+        handle = RosterHandle('', size, tuple(department_names), tuple(timezone_names), days,
+                              max((len(i) for i in ids), default=1))
+        nbytes = sum(dtype.itemsize * int(np.prod(shape)) for _, dtype, shape in _layout(handle))
+        shm = shared_memory.SharedMemory(create=True, size=max(1, nbytes))
+        roster = cls(shm, handle._replace(name=shm.name), owner=True)
+        roster.mask[:] = _split_days([utc_mask(p, weekly) for p in participants], days)
+        roster.preferred[:] = _split_days([preferred_mask(p, weekly) for p in participants], days)
+        roster.department[:] = departments
+        roster.timezone[:] = timezones
+        roster.start_day[:] = [_start_day(p) for p in participants]
+        roster.captain_count[:] = [p.get('captain_count', 0) for p in participants]
+        roster.id[:] = ids
+        return roster
+
+    @classmethod
+    def attach(cls, handle: RosterHandle) -> 'SharedRoster':
+        """Attach to a roster created by another process, without copying it"""
+        shm = shared_memory.SharedMemory(name=handle.name)
+        return cls(shm, handle, owner=False)
+
+    @classmethod
+    def attach_worker(cls, handle: RosterHandle) -> 'SharedRoster':
+        """attach() from a pool initializer; the worker detaches again when it exits"""
+        roster = cls.attach(handle)
+        multiprocessing.util.Finalize(roster, roster.close, exitpriority=10)
+        return roster
+
+    def __len__(self) -> int:
+        return self.handle.size
+
+    def masks(self) -> List[int]:
+        """Availability masks as Python ints (168-bit week masks for a weekly roster)"""
+        if self.handle.days == 1:
+            return self.mask[:, 0].tolist()
+        return _join_days(self.mask.tolist())
+
+    def preferred_masks(self) -> List[int]:
+        """Preferred-hour masks, like masks()"""
+        if self.handle.days == 1:
+            return self.preferred[:, 0].tolist()
+        return _join_days(self.preferred.tolist())
+
+    def participants(self) -> List[Participant]:
+        """
+        Participant records rebuilt from the arrays, in roster order
+
+        They carry the ID, timezone, department, start date, captain count
+        and availability; names default to the ID and there are no emails.
+        """
+        weekly = self.handle.days > 1
+        records = []
+        for employee_id, zone, department, start, count, mask, preferred in zip(
+                self.id.tolist(), self.timezone.tolist(), self.department.tolist(),
+                self.start_day.tolist(), self.captain_count.tolist(),
+                self.masks(), self.preferred_masks()):
+            extra = {'start_date': date.fromordinal(start).isoformat()} if start else {}
+            if weekly:
+                records.append(Participant.from_masks(
+                    employee_id.decode('utf-8'), self.timezones[zone], mask & DAY_MASK, preferred & DAY_MASK,
+                    week=mask, week_preferred=preferred, department=self.departments[department],
+                    captain_count=count, **extra))
+            else:
+                records.append(Participant.from_masks(
+                    employee_id.decode('utf-8'), self.timezones[zone], mask, preferred,
+                    department=self.departments[department], captain_count=count, **extra))
+        return records
+
+    def neighbors(self, min_overlap_hours: int, chunk: int = 512) -> List[Set[int]]:
+        """
+        Compatible partners of every participant, computed with vectorised popcounts
+
+        Week masks are compared day by day and the best day counts, like
+        utils.day_hours. Rows are processed in chunks, so memory use stays
+        proportional to chunk x n x days.
+        """
+        size = len(self)
+        masks = self.mask
+        chunk = max(1, chunk // self.handle.days)
+        neighbors: List[Set[int]] = []
+        for start in range(0, size, chunk):
+            block = masks[start:start + chunk, None, :] & masks[None, :, :]
+            overlap = _BYTE_POPCOUNT[block.view(np.uint8)].reshape(block.shape + (4,)).sum(axis=3).max(axis=2)
+            compatible = overlap >= min_overlap_hours
+            for row, i in enumerate(range(start, min(start + chunk, size))):
+                compatible[row, i] = False
+                neighbors.append(set(np.flatnonzero(compatible[row]).tolist()))
+        return neighbors
+
+    def close(self) -> None:
+        """Detach from the block; the creating process also frees it"""
+        # Drop the views first, the buffer cannot be released while they exist
+        if self.shm.buf is None:
+            return  # already closed
+        for field, _, _ in _layout(self.handle):
+            setattr(self, field, None)
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self) -> 'SharedRoster':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
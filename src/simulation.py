@@ -0,0 +1,215 @@
+"""
+What-if simulation for capacity planning.
+
+A scenario is a base roster plus synthetic additions, e.g. "3,000 people join
+in APAC" or "200 more in India". Additions are drawn from the countries and
+timezones in ExcelTemplateHandler.locations, filtered by the REGIONS table.
+Each scenario is matched many times with different seeds. Every run uses a
+fresh in-memory history, so nothing touches captain_history.db. The report
+gives distributions of:
+
+    - matched fraction
+    - group sizes
+    - unmatched causes (and the regions of unmatched people)
+    - meetings per UTC hour
+
+The roster is packed into shared memory once per scenario; each worker
+process rebuilds the participants and the compatibility index from it, with
+vectorised popcounts. Only seeds travel per run, so a sweep of dozens of
+scenarios takes minutes.
+"""
+
+import contextlib
+import io
+import statistics
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from src.coffee_matching import SOLVERS, GroupMatcher
+from src.compatibility import CAUSES, CompatibilityIndex, unmatched_cause
+from src.constraints import ConstraintSet
+from src.history_store import InMemoryHistory
+from src.models import REGIONS, get_region
+from src.shared_roster import RosterHandle, SharedRoster
+from src.synthetic import generate_participants, region_locations
+from src.utils import derive_seed, format_meeting_time
+
+# Roster and index shared with worker processes, set once per worker
+_SIM_STATE: Dict = {}
+
+
+def _load_roster(roster: SharedRoster, min_overlap_hours: int, options: Dict) -> None:
+    """Rebuild participants and the compatibility index from a shared roster"""
+    participants = roster.participants()
+    _SIM_STATE['participants'] = participants
+    _SIM_STATE['index'] = CompatibilityIndex.from_masks(
+        roster.masks(), roster.neighbors(min_overlap_hours), min_overlap_hours,
+        participants, roster.preferred_masks())
+    _SIM_STATE['options'] = options
+
+
+def _init_worker(handle: RosterHandle, min_overlap_hours: int, options: Dict) -> None:
+    """Load the roster once per worker; nothing is kept attached afterwards"""
+    with SharedRoster.attach(handle) as roster:
+        _load_roster(roster, min_overlap_hours, options)
+
+
+def _simulate_run(seed: int) -> Dict:
+    """One seeded matching round against a fresh in-memory history"""
+    participants = _SIM_STATE['participants']
+    index = _SIM_STATE['index']
+    options = _SIM_STATE['options']
+    for p in participants:
+        p['captain_count'] = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        matcher = GroupMatcher(participants, db=InMemoryHistory(), index=index, seed=seed, **options)
+        groups = matcher.create_groups()
+
+    matched = {m['id'] for g in groups for m in g.members}
+    causes = Counter()
+    regions = Counter()
+    # Causes are read off the index the matcher searched (forbidden pairs removed)
+    for i, p in enumerate(participants):
+        if p['id'] not in matched:
+            causes[unmatched_cause(matcher.index, i)] += 1
+            regions[get_region(p['timezone'])] += 1
+    return {
+        'matched': len(matched),
+        'group_sizes': dict(Counter(len(g.members) for g in groups)),
+        'per_hour': matcher.schedule.get('per_hour', {}),
+        'causes': dict(causes),
+        'unmatched_regions': dict(regions),
+    }
+
+
+def build_roster(base: Optional[List[dict]] = None, additions: Optional[Dict[str, int]] = None,
+                 seed: int = 0, locations: Optional[Dict[str, List[str]]] = None) -> List[dict]:
+    """
+    Combine a base roster with synthetic additions
+
+    Args:
+        base: Existing participants (copied, not modified)
+        additions: Headcount to add per region name (a REGIONS key) or country
+            name (a locations key)
+        seed: Seed for the synthetic participants
+        locations: Country to timezones table (defaults to ExcelTemplateHandler.locations)
+
+    Returns:
+        List of participants, base roster first
+    """
+    if locations is None:
+        from src.excel_handler import ExcelTemplateHandler
+        locations = ExcelTemplateHandler().locations
+    roster = [p.copy() for p in base or []]
+    offset = max((int(p['id']) for p in roster if str(p['id']).isdigit()), default=0)
+    for name, count in sorted((additions or {}).items()):
+        if name in REGIONS:
+            countries = region_locations(name, locations)
+        elif name in locations:
+            countries = {name: locations[name]}
+        else:
+            raise ValueError(f"Unknown region or country '{name}'")
+        if not countries:
+            raise ValueError(f"No known timezones in region '{name}'")
+        roster.extend(generate_participants(count, seed=derive_seed(seed, 'scenario', name),
+                                            id_offset=offset, countries=countries))
+        offset += count
+    return roster
+
+
+def _distribution(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    deciles = statistics.quantiles(ordered, n=10) if len(ordered) > 1 else ordered * 9
+    return {
+        'mean': statistics.fmean(ordered),
+        'min': ordered[0],
+        'p10': deciles[0],
+        'p50': statistics.median(ordered),
+        'p90': deciles[-1],
+        'max': ordered[-1],
+    }
+
+
+def simulate(participants: List[dict], runs: int = 20, seed: int = 0, workers: int = 1,
+             min_group_size: int = 2, max_group_size: int = 3, min_overlap_hours: int = 2,
+             max_meetings_per_hour: Optional[int] = None,
+             constraints: Optional[ConstraintSet] = None, solver: str = 'random') -> Dict:
+    """
+    Match a roster many times and summarise the outcomes
+
+    Args:
+        participants: Roster to simulate (captain counts are reset on copies)
+        runs: Number of seeded matching rounds
+        seed: Base seed; run r uses derive_seed(seed, 'run', r)
+        workers: Processes used to run rounds in parallel
+        constraints: Rules for every run; its overlap and group sizes take
+            the place of min_overlap_hours and the group size arguments
+        solver: Seed-selection strategy of every run (see GroupMatcher)
+
+    Returns:
+        Dict with 'participants', 'runs', 'matched_fraction' (distribution),
+        'group_sizes', 'unmatched_causes' and 'unmatched_regions' (mean per run)
+        and 'per_hour' (mean, min and max meetings for every UTC hour)
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"Unknown solver '{solver}', expected one of: {', '.join(SOLVERS)}")
+    if constraints is None:
+        constraints = ConstraintSet(min_overlap_hours, min_group_size, max_group_size)
+    min_overlap_hours = constraints.min_overlap_hours
+    # The index is built at the constraints' overlap, so compiling them reuses it
+    options = {'constraints': constraints, 'max_meetings_per_hour': max_meetings_per_hour, 'solver': solver}
+    seeds = [derive_seed(seed, 'run', r) for r in range(runs)]
+
+    with SharedRoster.create(participants) as shared:
+        _load_roster(shared, min_overlap_hours, options)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(shared.handle, min_overlap_hours, options)) as pool:
+                results = list(pool.map(_simulate_run, seeds))
+        else:
+            results = [_simulate_run(s) for s in seeds]
+    index = _SIM_STATE['index']
+    roster = _SIM_STATE['participants']
+    _SIM_STATE.clear()
+
+    total = len(roster)
+
+    def mean_counts(key: str) -> Dict:
+        keys = sorted({k for r in results for k in r[key]})
+        return {k: sum(r[key].get(k, 0) for r in results) / len(results) for k in keys}
+
+    per_hour = {}
+    for hour in sorted({h for r in results for h in r['per_hour']}):
+        loads = [r['per_hour'].get(hour, 0) for r in results]
+        if any(loads):
+            per_hour[hour] = {'mean': statistics.fmean(loads), 'min': min(loads), 'max': max(loads)}
+    return {
+        'participants': total,
+        'runs': len(results),
+        'matched_fraction': _distribution([r['matched'] / total if total else 0 for r in results]),
+        'group_sizes': mean_counts('group_sizes'),
+        'unmatched_causes': mean_counts('causes'),
+        'unmatched_regions': mean_counts('unmatched_regions'),
+        'per_hour': per_hour,
+        'weekly': index.weekly,
+    }
+
+
+def print_report(name: str, report: Dict) -> None:
+    """Print a simulation report in a compact text form"""
+    fraction = report['matched_fraction']
+    print(f"\n=== {name}: {report['participants']} participants, {report['runs']} runs ===")
+    print("Matched: " + ", ".join(f"{k} {v:.1%}" for k, v in fraction.items()))
+    print("Group sizes (mean per run): " +
+          ", ".join(f"{size}: {count:.1f}" for size, count in report['group_sizes'].items()))
+    if report['unmatched_causes']:
+        print("Unmatched causes (mean per run):")
+        for cause, count in report['unmatched_causes'].items():
+            print(f"  {count:7.1f}  {CAUSES[cause]}")
+        print("Unmatched by region: " +
+              ", ".join(f"{r} {n:.1f}" for r, n in report['unmatched_regions'].items()))
+    print("Meetings per UTC hour (mean [min-max]):")
+    for hour, load in report['per_hour'].items():
+        label = format_meeting_time(hour, report.get('weekly', False), zone=False)
+        print(f"  {label}  {load['mean']:7.1f}  [{load['min']}-{load['max']}]")
@@ -0,0 +1,85 @@
+"""
+Synthetic roster generation for benchmarks and simulations.
+Produces Participant records in the same shape as the Excel reader,
+with availability concentrated around local working hours.
+"""
+
+import random
+from typing import Dict, List, Optional
+
+from src.models import Participant, get_region
+
+# Representative UTC offsets with rough headcount weights
+DEFAULT_TIMEZONES = {
+    "UTC-08:00": 2, "UTC-06:00": 2, "UTC-05:00": 4, "UTC-03:00": 1,
+    "UTC+00:00": 3, "UTC+01:00": 4, "UTC+02:00": 1,
+    "UTC+05:30": 4, "UTC+08:00": 3, "UTC+09:00": 1, "UTC+10:00": 1,
+}
+DEFAULT_DEPARTMENTS = ["Business Intelligence", "Engineering", "Marketing", "Sales", "Finance", "HR"]
+
+
+def generate_participants(count: int, seed: Optional[int] = None,
+                          timezones: Optional[dict] = None,
+                          departments: Optional[List[str]] = None,
+                          id_offset: int = 0,
+                          countries: Optional[Dict[str, List[str]]] = None) -> List[dict]:
+    """
+    Generate a synthetic roster
+
+    Args:
+        count: Number of participants to generate
+        seed: Seed for the generator (same seed gives the same roster)
+        timezones: Mapping of timezone string to relative weight
+        departments: Department names to draw from
+        id_offset: Added to the generated employee numbers so rosters can be combined
+        countries: Mapping of country to its timezones (as in
+            ExcelTemplateHandler.locations). When given, each participant gets a
+            random country and one of its timezones instead of using `timezones`
+
+    Returns:
+        List[Participant]: Participants with 'id', 'name', 'email', 'department',
+        'country', 'timezone', 'availability' and 'captain_count' keys
+    """
+    rng = random.Random(seed)
+    timezones = timezones or DEFAULT_TIMEZONES
+    departments = departments or DEFAULT_DEPARTMENTS
+    zone_names = list(timezones)
+    zone_weights = [timezones[z] for z in zone_names]
+    country_names = sorted(countries) if countries else None
+
+    participants = []
+    for i in range(count):
+        number = id_offset + i + 1
+        # A contiguous block of local working hours, occasionally with a gap
+        start = rng.randint(7, 11)
+        length = rng.randint(3, 8)
+        hours = set(range(start, min(start + length, 24)))
+        if length > 4 and rng.random() < 0.3:
+            hours.discard(rng.choice(sorted(hours)))
+        if country_names:
+            country = rng.choice(country_names)
+            timezone = rng.choice(countries[country])
+        else:
+            country = "Synthetic"
+            timezone = rng.choices(zone_names, weights=zone_weights)[0]
+        participants.append(Participant(
+            id=f"{number:08d}",
+            name=f"Participant {number}",
+            email=f"participant{number}@example.com",
+            department=rng.choice(departments),
+            country=country,
+            timezone=timezone,
+            availability={str(h): 'Y' if h in hours else 'N' for h in range(24)},
+            captain_count=0
+        ))
+    return participants
+
+
+def region_locations(region: str, locations: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Countries with at least one timezone in a region, limited to those timezones"""
+    selected = {}
+    for country, zones in locations.items():
+        in_region = [tz for tz in zones if get_region(tz) == region]
+        if in_region:
+            selected[country] = in_region
+    return selected
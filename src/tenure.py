@@ -0,0 +1,171 @@
+"""
+Tenure roles for mentor/newcomer mixing.
+
+Start dates (the template's Start Date column, kept by the reader as
+'start_date') become a compact array('i') of days of tenure on the round
+date, -1 where unknown. classify() turns it into roles: newcomers (fewer
+than newcomer_days), seniors (at least senior_days) and everyone else.
+
+assign_mentors() pairs newcomers with seniors as a maximum bipartite
+matching over the compatibility graph (Hopcroft-Karp, O(E sqrt(V))). Then
+each newcomer still without a senior joins a senior's team, while the team
+has room and all its members still share enough hours. Teams seed groups
+(see the tenure_mix rule in src/constraints.py), so as many newcomers get a
+senior as the graph allows.
+"""
+
+from array import array
+from collections import deque
+from datetime import date
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from src.utils import get_round_date
+
+OTHER, NEWCOMER, SENIOR = 0, 1, 2
+
+NEWCOMER_DAYS = 180  # tenure below this makes a newcomer
+SENIOR_DAYS = 1095   # tenure of at least this makes a senior (three years)
+
+
+class TenureRule(NamedTuple):
+    """Compiled tenure_mix rule: a role per position and how strictly to mix them"""
+    role: List[int]       # OTHER, NEWCOMER or SENIOR per roster position
+    hard: bool = False    # never form a group with a newcomer and no senior
+    weight: int = 1       # penalty of such a group when the rule is soft
+    team_size: int = 2    # largest mentor team (the maximum group size)
+
+    def unmentored(self, members: Iterable[int]) -> bool:
+        """Whether members include a newcomer but no senior"""
+        roles = {self.role[m] for m in members}
+        return NEWCOMER in roles and SENIOR not in roles
+
+
+def tenure_days(participants: List[dict], on: Optional[date] = None) -> array:
+    """Days between each start date and `on` (defaults to the round date); -1 if unknown"""
+    on = on or get_round_date()
+    days = array('i', [-1]) * len(participants)
+    for i, p in enumerate(participants):
+        start = p.get('start_date')
+        if not start:
+            continue
+        try:
+            days[i] = max(0, (on - date.fromisoformat(str(start)[:10])).days)
+        except ValueError:
+            continue
+    return days
+
+
+def classify(days: Iterable[int], newcomer_days: int = NEWCOMER_DAYS,
+             senior_days: int = SENIOR_DAYS) -> List[int]:
+    """Role of every position from its tenure in days"""
+    return [SENIOR if d >= senior_days else NEWCOMER if 0 <= d < newcomer_days else OTHER
+            for d in days]
+
+
+def hopcroft_karp(adjacency: List[List[int]]) -> List[Optional[int]]:
+    """
+    Maximum bipartite matching
+
+    Args:
+        adjacency: Right-side vertices (any ints) adjacent to each left vertex
+
+    Returns:
+        The right vertex matched to every left vertex, or None
+    """
+    unreachable = len(adjacency) + 1
+    match_left: List[Optional[int]] = [None] * len(adjacency)
+    match_right: Dict[int, int] = {}
+
+    while True:
+        # Layer the free left vertices and whatever alternating paths reach
+        dist = [unreachable] * len(adjacency)
+        queue = deque()
+        for u, v in enumerate(match_left):
+            if v is None:
+                dist[u] = 0
+                queue.append(u)
+        found = False
+        while queue:
+            u = queue.popleft()
+            for v in adjacency[u]:
+                w = match_right.get(v)
+                if w is None:
+                    found = True
+                elif dist[w] == unreachable:
+                    dist[w] = dist[u] + 1
+                    queue.append(w)
+        if not found:
+            return match_left
+
+        # Vertex-disjoint augmenting paths along the layers, with an explicit stack
+        pointer = [0] * len(adjacency)
+        for root in range(len(adjacency)):
+            if match_left[root] is not None:
+                continue
+            stack, path = [root], []
+            while stack:
+                u = stack[-1]
+                advanced = False
+                while pointer[u] < len(adjacency[u]):
+                    v = adjacency[u][pointer[u]]
+                    pointer[u] += 1
+                    w = match_right.get(v)
+                    if w is None:
+                        path.append(v)
+                        for left, right in zip(stack, path):
+                            match_left[left] = right
+                            match_right[right] = left
+                        stack = []
+                        advanced = True
+                        break
+                    if dist[w] == dist[u] + 1:
+                        path.append(v)
+                        stack.append(w)
+                        advanced = True
+                        break
+                if not advanced:
+                    dist[u] = unreachable  # dead end for the rest of this phase
+                    stack.pop()
+                    if path:
+                        path.pop()
+
+
+def assign_mentors(index, role: List[int], team_size: int,
+                   exclude: Iterable[int] = ()) -> Dict[int, List[int]]:
+    """
+    Give newcomers a compatible senior
+
+    Args:
+        index: CompatibilityIndex of the roster (forbidden pairs already removed)
+        role: Role of every position (see classify)
+        team_size: Largest team, senior included
+        exclude: Positions that must not be teamed (e.g. they have fixed partners)
+
+    Returns:
+        Dict of senior position to the newcomer positions in their team
+    """
+    excluded = set(exclude)
+    newcomers = [i for i, r in enumerate(role) if r == NEWCOMER and i not in excluded]
+    seniors = {i for i, r in enumerate(role) if r == SENIOR and i not in excluded}
+    neighbors = index.neighbors
+    adjacency = [sorted(j for j in neighbors[n] if j in seniors) for n in newcomers]
+    teams: Dict[int, List[int]] = {}
+    unpaired = set()
+    for n, senior in zip(newcomers, hopcroft_karp(adjacency)):
+        if senior is None:
+            unpaired.add(n)
+        else:
+            teams[senior] = [n]
+
+    # Grow teams with newcomers the matching could not pair
+    for n, candidates in zip(newcomers, adjacency):
+        if n not in unpaired:
+            continue
+        for senior in candidates:
+            team = teams.get(senior)
+            if team is None or len(team) + 1 >= team_size:
+                continue
+            if all(n in neighbors[m] for m in team) and index.is_valid_group([senior, n] + team):
+                team.append(n)
+                break
+    return teams
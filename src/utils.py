@@ -3,15 +3,105 @@ Utility functions for the coffee chat matching system.
 Contains timezone conversion and other helper functions used across the application.
 """
 
+import hashlib
+import math
+from contextlib import contextmanager
+from datetime import date, datetime, time as dt_time
+from functools import lru_cache, wraps
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from typing import Dict
+# Weekly availability: bit (24 * day + hour) is set if free on that UTC day
+# (Monday = 0) at hour:00. A daily mask only uses the first 24 bits.
+HOURS_PER_DAY = 24
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+SLOTS_PER_WEEK = HOURS_PER_DAY * len(WEEKDAYS)
+DAY_MASK = (1 << HOURS_PER_DAY) - 1
+WEEK_MASK = (1 << SLOTS_PER_WEEK) - 1
+_EVERY_DAY = sum(1 << (HOURS_PER_DAY * day) for day in range(len(WEEKDAYS)))
 
-def convert_timezone_to_float(timezone_str: str) -> float:
+# Availability values: Y = available, P = available and preferred, N = not available
+AVAILABLE = ('Y', 'P')
+PREFERRED = ('P',)
+
+# Date whose UTC offsets IANA zone names resolve to (None = today), see set_round_date
+_round_date: Optional[date] = None
+
+def set_round_date(day: Optional[date]) -> Optional[date]:
+    """
+    Set the date a matching round takes place, returning the previous setting
+    
+    IANA zone names (e.g. 'America/New_York') resolve to their UTC offset on
+    this date, so a round in July uses summer time. None means today.
+    """
+    global _round_date
+    previous, _round_date = _round_date, day
+    return previous
+
+@contextmanager
+def round_date_scope(day: Optional[date]):
+    """
+    Resolve IANA zones on day inside the block, restoring the previous date after
+    
+    None leaves the current setting alone, so scopes nest: a matcher without
+    a date of its own uses its caller's.
+    """
+    if day is None:
+        yield
+        return
+    previous = set_round_date(day)
+    try:
+        yield
+    finally:
+        set_round_date(previous)
+
+def at_round_date(method):
+    """Run a method inside round_date_scope(self.round_date)"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with round_date_scope(self.round_date):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+def get_round_date() -> date:
+    """The date IANA zone names are currently resolved on"""
+    return _round_date or date.today()
+
+@lru_cache(maxsize=None)
+def _zone_offset(timezone_str: str, day: date) -> float:
+    """
+    UTC offset of a timezone on a day, resolved once per (zone, day)
+    
+    The cache is the offset table every hot path shares: masks, regions and
+    the shared roster all look offsets up here instead of re-resolving zones.
+    """
+    if timezone_str.startswith('UTC') and len(timezone_str) > 3:
+        # Remove 'UTC' and any ':00' endings
+        offset_str = timezone_str.replace('UTC', '').replace(':00', '')
+        
+        # Handle timezones with minutes
+        if ':' in offset_str:
+            hours, minutes = map(int, offset_str.split(':'))
+            # For negative hours, we need to make the minutes negative too
+            return hours + (minutes/60) * (1 if hours >= 0 else -1)
+        
+        # Handle simple hour offsets
+        return float(offset_str)
+    try:
+        zone = ZoneInfo(timezone_str)
+    except (ZoneInfoNotFoundError, ValueError) as e:
+        raise ValueError(f"Unknown timezone '{timezone_str}'") from e
+    # Midday avoids the hour a DST switch happens in
+    return zone.utcoffset(datetime.combine(day, dt_time(12))).total_seconds() / 3600
+
+def convert_timezone_to_float(timezone_str: str, on: Optional[date] = None) -> float:
     """
-    Convert timezone string (e.g., 'UTC+5:30' or 'UTC+05:00') to decimal hours
+    Convert timezone string (e.g., 'UTC+5:30', 'UTC+05:00' or an IANA zone
+    name like 'Europe/Paris') to decimal hours
     
     Args:
-        timezone_str: String in format 'UTC±H:MM' or 'UTC±HH:00'
+        timezone_str: String in format 'UTC±H:MM' or 'UTC±HH:00', or an IANA zone name
+        on: Date to resolve IANA zones on (defaults to the round date)
     
     Returns:
         float: Timezone offset in decimal hours
@@ -21,18 +111,26 @@ def convert_timezone_to_float(timezone_str: str) -> float:
         -5.0
         >>> convert_timezone_to_float('UTC+05:30')
         5.5
+        >>> convert_timezone_to_float('America/New_York', date(2025, 7, 1))
+        -4.0
     """
-    # Remove 'UTC' and any ':00' endings
-    timezone_str = timezone_str.replace('UTC', '').replace(':00', '')
+    if not isinstance(timezone_str, str):
+        raise TypeError(f"Timezone must be a string, got {type(timezone_str).__name__}")
+    return _zone_offset(timezone_str, on or get_round_date())
+
+def utc_shift(offset: float) -> int:
+    """
+    Whole hours to subtract from a local hour to get the UTC hour it starts in
     
-    # Handle timezones with minutes
-    if ':' in timezone_str:
-        hours, minutes = map(int, timezone_str.split(':'))
-        # For negative hours, we need to make the minutes negative too
-        return hours + (minutes/60) * (1 if hours >= 0 else -1)
+    Fractional offsets round so that a local hour lands in the UTC hour its
+    start falls in: 09:00 in UTC+05:30 is 03:30 UTC (hour 3), 09:00 in
+    UTC-03:30 is 12:30 UTC (hour 12).
     
-    # Handle simple hour offsets
-    return float(timezone_str)
+    Example:
+        >>> utc_shift(5.5), utc_shift(-3.5), utc_shift(-5.0)
+        (6, -3, -5)
+    """
+    return math.ceil(offset)
 
 def convert_local_to_utc(local_hour: str, timezone: str) -> int:
     """
@@ -51,7 +149,7 @@ def convert_local_to_utc(local_hour: str, timezone: str) -> int:
     """
     try:
         timezone_float = convert_timezone_to_float(timezone)
-        return (int(local_hour) - int(timezone_float)) % 24
+        return (int(local_hour) - utc_shift(timezone_float)) % 24
     except (ValueError, TypeError) as e:
         print(f"Error converting timezone {timezone}: {str(e)}")
         return None
@@ -85,4 +183,141 @@ def generate_time_ranges(hours: list) -> str:
         prev = hour
     ranges.append(f"{start:02d}:00-{prev + 1:02d}:00")
     
-    return ", ".join(ranges)
\ No newline at end of file
+    return ", ".join(ranges)
+
+def popcount(mask: int) -> int:
+    """Count the set bits in an availability mask"""
+    return bin(mask).count('1')
+
+if hasattr(int, 'bit_count'):  # Python 3.10+: same result, done in C
+    popcount = int.bit_count  # noqa: F811
+
+def availability_to_mask(availability: Dict[str, str], timezone: str,
+                         statuses: tuple = AVAILABLE) -> int:
+    """
+    Convert a participant's local Y/P/N availability into a bitmask of UTC hours
+    
+    Args:
+        availability: Dict of local hour ('0'-'23') to 'Y'/'P'/'N'
+        timezone: Timezone string (e.g., 'UTC+5:30')
+        statuses: Values that set a bit; PREFERRED gives the preferred-hours mask
+    
+    Returns:
+        int: Bitmask where bit h is set if the participant is free at h:00 UTC
+    
+    Example:
+        >>> availability_to_mask({'9': 'Y', '10': 'Y'}, 'UTC+01:00')
+        768  # bits 8 and 9
+    """
+    mask = 0
+    for hour, status in availability.items():
+        if status in statuses:
+            utc_hour = convert_local_to_utc(hour, timezone)
+            if utc_hour is not None:
+                mask |= 1 << utc_hour
+    return mask
+
+def weekly_availability_to_mask(availability: Dict[str, str], timezone: str,
+                                statuses: tuple = AVAILABLE) -> int:
+    """
+    Convert local weekly Y/P/N availability into a bitmask of UTC week slots
+    
+    Args:
+        availability: Dict of local week slot ('0'-'167', 24 * day + hour with
+            Monday = 0) to 'Y'/'P'/'N'
+        timezone: Timezone string (e.g., 'UTC+5:30')
+        statuses: Values that set a bit
+    
+    Returns:
+        int: Bitmask where bit s is set if the participant is free in UTC slot s
+    
+    Example:
+        >>> weekly_availability_to_mask({'33': 'Y'}, 'UTC+01:00')  # Tue 09:00 local
+        4294967296  # bit 32, Tue 08:00 UTC
+    """
+    offset = utc_shift(convert_timezone_to_float(timezone))
+    mask = 0
+    for slot, status in availability.items():
+        if status in statuses:
+            mask |= 1 << ((int(slot) - offset) % SLOTS_PER_WEEK)
+    return mask
+
+def week_mask(daily_mask: int) -> int:
+    """Repeat a daily (24-bit) mask on every day of the week"""
+    return (daily_mask & DAY_MASK) * _EVERY_DAY
+
+def day_hours(mask: int) -> int:
+    """
+    Most hours set on any single day of a daily or weekly mask
+    
+    Used in place of popcount for overlap thresholds, so "2 shared hours"
+    still means two hours on the same day once masks span a week.
+    """
+    if mask <= DAY_MASK:
+        return popcount(mask)
+    return max(popcount(mask >> shift & DAY_MASK)
+               for shift in range(0, SLOTS_PER_WEEK, HOURS_PER_DAY))
+
+def format_meeting_time(slot: Optional[int], weekly: bool = False,
+                        zone: bool = True) -> Optional[str]:
+    """
+    Format a meeting hour ('09:00 UTC') or weekly slot ('Tue 09:00 UTC')
+    
+    Args:
+        slot: UTC hour, or week slot when weekly
+        weekly: Whether slot is a week slot
+        zone: Append ' UTC'; leave it off for tables already headed UTC
+    
+    Example:
+        >>> format_meeting_time(33, weekly=True)
+        'Tue 09:00 UTC'
+        >>> format_meeting_time(9, zone=False)
+        '09:00'
+    """
+    if slot is None:
+        return None
+    suffix = " UTC" if zone else ""
+    if weekly:
+        return f"{WEEKDAYS[slot // HOURS_PER_DAY]} {slot % HOURS_PER_DAY:02d}:00{suffix}"
+    return f"{slot:02d}:00{suffix}"
+
+def parse_meeting_time(text: str) -> int:
+    """Inverse of format_meeting_time: the hour, or the week slot if a weekday is given"""
+    parts = text.split()
+    if parts[0] in WEEKDAYS:
+        return WEEKDAYS.index(parts[0]) * HOURS_PER_DAY + int(parts[1][:2])
+    return int(parts[0][:2])
+
+def generate_slot_ranges(slots: list) -> str:
+    """
+    Format week slots as per-day time ranges
+    
+    Example:
+        >>> generate_slot_ranges([33, 34, 57])
+        'Tue 09:00-11:00, Wed 09:00-10:00'
+    """
+    by_day: Dict[int, List[int]] = {}
+    for slot in sorted(slots):
+        by_day.setdefault(slot // HOURS_PER_DAY, []).append(slot % HOURS_PER_DAY)
+    return ", ".join(f"{WEEKDAYS[day]} {generate_time_ranges(hours)}".replace(", ", f", {WEEKDAYS[day]} ")
+                     for day, hours in by_day.items())
+
+def mask_to_hours(mask: int) -> List[int]:
+    """Return the sorted list of hours whose bit is set in the mask"""
+    return [hour for hour in range(mask.bit_length()) if mask >> hour & 1]
+
+
+def derive_seed(seed: int, *keys) -> int:
+    """
+    Derive an independent, stable child seed from a master seed
+    
+    Used to give each round, worker or restart its own random stream without
+    the streams depending on how work is scheduled. Unlike hash(), the result
+    is the same in every process.
+    
+    Example:
+        >>> derive_seed(42, 'round', 3) == derive_seed(42, 'round', 3)
+        True
+    """
+    text = ":".join(str(part) for part in (seed,) + keys)
+    return int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:8], 'big')
@@ -0,0 +1,77 @@
+import csv
+import sqlite3
+
+import openpyxl
+
+from src.analytics import HistoryAnalytics
+from src.captain_history import CaptainHistoryDB
+
+
+def make_db(tmp_path):
+    db = CaptainHistoryDB(str(tmp_path / "history.db"))
+    departments = ["Sales", "Sales", "Finance", "Finance", "Legal"]
+    for i, department in enumerate(departments):
+        db.update_or_create_employee({'id': f"{i:08d}", 'name': f"Employee {i}", 'department': department})
+    db.record_meetings([("00000000", ["00000000", "00000001"], "09:00 UTC"),
+                        ("00000002", ["00000002", "00000003"], "10:00 UTC")], date="2026-01-01")
+    db.record_meetings([("00000001", ["00000000", "00000001", "00000002"], "09:00 UTC")], date="2026-02-01")
+    return db
+
+
+def rows_by_key(table):
+    columns, rows = table
+    return {row[0]: dict(zip(columns, row)) for row in rows}
+
+
+def test_aggregates_are_updated_with_each_meeting(tmp_path):
+    analytics = HistoryAnalytics(make_db(tmp_path))
+
+    employees = rows_by_key(analytics.employee_summary())
+    assert employees["00000000"]['meetings'] == 2
+    assert employees["00000000"]['captain_count'] == 1
+    assert employees["00000000"]['distinct_partners'] == 2
+    assert employees["00000000"]['cross_department_meetings'] == 1
+    assert employees["00000001"]['last_meeting_date'] == "2026-02-01"
+
+    _, never = analytics.never_matched()
+    assert [row[0] for row in never] == ["00000004"]
+
+    rounds = rows_by_key(analytics.round_summary())
+    assert rounds["2026-01-01"]['groups'] == 2 and rounds["2026-01-01"]['participants'] == 4
+    assert rounds["2026-01-01"]['participation_pct'] == 80.0
+    assert rounds["2026-02-01"]['cross_department_pairs'] == 2
+
+    departments = rows_by_key(analytics.department_summary())
+    assert departments["Legal"]['ever_matched'] == 0
+    assert departments["Sales"]['captaincies'] == 2
+    _, links = analytics.department_links()
+    assert links == [("Finance", "Sales", 2)]
+
+
+def test_rebuild_and_backfill_match_incremental(tmp_path):
+    db = make_db(tmp_path)
+    analytics = HistoryAnalytics(db)
+    before = analytics.tables()
+    assert analytics.rebuild() == 3
+    assert analytics.tables() == before
+
+    # A database written before the summary tables existed is backfilled on open
+    conn = sqlite3.connect(db.db_path)
+    for table in ("employee_stats", "employee_partners", "department_stats", "department_links", "round_stats"):
+        conn.execute(f"DROP TABLE {table}")
+    conn.commit()
+    conn.close()
+    assert HistoryAnalytics(CaptainHistoryDB(db.db_path)).tables() == before
+
+
+def test_export_to_excel_and_csv(tmp_path):
+    analytics = HistoryAnalytics(make_db(tmp_path))
+    workbook = str(tmp_path / "analytics.xlsx")
+    analytics.export(workbook)
+    assert openpyxl.load_workbook(workbook).sheetnames == [
+        'Employees', 'Never Matched', 'Departments', 'Department Links', 'Rounds']
+
+    written = analytics.export(str(tmp_path / "csv"))
+    with open(next(p for p in written if p.endswith("rounds.csv"))) as f:
+        rows = list(csv.reader(f))
+    assert rows[0][0] == "round_date" and len(rows) == 3
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from src.anytime import AnytimeMatcher
+from src.captain_history import CaptainHistoryDB
+from src.history_store import InMemoryHistory
+from src.synthetic import generate_participants
+
+
+def roster(n=30):
+    return generate_participants(n, seed=5)
+
+
+def test_search_keeps_best_and_writes_nothing_until_finalized(tmp_path):
+    db = CaptainHistoryDB(str(tmp_path / "history.db"))
+    search = AnytimeMatcher(roster(), db=db, seed=1, max_attempts=4)
+    records = search.run()
+    assert search.attempts == 4 and records == search.best
+    assert db.list_employees() == []
+
+    matcher = search.finalize()
+    assert len(matcher.groups) == len(records)
+    assert sum(row[3] for row in db.list_employees()) == len(records)
+    # Finalizing again records the same round once
+    search.finalize()
+    assert sum(row[3] for row in db.list_employees()) == len(records)
+
+
+def test_resume_matches_an_uninterrupted_run(tmp_path):
+    path = str(tmp_path / "search.json")
+    full = AnytimeMatcher(roster(), db=InMemoryHistory(), seed=3, max_attempts=6)
+    full.run()
+
+    first = AnytimeMatcher(roster(), db=InMemoryHistory(), seed=3, max_attempts=2, checkpoint_path=path)
+    first.run()
+    assert json.load(open(path))['attempts'] == 2
+    resumed = AnytimeMatcher(roster(), db=InMemoryHistory(), max_attempts=6,
+                             checkpoint_path=path, resume=True)
+    assert resumed.seed == 3 and resumed.round_id == first.round_id
+    resumed.run()
+    assert resumed.best == full.best and resumed.best_score == full.best_score
+
+
+def test_interrupt_keeps_incumbent(tmp_path, monkeypatch):
+    path = str(tmp_path / "search.json")
+    search = AnytimeMatcher(roster(), db=InMemoryHistory(), seed=2, checkpoint_path=path)
+    attempt = search._attempt
+
+    def interrupt_after_two(n):
+        if n == 2:
+            raise KeyboardInterrupt
+        return attempt(n)
+
+    monkeypatch.setattr(search, '_attempt', interrupt_after_two)
+    records = search.run()
+    assert search.interrupted and search.attempts == 2 and records
+    assert json.load(open(path))['best'] == records
+
+
+def test_checkpoint_for_another_roster_is_rejected(tmp_path):
+    path = str(tmp_path / "search.json")
+    AnytimeMatcher(roster(), db=InMemoryHistory(), seed=1, max_attempts=1, checkpoint_path=path).run()
+    with pytest.raises(ValueError):
+        AnytimeMatcher(roster(31), db=InMemoryHistory(), checkpoint_path=path, resume=True)
+
+
+def test_finalized_checkpoint_cannot_be_resumed(tmp_path, capsys):
+    path = str(tmp_path / "search.json")
+    db = CaptainHistoryDB(str(tmp_path / "history.db"))
+    search = AnytimeMatcher(roster(), db=db, seed=4, max_attempts=2, checkpoint_path=path)
+    search.run()
+    search.finalize()
+    assert json.load(open(path))['finalized']
+    with pytest.raises(ValueError):
+        AnytimeMatcher(roster(), db=db, max_attempts=6, checkpoint_path=path, resume=True)
+    # Recording the same round again writes nothing, and says so
+    search.finalize()
+    assert "already in captain history" in capsys.readouterr().out
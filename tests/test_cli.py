@@ -0,0 +1,63 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from src.cli import main
+
+
+def test_history_command_does_not_import_excel_stack(tmp_path):
+    code = ("import sys; from src.cli import main; "
+            f"main(['history', '--db', {str(tmp_path / 'history.db')!r}]); "
+            "print('HEAVY' if {'openpyxl', 'pandas'} & set(sys.modules) else 'LIGHT')")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip().endswith("LIGHT")
+
+
+def test_match_and_export_commands(tmp_path):
+    roster = str(tmp_path / "roster.xlsx")
+    assert main(["template", "--output", roster]) == 0
+
+    import openpyxl
+    wb = openpyxl.load_workbook(roster)
+    ws = wb['Participants']
+    for i in range(6):
+        ws.cell(row=i + 2, column=1, value=f"{i + 1:08d}")
+        ws.cell(row=i + 2, column=2, value=f"Employee {i + 1}")
+        ws.cell(row=i + 2, column=3, value=f"employee{i + 1}@example.com")
+        ws.cell(row=i + 2, column=4, value="Business Intelligence")
+        ws.cell(row=i + 2, column=5, value="United Kingdom")
+        ws.cell(row=i + 2, column=6, value="UTC+00:00")
+        for hour in range(24):
+            ws.cell(row=i + 2, column=10 + hour, value='Y' if 9 <= hour < 17 else 'N')
+    wb.save(roster)
+
+    groups_json = str(tmp_path / "groups.json")
+    output = str(tmp_path / "matches.xlsx")
+    assert main(["match", "--input", roster, "--output", output, "--seed", "1",
+                 "--groups-json", groups_json, "--db", str(tmp_path / "history.db")]) == 0
+    with open(groups_json) as f:
+        records = json.load(f)
+    assert sum(len(r['members']) for r in records) == 6
+
+    exported = str(tmp_path / "exported.xlsx")
+    assert main(["export", "--input", roster, "--groups", groups_json, "--output", exported]) == 0
+    assert main(["history", "--db", str(tmp_path / "history.db")]) == 0
+
+    # Export reads rosters the way match does: CSV works, an empty roster is an error
+    from src.ingest import read_roster, write_roster_csv
+    roster_csv = str(tmp_path / "roster.csv")
+    write_roster_csv(read_roster(roster), roster_csv)
+    assert main(["export", "--input", roster_csv, "--groups", groups_json, "--output", exported]) == 0
+    empty = str(tmp_path / "empty.xlsx")
+    assert main(["template", "--output", empty]) == 0
+    assert main(["export", "--input", empty, "--groups", groups_json, "--output", exported]) == 1
+    assert main(["simulate", "--input", empty, "--runs", "1"]) == 1
+
+
+def test_unknown_solver_is_a_usage_error(capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main(["bench", "--participants", "10", "--solver", "greedy"])
+    assert exit_info.value.code == 2
+    assert "invalid choice: 'greedy'" in capsys.readouterr().err
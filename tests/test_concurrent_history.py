@@ -0,0 +1,48 @@
+import contextlib
+import io
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+from src.captain_history import CaptainHistoryDB
+from src.coffee_matching import GroupMatcher
+from src.synthetic import generate_participants
+
+
+def run_matcher(db_path, seed):
+    # A tiny lock wait forces the retry path to do the work under contention
+    db = CaptainHistoryDB(db_path, busy_timeout=0.01, max_retries=50)
+    with contextlib.redirect_stdout(io.StringIO()):
+        matcher = GroupMatcher(generate_participants(60, seed=1), db=db, seed=seed)
+        groups = matcher.create_groups()
+        # A retried commit of the same round must not count twice
+        matcher.record_groups(groups)
+    return len(groups)
+
+
+def test_parallel_matchers_share_one_database(tmp_path):
+    db_path = str(tmp_path / "history.db")
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        group_counts = list(pool.map(run_matcher, [db_path] * 6, range(6)))
+
+    conn = sqlite3.connect(db_path)
+    meetings = conn.execute("SELECT COUNT(*) FROM meetings").fetchone()[0]
+    rounds = conn.execute("SELECT COUNT(*) FROM rounds").fetchone()[0]
+    captaincies, attended = conn.execute(
+        "SELECT SUM(captain_count), SUM(total_meetings_attended) FROM captain_history").fetchone()
+    members = conn.execute("SELECT SUM(participants) FROM round_stats").fetchone()[0]
+    conn.close()
+
+    assert rounds == 6
+    assert meetings == sum(group_counts) == captaincies
+    assert attended == members
+
+
+def test_repeated_round_id_is_ignored(tmp_path):
+    db = CaptainHistoryDB(str(tmp_path / "history.db"))
+    db.update_or_create_employee({'id': "00000001", 'name': "A", 'department': "Sales"})
+    db.update_or_create_employee({'id': "00000002", 'name': "B", 'department': "Sales"})
+    meetings = [("00000001", ["00000001", "00000002"], "09:00 UTC")]
+    assert db.record_meetings(meetings, date="2026-01-01", round_id="round-1") == 1
+    assert db.record_meetings(meetings, date="2026-01-01", round_id="round-1") == 0
+    assert db.get_captain_stats("00000001")[0] == 1
+    assert db.record_meetings(meetings, date="2026-02-01") == 1
@@ -0,0 +1,46 @@
+import random
+
+from src.coffee_matching import GroupMatcher
+from src.compatibility import CompatibilityIndex, DegreeQueue
+from src.history_store import InMemoryHistory
+
+
+def person(i, hours):
+    return {
+        'id': f"{i:08d}",
+        'name': f"Employee {i}",
+        'department': "Business Intelligence",
+        'timezone': "UTC+00:00",
+        'availability': {str(h): 'Y' if h in hours else 'N' for h in range(24)},
+        'captain_count': 0
+    }
+
+
+def roster():
+    # Employee 0 only overlaps with employee 1, who overlaps with everyone
+    return [person(0, range(9, 11)), person(1, range(9, 18))] + [person(i, range(11, 18)) for i in range(2, 6)]
+
+
+def test_degree_queue_serves_fewest_partners_first():
+    index = CompatibilityIndex(roster())
+    queue = DegreeQueue(index.neighbors, range(len(index)), random.Random(1))
+    assert queue.peek() == 0
+    assert queue.degree[1] == 5
+    queue.remove(0)
+    assert queue.degree[1] == 4 and 0 not in queue
+    for i in (2, 3, 4):
+        queue.remove(i)
+    assert queue.degree == {1: 1, 5: 1}
+    queue.remove(1)
+    assert queue.peek() == 5 and queue.degree[5] == 0
+    queue.remove(5)
+    assert len(queue) == 0 and queue.peek() is None
+
+
+def test_constrained_solver_places_hard_participants():
+    for seed in range(10):
+        matcher = GroupMatcher(roster(), 2, 2, db=InMemoryHistory(), solver='constrained',
+                               seed=seed, rescue=False)
+        groups = matcher.create_groups()
+        assert sum(len(g.members) for g in groups) == 6
+        assert any({m['id'] for m in g.members} == {"00000000", "00000001"} for g in groups)
@@ -0,0 +1,118 @@
+import json
+
+import pytest
+
+from src.captain_history import CaptainHistoryDB
+from src.coffee_matching import GroupMatcher
+from src.compatibility import CompatibilityIndex
+from src.constraints import ConstraintSet
+from src.rescue import RescuePass
+from src.season import SeasonPlanner
+
+
+def person(i, department="Business Intelligence"):
+    return {
+        'id': f"{i:08d}",
+        'name': f"Employee {i}",
+        'department': department,
+        'timezone': "UTC+00:00",
+        'availability': {str(h): 'Y' if 9 <= h < 17 else 'N' for h in range(24)},
+        'captain_count': 0
+    }
+
+
+def match(participants, constraints, tmp_path, seed=1):
+    db = CaptainHistoryDB(str(tmp_path / "history.db"))
+    matcher = GroupMatcher(participants, db=db, seed=seed, constraints=constraints)
+    return [sorted(m['id'] for m in g.members) for g in matcher.create_groups()]
+
+
+def test_do_not_pair_is_respected(tmp_path):
+    participants = [person(i) for i in range(4)]
+    constraints = ConstraintSet(max_group_size=2, rules=[
+        {'type': 'do_not_pair', 'pairs': [["00000000", "00000001"], ["00000002", "00000003"]]}])
+    for seed in range(5):
+        for group in match([dict(p) for p in participants], constraints, tmp_path, seed):
+            assert group not in (["00000000", "00000001"], ["00000002", "00000003"])
+
+
+def test_fixed_pairs_are_grouped_together(tmp_path):
+    participants = [person(i) for i in range(7)]
+    constraints = ConstraintSet(rules=[{'type': 'fixed_pairs', 'pairs': [["00000002", "00000005"]]}])
+    for seed in range(5):
+        groups = match([dict(p) for p in participants], constraints, tmp_path, seed)
+        assert any({"00000002", "00000005"} <= set(g) for g in groups)
+
+
+def test_hard_department_mix(tmp_path):
+    participants = [person(i, "Sales" if i < 3 else "Finance") for i in range(6)]
+    constraints = ConstraintSet(rules=[{'type': 'department_mix', 'max_same': 1, 'hard': True}])
+    groups = match(participants, constraints, tmp_path)
+    departments = {p['id']: p['department'] for p in participants}
+    assert sum(len(g) for g in groups) == 6
+    for group in groups:
+        assert len({departments[m] for m in group}) == len(group)
+
+
+def test_no_repeats_uses_history(tmp_path):
+    db = CaptainHistoryDB(str(tmp_path / "history.db"))
+    participants = [person(i) for i in range(4)]
+    for p in participants:
+        db.update_or_create_employee(p)
+    db.record_meetings([("00000000", ["00000000", "00000001"], "09:00 UTC"),
+                        ("00000002", ["00000002", "00000003"], "09:00 UTC")], date="2026-01-01")
+    rules = ConstraintSet(max_group_size=2, rules=[{'type': 'no_repeats', 'rounds': 1}]).compile(
+        CompatibilityIndex(participants), db)
+    assert not rules.index.is_compatible(0, 1)
+    assert not rules.index.is_compatible(2, 3)
+    assert rules.index.is_compatible(0, 2)
+
+
+def test_rescue_respects_constraints():
+    participants = [person(i) for i in range(3)]
+    constraints = ConstraintSet(rules=[{'type': 'do_not_pair', 'pairs': [["00000000", "00000002"]]}])
+    rules = constraints.compile(CompatibilityIndex(participants))
+    groups = [[0, 1]]
+    report = RescuePass(rules.index, constraints=rules).run(groups, [2])
+    assert groups == [[0, 1]]
+    assert report[0]['action'] == 'unresolved'
+
+
+def test_season_planner_respects_constraints(tmp_path):
+    participants = [person(i) for i in range(6)]
+    constraints = ConstraintSet(max_group_size=2, rules=[
+        {'type': 'do_not_pair', 'pairs': [["00000000", "00000001"]]}])
+    planner = SeasonPlanner(participants, 3, db=CaptainHistoryDB(str(tmp_path / "history.db")),
+                            seed=3, constraints=constraints)
+    for groups in planner.plan():
+        for group in groups:
+            assert {m['id'] for m in group.members} != {"00000000", "00000001"}
+
+
+def test_from_file(tmp_path):
+    path = tmp_path / "constraints.json"
+    path.write_text(json.dumps({'min_overlap_hours': 3, 'group_size': {'min': 2, 'max': 4},
+                                'rules': [{'type': 'no_repeats', 'rounds': 2}]}))
+    constraints = ConstraintSet.from_file(str(path))
+    assert (constraints.min_overlap_hours, constraints.min_group_size, constraints.max_group_size) == (3, 2, 4)
+    assert ConstraintSet.from_dict(constraints.to_dict()).rules == constraints.rules
+
+
+def test_unknown_rule_raises():
+    with pytest.raises(ValueError):
+        ConstraintSet(rules=[{'type': 'vegetarian_only'}])
+
+
+def test_search_picks_the_lowest_soft_penalty():
+    import random
+    from datetime import date, timedelta
+
+    participants = [person(0, "Sales"), person(1, "Finance"), person(2, "Sales")]
+    for p, days in zip(participants, (500, 30, 500)):  # person 1 is a newcomer, nobody is senior
+        p['start_date'] = (date.today() - timedelta(days=days)).isoformat()
+    rules = ConstraintSet(max_group_size=2, rules=[
+        {'type': 'department_mix', 'max_same': 1, 'weight': 1},
+        {'type': 'tenure_mix', 'weight': 5}]).compile(CompatibilityIndex(participants), None)
+    # Both partners break a soft rule; the same department costs less than an unmentored newcomer
+    for seed in range(10):
+        assert rules.index.find_group(0, 2, {0, 1, 2}, rng=random.Random(seed), constraints=rules) == [0, 2]
@@ -0,0 +1,31 @@
+"""Regression harness: a fixed seed must give byte-identical matches"""
+import json
+
+from src.coffee_matching import run_seeded_matches
+from src.synthetic import generate_participants
+
+SEEDS = [1, 2, 3, 4]
+
+
+def dump(results):
+    return json.dumps(results, sort_keys=True).encode('utf-8')
+
+
+def test_same_seed_same_output_across_runs():
+    participants = generate_participants(150, seed=7)
+    first = dump(run_seeded_matches(participants, SEEDS))
+    second = dump(run_seeded_matches(participants, SEEDS))
+    assert first == second
+
+
+def test_same_seed_same_output_across_worker_counts():
+    participants = generate_participants(150, seed=7)
+    serial = dump(run_seeded_matches(participants, SEEDS, workers=1))
+    for workers in (2, 4):
+        assert dump(run_seeded_matches(participants, SEEDS, workers=workers)) == serial
+
+
+def test_different_seeds_give_different_groupings():
+    participants = generate_participants(150, seed=7)
+    results = run_seeded_matches(participants, SEEDS)
+    assert len({dump(r) for r in results}) > 1
@@ -0,0 +1,68 @@
+import random
+
+from src.coffee_matching import GroupMatcher
+from src.compatibility import CompatibilityIndex
+from src.constraints import ConstraintSet
+from src.equivalence import AvailabilityClasses
+from src.history_store import InMemoryHistory
+from src.synthetic import generate_participants
+from src.utils import popcount
+
+
+def test_identical_utc_masks_share_a_class():
+    # 09-17 in UTC+00:00 and 10-18 in UTC+01:00 are the same UTC hours
+    london = {str(h): 'Y' if 9 <= h < 17 else 'N' for h in range(24)}
+    paris = {str(h): 'Y' if 10 <= h < 18 else 'N' for h in range(24)}
+    participants = [
+        {'id': "1", 'timezone': "UTC+00:00", 'availability': london},
+        {'id': "2", 'timezone': "UTC+01:00", 'availability': paris},
+        {'id': "3", 'timezone': "UTC+05:30", 'availability': london},
+    ]
+    classes = AvailabilityClasses.from_participants(participants)
+    assert len(classes) == 2
+    assert classes.members[0] == [0, 1]
+
+
+def test_class_neighbors_match_pairwise_index():
+    participants = generate_participants(150, seed=4)
+    index = CompatibilityIndex(participants, 2)
+    classes = AvailabilityClasses(index.masks, 2)
+    assert len(classes) < len(participants)
+    assert classes.neighbors() == index.neighbors
+
+
+def test_form_groups_are_valid_and_disjoint():
+    participants = generate_participants(300, seed=5)
+    classes = AvailabilityClasses.from_participants(participants, 2)
+    groups, leftover = classes.form_groups(random.Random(1), 2, 4)
+    placed = [i for g in groups for i in g]
+    assert sorted(placed + leftover) == list(range(300))
+    for group in groups:
+        assert 2 <= len(group) <= 4
+        common = (1 << 24) - 1
+        for i in group:
+            common &= classes.masks[next(c for c, m in enumerate(classes.members) if i in m)]
+        assert popcount(common) >= 2
+
+
+def test_matcher_classes_solver_is_seeded():
+    participants = generate_participants(120, seed=6)
+
+    def run(seed):
+        matcher = GroupMatcher([p.copy() for p in participants], 2, 3, db=InMemoryHistory(),
+                               solver='classes', seed=seed, rescue=False)
+        return [sorted(m['id'] for m in g.members) for g in matcher.create_groups()]
+
+    groups = run(3)
+    assert groups == run(3)
+    assert sum(len(g) for g in groups) > 100
+
+
+def test_classes_solver_falls_back_with_rules():
+    participants = generate_participants(20, seed=7)
+    constraints = ConstraintSet(rules=[{'type': 'do_not_pair', 'pairs': [[participants[0]['id'],
+                                                                          participants[1]['id']]]}])
+    matcher = GroupMatcher(participants, db=InMemoryHistory(), solver='classes', seed=1,
+                           constraints=constraints)
+    for group in matcher.create_groups():
+        assert not {participants[0]['id'], participants[1]['id']} <= {m['id'] for m in group.members}
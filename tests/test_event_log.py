@@ -0,0 +1,139 @@
+import random
+
+import pytest
+
+from src.cli import main
+from src.coffee_matching import GroupMatcher
+from src.compatibility import CompatibilityIndex
+from src.constraints import ConstraintSet
+from src.event_log import EventLog, SearchTrace, describe, read_events, trail
+from src.history_store import InMemoryHistory
+
+
+def person(i, hours, department="Business Intelligence"):
+    return {
+        'id': f"{i:08d}",
+        'name': f"Employee {i}",
+        'department': department,
+        'timezone': "UTC+00:00",
+        'availability': {str(h): 'Y' if h in hours else 'N' for h in range(24)},
+        'captain_count': 0
+    }
+
+
+def match_with_log(path, participants, **options):
+    with EventLog(path, batch_size=4) as log:
+        matcher = GroupMatcher(participants, db=InMemoryHistory(), seed=1, event_log=log, **options)
+        matcher.create_groups()
+    return matcher
+
+
+def test_buffered_writer_appends_every_event_in_order(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    with EventLog(path, batch_size=100) as log:
+        for i in range(2500):
+            log.emit('tick', round='r1', n=i)
+        log.flush()
+        assert log.count == 2500
+    with EventLog(path) as log:
+        log.emit('tick', round='r2', n=2500)
+    assert [e['n'] for e in read_events(path)] == list(range(2501))
+
+
+def test_trail_explains_grouping_and_unmatched(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    participants = [person(0, range(9, 13)), person(1, range(9, 13)), person(2, range(20, 24))]
+    matcher = match_with_log(path, participants, max_group_size=2)
+
+    grouped = trail(path, "00000000")
+    assert grouped[0]['event'] == 'round' and grouped[0]['round'] == matcher.round_id
+    group = next(e for e in grouped if e['event'] == 'group')
+    assert sorted(group['members']) == ["00000000", "00000001"] and group['common_hours'] == 4
+    captain = next(e for e in grouped if e['event'] == 'captain')
+    assert captain['captain'] in group['members']
+    assert "Grouped with 00000001" in describe(group, "00000000")
+
+    left_out = [e['event'] for e in trail(path, "00000002")]
+    assert left_out[-1] == 'unmatched'
+    assert describe(trail(path, "00000002")[-1], "00000002") == \
+        "Left unmatched: nobody else shares enough hours"
+
+
+def test_rejections_carry_the_rule_and_rounds_stay_apart(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    constraints = ConstraintSet(rules=[{'type': 'department_mix', 'max_same': 1, 'hard': True}])
+    first = match_with_log(path, [person(i, range(9, 13)) for i in range(3)], constraints=constraints)
+    second = match_with_log(path, [person(i, range(9, 13), f"Dept {i}") for i in range(3)],
+                            constraints=constraints)
+
+    events = trail(path, "00000000", round_id=first.round_id)
+    rejected = [e for e in events if e['event'] == 'reject']
+    assert rejected and all(e['reason'] == "a hard constraint rule forbids it" for e in rejected)
+    assert not first.groups
+    seed = trail(path, rejected[0]['id'], round_id=first.round_id)
+    dropped = next(e for e in seed if e['event'] == 'dropped')
+    assert dropped['reason'] == "no group of compatible partners satisfies the constraint rules"
+    assert dropped['candidates'] == 2
+    # Without a round the latest one is shown, where everyone was grouped
+    assert trail(path, "00000000")[0]['round'] == second.round_id
+    assert any(e['event'] == 'group' for e in trail(path, "00000000"))
+
+
+def test_explain_command(tmp_path, capsys):
+    path = str(tmp_path / "events.jsonl")
+    match_with_log(path, [person(0, range(9, 13)), person(1, range(9, 13))])
+    assert main(["explain", "--log", path, "--employee", "00000001"]) == 0
+    output = capsys.readouterr().out
+    assert "Grouped with 00000000" in output and "captain" in output
+    assert main(["explain", "--log", path, "--employee", "99999999"]) == 1
+
+
+def test_write_error_is_raised_instead_of_hanging(tmp_path):
+    class FullDisk:
+        closed = False
+
+        def write(self, text):
+            raise OSError("No space left on device")
+
+        def close(self):
+            self.closed = True
+
+    log = EventLog(str(tmp_path / "events.jsonl"), batch_size=2)
+    log._file = FullDisk()
+    log.emit('tick', round='r1')
+    log.emit('tick', round='r1')
+    with pytest.raises(OSError):
+        log.flush()
+    with pytest.raises(OSError):
+        log.close()
+
+
+def test_trace_records_overlap_filtering():
+    # 0 shares 3 hours with 1 and with 2, who share none with each other
+    participants = [person(0, range(9, 15)), person(1, range(9, 12)), person(2, range(12, 15))]
+    index = CompatibilityIndex(participants)
+    trace = SearchTrace()
+    found = index.find_group(0, 2, {0, 1, 2}, rng=random.Random(1), trace=trace)
+    left_out = ({1, 2} - set(found)).pop()
+    assert trace.too_few_hours == [left_out] and not trace.rejected
+
+    trace = SearchTrace()
+    assert index.find_group(1, 2, {0, 1, 2}, trace=trace) == [1, 0]
+    assert trace.candidates == 1 and trace.filtered == 1
+
+
+def test_trail_shows_groups_someone_shared_too_few_hours_with(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    participants = [person(0, range(9, 15)), person(1, range(9, 12)), person(2, range(12, 15))]
+    match_with_log(path, participants, max_group_size=2)
+    lines = [describe(e, "00000001") for e in trail(path, "00000001")]
+    assert "Could not join the group of 00000000, 00000002: shares too few hours with it" in lines
+
+
+def test_displaced_person_reads_both_sides_of_a_swap():
+    swapped = {'event': 'rescue', 'id': "00000001", 'action': 'swapped', 'group': 0,
+               'displaced': "00000002", 'overlap_hours': 3, 'reason': None}
+    paired = dict(swapped, id="00000003", action='paired_with_displaced', group=1)
+    assert describe(swapped, "00000002") == "Moved out of their group so 00000001 could join it"
+    assert describe(paired, "00000002") == "Paired with 00000003 after being moved out of their group"
+    assert describe(paired, "00000003") == "Rescue pass: paired with displaced"
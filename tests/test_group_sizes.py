@@ -0,0 +1,46 @@
+import pytest
+
+from src.captain_history import CaptainHistoryDB
+from src.coffee_matching import GroupMatcher
+from src.compatibility import CompatibilityIndex
+from src.synthetic import generate_participants
+
+
+def test_find_group_returns_valid_cliques():
+    participants = generate_participants(200, seed=3)
+    index = CompatibilityIndex(participants)
+    available = set(range(len(participants)))
+    for size in range(2, 7):
+        group = index.find_group(0, size, available)
+        if group is None:
+            continue
+        assert len(group) == size and group[0] == 0
+        assert index.is_valid_group(group)
+        for a in group:
+            for b in group:
+                assert a == b or index.is_compatible(a, b)
+
+
+def test_find_group_respects_available_set():
+    participants = generate_participants(50, seed=3)
+    index = CompatibilityIndex(participants)
+    assert index.find_group(0, 3, {0}) is None
+
+
+@pytest.mark.parametrize("max_size", [2, 4, 6])
+def test_matcher_uses_configured_group_sizes(tmp_path, max_size):
+    participants = generate_participants(120, seed=11)
+    db = CaptainHistoryDB(str(tmp_path / "history.db"), persistent=True)
+    matcher = GroupMatcher(participants, min_group_size=2, max_group_size=max_size, db=db, seed=5)
+    groups = matcher.create_groups()
+    db.close()
+    assert groups
+    assert all(2 <= len(g.members) <= max_size for g in groups)
+    assert all(g.is_valid_group() for g in groups)
+    assert max(len(g.members) for g in groups) == max_size
+
+
+def test_invalid_group_sizes_rejected(tmp_path):
+    db = CaptainHistoryDB(str(tmp_path / "history.db"))
+    with pytest.raises(ValueError):
+        GroupMatcher([], min_group_size=4, max_group_size=3, db=db)
@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+from src.captain_history import CaptainHistoryDB
+from src.coffee_matching import GroupMatcher
+from src.history_store import HistoryStore, InMemoryHistory
+from src.synthetic import generate_participants
+
+
+def exercise(store):
+    for i in range(4):
+        store.update_or_create_employee({'id': f"{i:08d}", 'name': f"Employee {i}", 'department': "Sales"})
+    store.record_meetings([("00000000", ["00000000", "00000001"], "09:00 UTC")], date="2026-01-01")
+    store.record_rounds([("2026-02-01", [("00000002", ["00000002", "00000003", "00000000"], "10:00 UTC")]),
+                         ("2026-03-01", [("00000001", ["00000001", "00000003"], "11:00 UTC")])])
+    store.update_or_create_employee({'id': "00000003", 'name': "Renamed", 'department': "Finance"})
+    return (store.list_employees(), store.get_captain_stats("00000002"),
+            store.get_captain_stats("99999999"), sorted(map(sorted, store.get_recent_groups(2))))
+
+
+def test_in_memory_matches_sqlite():
+    assert exercise(InMemoryHistory()) == exercise(CaptainHistoryDB(":memory:"))
+
+
+def test_interface_is_abstract():
+    with pytest.raises(TypeError):
+        HistoryStore()
+
+
+def test_matcher_with_in_memory_store_writes_nothing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = InMemoryHistory()
+    matcher = GroupMatcher(generate_participants(30, seed=1), db=store, seed=2)
+    groups = matcher.create_groups()
+    assert os.listdir(tmp_path) == []
+    assert len(store.meetings) == len(groups)
+    assert sum(row[3] for row in store.list_employees()) == len(groups)
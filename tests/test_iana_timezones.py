@@ -0,0 +1,61 @@
+from datetime import date
+
+import pytest
+
+from src.coffee_matching import GroupMatcher
+from src.history_store import InMemoryHistory
+from src.models import Participant, get_region, refresh_offsets
+from src.utils import convert_timezone_to_float, get_round_date, set_round_date
+
+WINTER, SUMMER = date(2026, 1, 15), date(2026, 7, 15)
+
+
+@pytest.fixture(autouse=True)
+def restore_round_date():
+    previous = set_round_date(None)
+    yield
+    set_round_date(previous)
+
+
+def person(i, timezone, hours=range(9, 17)):
+    return Participant(f"{i:08d}", f"Employee {i}", department="Business Intelligence", timezone=timezone,
+                       availability={str(h): 'Y' if h in hours else 'N' for h in range(24)})
+
+
+def test_zone_offsets_follow_dst():
+    assert convert_timezone_to_float("America/New_York", WINTER) == -5.0
+    assert convert_timezone_to_float("America/New_York", SUMMER) == -4.0
+    assert convert_timezone_to_float("Australia/Sydney", WINTER) == 11.0
+    assert convert_timezone_to_float("Asia/Kolkata", SUMMER) == 5.5
+    assert convert_timezone_to_float("UTC-05:00", SUMMER) == -5.0
+
+
+def test_unknown_zone_raises_value_error():
+    with pytest.raises(ValueError):
+        convert_timezone_to_float("Mars/Olympus_Mons")
+    assert get_region("Mars/Olympus_Mons") == 'EMEA'
+
+
+def test_round_date_drives_masks():
+    set_round_date(WINTER)
+    assert get_round_date() == WINTER
+    p = person(0, "Europe/Paris")
+    assert p.offset == 1.0 and p.mask >> 8 & 1  # 09:00 Paris = 08:00 UTC
+    set_round_date(SUMMER)
+    assert refresh_offsets([p]) == 1
+    assert p.offset == 2.0 and p.mask >> 7 & 1 and not p.mask >> 15 & 1
+    assert refresh_offsets([p]) == 0
+
+
+def test_matcher_resolves_zones_on_round_date():
+    # 08-10 New York and 17-20 Kolkata (11:30-14:30 UTC, no DST) share 2 hours in summer only
+    participants = [person(0, "America/New_York", range(8, 10)), person(1, "Asia/Kolkata", range(17, 20))]
+    set_round_date(WINTER)
+    matcher = GroupMatcher(participants, db=InMemoryHistory(), seed=1, rescue=False, round_date=SUMMER)
+    assert get_round_date() == WINTER
+    groups = matcher.create_groups()
+    assert len(groups) == 1 and groups[0].meeting_time_label == "12:00 UTC"
+    # The matcher's date is only in effect while it works
+    assert get_round_date() == WINTER
+    matcher = GroupMatcher(participants, db=InMemoryHistory(), seed=1, rescue=False, round_date=WINTER)
+    assert matcher.create_groups() == []
@@ -0,0 +1,88 @@
+import csv
+import os
+from datetime import datetime
+
+import openpyxl
+
+from src.cli import main
+from src.excel_handler import ExcelTemplateHandler
+from src.ingest import find_roster_files, ingest_rosters, read_roster
+
+
+def row(employee_id, name, start_date=None, hours=range(9, 12), timezone="UTC+00:00"):
+    return [employee_id, name, f"{name.lower()}@example.com", "Business Intelligence", "United Kingdom",
+            timezone, start_date, "Active", None] + ['Y' if h in hours else 'N' for h in range(24)]
+
+
+def write_workbook(path, rows, mtime):
+    ExcelTemplateHandler().create_template(str(path))
+    wb = openpyxl.load_workbook(path)
+    ws = wb["Participants"]
+    for r, values in enumerate(rows, 2):
+        for c, value in enumerate(values, 1):
+            ws.cell(row=r, column=c, value=value)
+    wb.save(path)
+    os.utime(path, (mtime, mtime))
+
+
+def write_csv(path, rows, mtime):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(ExcelTemplateHandler().basic_headers + ["Total Available Hours"] +
+                        [f"{h:02d}:00" for h in range(24)])
+        writer.writerows([["" if v is None else v for v in values] for values in rows])
+    os.utime(path, (mtime, mtime))
+
+
+def rosters(tmp_path):
+    folder = tmp_path / "rosters"
+    folder.mkdir()
+    write_workbook(folder / "finance.xlsx", [
+        row(1, "Ana", datetime(2024, 1, 1)),
+        row(2, "Ben", hours=range(8, 10)),
+        row(3, "Cy"),
+    ], mtime=1_000)
+    write_csv(folder / "sales.csv", [
+        row("00000001", "Ana", "2023-01-01", hours=range(14, 16)),  # older start date, dropped
+        row("2", "Ben", hours=range(15, 18)),                        # newer file, kept
+        row("4", "Dee", "2022-05-01"),
+    ], mtime=2_000)
+    (folder / "~$finance.xlsx").write_text("lock file")
+    return folder
+
+
+def test_rows_are_deduplicated_by_normalised_id(tmp_path):
+    folder = rosters(tmp_path)
+    assert [os.path.basename(p) for p in find_roster_files(str(folder))] == ["finance.xlsx", "sales.csv"]
+
+    merged, conflicts = ingest_rosters(str(folder), workers=2)
+    assert [p['id'] for p in merged] == ["00000001", "00000002", "00000003", "00000004"]
+    by_id = {p['id']: p for p in merged}
+    assert by_id["00000001"]['availability']['9'] == 'Y'
+    assert by_id["00000001"]['start_date'] == "2024-01-01"
+    assert by_id["00000002"]['availability']['15'] == 'Y'
+
+    reasons = {c['id']: c for c in conflicts}
+    assert reasons["00000001"]['reason'] == "later start date"
+    assert reasons["00000001"]['dropped_file'].endswith("sales.csv")
+    assert reasons["00000002"]['reason'] == "newer file"
+    assert reasons["00000002"]['fields'] == ['availability']
+
+
+def test_glob_and_single_csv_inputs(tmp_path):
+    folder = rosters(tmp_path)
+    assert [p['id'] for p in read_roster(str(folder / "*.csv"))] == ["00000001", "00000002", "00000004"]
+    assert len(read_roster(str(folder / "sales.csv"))) == 3
+
+
+def test_ingest_command_writes_roster_and_conflicts(tmp_path):
+    folder = rosters(tmp_path)
+    output = tmp_path / "merged.csv"
+    report = tmp_path / "conflicts.csv"
+    assert main(["ingest", "--input", str(folder), "--output", str(output),
+                 "--conflicts", str(report), "--workers", "1"]) == 0
+
+    merged = read_roster(str(output))
+    assert [p['id'] for p in merged] == ["00000001", "00000002", "00000003", "00000004"]
+    with open(report) as f:
+        assert len(list(csv.reader(f))) == 3  # header + two dropped rows
@@ -0,0 +1,156 @@
+import asyncio
+import email
+
+from src.captain_history import CaptainHistoryDB
+from src.models import CoffeeGroup
+from src.notifications import Outbox, SMTPSettings, dispatch
+
+
+class DebugSMTPServer:
+    """Minimal asyncio SMTP server that keeps what it receives"""
+
+    def __init__(self, reject=(), fail_once=()):
+        self.reject = set(reject)        # recipients refused with 550
+        self.fail_once = set(fail_once)  # recipients whose first DATA gets a 451
+        self.messages = []
+        self.connections = 0
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        writer.write(b"220 localhost ESMTP test\r\n")
+        recipients = []
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode().strip()
+            verb = command[:4].upper()
+            if verb in ("EHLO", "HELO"):
+                writer.write(b"250 localhost\r\n")
+            elif verb == "MAIL":
+                recipients = []
+                writer.write(b"250 OK\r\n")
+            elif verb == "RCPT":
+                address = command.split(":", 1)[1].strip().strip("<>")
+                if address in self.reject:
+                    writer.write(b"550 No such user\r\n")
+                else:
+                    recipients.append(address)
+                    writer.write(b"250 OK\r\n")
+            elif verb == "DATA":
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                await writer.drain()
+                data = []
+                while (line := await reader.readline()) != b".\r\n":
+                    data.append(line)
+                if recipients[0] in self.fail_once:
+                    self.fail_once.discard(recipients[0])
+                    writer.write(b"451 Try again later\r\n")
+                else:
+                    self.messages.append((recipients, email.message_from_bytes(b"".join(data))))
+                    writer.write(b"250 Queued\r\n")
+            elif verb == "QUIT":
+                writer.write(b"221 Bye\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"250 OK\r\n")
+            await writer.drain()
+        writer.close()
+
+
+def person(i):
+    return {
+        'id': f"{i:08d}",
+        'name': f"Employee {i}",
+        'email': f"employee{i}@example.com",
+        'department': "Business Intelligence",
+        'timezone': "UTC+00:00",
+        'availability': {str(h): 'Y' if 9 <= h < 17 else 'N' for h in range(24)},
+        'captain_count': 0
+    }
+
+
+def make_outbox(tmp_path, groups=30):
+    outbox = Outbox(CaptainHistoryDB(str(tmp_path / "history.db"), persistent=True))
+    groups = [CoffeeGroup([person(3 * g), person(3 * g + 1), person(3 * g + 2)]) for g in range(groups)]
+    assert outbox.enqueue_groups(groups, "round-1") == len(groups) * 3
+    return outbox, groups
+
+
+def run(server, outbox, **options):
+    async def scenario():
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            return await dispatch(outbox, SMTPSettings("127.0.0.1", port, "chats@example.com"),
+                                  backoff=0.01, **options)
+        finally:
+            listener.close()
+            await listener.wait_closed()
+    return asyncio.run(scenario())
+
+
+def test_messages_go_out_over_a_small_connection_pool(tmp_path):
+    outbox, groups = make_outbox(tmp_path)
+    server = DebugSMTPServer()
+    stats = run(server, outbox, connections=3)
+
+    assert stats['sent'] == 90 and stats['failed'] == 0
+    assert server.connections == stats['connections'] == 3
+    assert outbox.counts() == {'sent': 90}
+    subjects = {m['To']: m['Subject'] for _, m in server.messages}
+    captain = groups[0].captain
+    assert subjects[captain['email']] == "You are this round's coffee chat captain"
+    assert sum(1 for s in subjects.values() if s == "Your coffee chat group") == 60
+
+
+def test_outcomes_are_written_off_the_event_loop(tmp_path, monkeypatch):
+    import threading
+    outbox, _ = make_outbox(tmp_path, groups=10)
+    threads, written = set(), []
+    update = outbox.db.update_messages
+
+    def record(updates):
+        threads.add(threading.current_thread().name)
+        written.append(updates)
+        update(updates)
+
+    monkeypatch.setattr(outbox.db, 'update_messages', record)
+    assert run(DebugSMTPServer(), outbox, connections=3)['sent'] == 30
+    # One write per message, right after it was sent
+    assert len(written) == 30 and all(len(updates) == 1 for updates in written)
+    assert all(t.startswith("outbox") for t in threads)
+    assert outbox.counts() == {'sent': 30}
+
+
+def test_outbox_is_resumable_and_idempotent(tmp_path):
+    outbox, groups = make_outbox(tmp_path, groups=4)
+    server = DebugSMTPServer()
+    assert run(server, outbox, connections=2, limit=5)['sent'] == 5
+    # Queueing the same round again adds nothing, and sent messages are not resent
+    assert outbox.enqueue_groups(groups, "round-1") == 0
+    assert run(server, outbox, connections=2)['sent'] == 7
+    assert len(server.messages) == 12
+    assert len({m['Message-ID'] for _, m in server.messages}) == 12
+
+
+def test_transient_failures_retry_and_rejections_fail(tmp_path):
+    outbox, _ = make_outbox(tmp_path, groups=2)
+    server = DebugSMTPServer(reject={"employee1@example.com"}, fail_once={"employee2@example.com"})
+    stats = run(server, outbox, connections=1)
+
+    assert stats == {'sent': 5, 'failed': 1, 'retried': 1, 'connections': 2}
+    assert outbox.counts() == {'sent': 5, 'failed': 1}
+    assert outbox.retry_failed() == 1 and outbox.counts()['pending'] == 1
+
+
+def test_rate_limit_spaces_messages(tmp_path):
+    import time
+
+    outbox, _ = make_outbox(tmp_path, groups=2)
+    start = time.monotonic()
+    stats = run(DebugSMTPServer(), outbox, connections=2, rate=20)
+    assert stats['sent'] == 6
+    # Two messages may go in the first burst, the other four wait 1/20 s each
+    assert time.monotonic() - start >= 0.18
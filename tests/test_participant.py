@@ -0,0 +1,54 @@
+import copy
+import pickle
+
+from src.compatibility import CompatibilityIndex
+from src.models import CoffeeGroup, Participant
+
+
+def record(i, hours, timezone="UTC+00:00"):
+    return {
+        'id': f"{i:08d}",
+        'name': f"Employee {i}",
+        'email': f"employee{i}@example.com",
+        'department': "Business Intelligence",
+        'country': "Ireland",
+        'timezone': timezone,
+        'availability': {str(h): 'Y' if h in hours else 'N' for h in range(24)},
+        'captain_count': 0
+    }
+
+
+def test_dict_adapter_round_trips():
+    data = record(1, range(9, 12), "UTC+05:30")
+    p = Participant.from_dict(data)
+    assert p.to_dict() == data
+    assert p['availability'] == data['availability']
+    assert p.get('start_date') is None
+    p['captain_count'] += 1
+    p['start_date'] = "2024-01-01"
+    assert p.captain_count == 1 and p['start_date'] == "2024-01-01"
+
+
+def test_masks_follow_availability_and_timezone():
+    p = Participant.from_dict(record(1, [9, 10], "UTC+02:00"))
+    assert p.local_mask == (1 << 9) | (1 << 10)
+    assert p.mask == (1 << 7) | (1 << 8)
+    p['timezone'] = "UTC+00:00"
+    assert p.mask == p.local_mask and p.offset == 0
+    p['availability'] = record(1, [3])['availability']
+    assert p.mask == 1 << 3
+
+
+def test_equality_by_id_and_hashable():
+    a = Participant.from_dict(record(1, [9]))
+    b = Participant.from_dict(record(1, [10]))
+    assert a == b and len({a, b}) == 1
+    assert a != Participant.from_dict(record(2, [9]))
+    assert copy.deepcopy(a) == a and pickle.loads(pickle.dumps(a)).mask == a.mask
+
+
+def test_records_and_dicts_give_same_results():
+    dicts = [record(0, range(8, 13)), record(1, range(9, 17), "UTC-01:00"), record(2, range(7, 11))]
+    records = [Participant.from_dict(d) for d in dicts]
+    assert CompatibilityIndex(records).neighbors == CompatibilityIndex(dicts).neighbors
+    assert CoffeeGroup(records).common_hours == CoffeeGroup(dicts).common_hours
@@ -0,0 +1,76 @@
+import random
+
+from src.compatibility import CompatibilityIndex
+from src.excel_handler import ExcelTemplateHandler
+from src.models import CoffeeGroup, Participant, preferred_mask, utc_mask
+from src.scheduling import assign_meeting_times
+
+
+def person(i, available, preferred=()):
+    return {
+        'id': f"{i:08d}",
+        'name': f"Employee {i}",
+        'department': "Business Intelligence",
+        'timezone': "UTC+00:00",
+        'availability': {str(h): 'P' if h in preferred else 'Y' if h in available else 'N'
+                         for h in range(24)},
+        'captain_count': 0
+    }
+
+
+def test_preferred_hours_count_as_available():
+    p = Participant.from_dict(person(0, range(8, 12), preferred=(10, 11)))
+    assert utc_mask(p) == sum(1 << h for h in range(8, 12))
+    assert preferred_mask(p) == (1 << 10) | (1 << 11)
+    assert p.availability['10'] == 'P' and p.availability['8'] == 'Y' and p.availability['0'] == 'N'
+    assert preferred_mask(person(0, range(8, 12), preferred=(10, 11))) == preferred_mask(p)
+
+
+def test_meeting_time_favours_shared_preferred_hours():
+    group = CoffeeGroup([person(0, range(8, 16), preferred=(13, 14)),
+                         person(1, range(8, 16), preferred=(14,))])
+    assert group.optimal_meeting_time == 14
+    # Without preferences the earliest common hour is kept
+    assert CoffeeGroup([person(0, range(8, 16)), person(1, range(8, 16))]).optimal_meeting_time == 8
+
+
+def test_seed_tries_partners_with_shared_preferred_hours_first():
+    people = [person(0, range(8, 16), preferred=(14, 15))] + \
+             [person(i, range(8, 16)) for i in range(1, 6)] + [person(6, range(8, 16), preferred=(14, 15))]
+    index = CompatibilityIndex(people)
+    assert index.has_preferences
+    for seed in range(5):
+        group = index.find_group(0, 2, set(range(len(people))), random.Random(seed))
+        assert group == [0, 6]
+
+
+def test_scheduler_places_groups_at_preferred_hours():
+    groups = [CoffeeGroup([person(2 * i, range(8, 16), preferred=(15,)),
+                           person(2 * i + 1, range(8, 16), preferred=(15,))]) for i in range(3)]
+    schedule = assign_meeting_times(groups)
+    assert [g.optimal_meeting_time for g in groups] == [15, 15, 15]
+    assert schedule['preferred'] == 0  # 15:00 UTC is outside EMEA's preferred window
+
+
+def test_template_accepts_p_and_reader_keeps_it(tmp_path):
+    handler = ExcelTemplateHandler()
+    path = str(tmp_path / "template.xlsx")
+    handler.create_template(path)
+
+    import openpyxl
+    wb = openpyxl.load_workbook(path)
+    ws = wb["Participants"]
+    validations = [dv.formula1 for dv in ws.data_validations.dataValidation]
+    assert '"Y,P,N"' in validations
+    row = ["00000001", "Ana", "ana@example.com", "Business Intelligence", "Spain", "UTC+01:00",
+           None, "Active", None] + ['N'] * 24
+    row[9 + 9] = 'Y'
+    row[9 + 10] = 'P'
+    for col, value in enumerate(row, 1):
+        ws.cell(row=2, column=col, value=value)
+    wb.save(path)
+
+    participants = handler.read_participants_from_excel(path)
+    assert participants[0]['availability']['9'] == 'Y'
+    assert participants[0]['availability']['10'] == 'P'
+    assert preferred_mask(participants[0]) == 1 << 9  # 10:00 local is 09:00 UTC
@@ -0,0 +1,58 @@
+import openpyxl
+
+from src.coffee_matching import GroupMatcher
+from src.excel_handler import ExcelTemplateHandler, build_report_data, export_match_report
+from src.history_store import InMemoryHistory
+
+
+def person(i, name, timezone="UTC+00:00", hours=range(9, 17)):
+    return {
+        'id': f"{i:08d}",
+        'name': name,
+        'email': f"{name.lower()}@example.com",
+        'department': "Business Intelligence",
+        'country': "United Kingdom",
+        'timezone': timezone,
+        'availability': {str(h): 'Y' if h in hours else 'N' for h in range(24)},
+        'captain_count': 0
+    }
+
+
+def matched_roster():
+    participants = [person(0, "Dana"), person(1, "Alex"), person(2, "Chris"), person(3, "Bo"),
+                    person(4, "Eve", "UTC+05:30", hours=range(2, 3))]
+    matcher = GroupMatcher(participants, 2, 2, db=InMemoryHistory(), seed=1)
+    return participants, matcher, matcher.create_groups()
+
+
+def test_report_data_summary():
+    participants, matcher, groups = matched_roster()
+    data = build_report_data(groups, participants)
+    summary = data['summary']
+    assert (summary['participants'], summary['matched'], summary['unmatched']) == (5, 4, 1)
+    assert summary['matched_pct'] == 80.0
+    assert sum(summary['per_hour'].values()) == summary['groups'] == 2
+    assert summary['regions']['APAC'] == {'participants': 1, 'matched': 0, 'unmatched': 1, 'captains': 0}
+    assert summary['regions']['EMEA']['captains'] == 2
+    assert [row[0] for row in data['people']] == ["Alex", "Bo", "Chris", "Dana", "Eve"]
+    assert data['unmatched'][0][:4] == ["Eve", "UTC+05:30", "Business Intelligence", 1]
+
+
+def test_export_match_report_writes_every_sheet(tmp_path):
+    participants, matcher, groups = matched_roster()
+    output = tmp_path / "report.xlsx"
+    export_match_report(groups, str(output), participants=participants,
+                        unmatched=matcher.analyze_unmatched_participants())
+    wb = openpyxl.load_workbook(output)
+    assert wb.sheetnames == ["Coffee Chat Groups", "People", "Unmatched", "Summary"]
+    assert wb["Coffee Chat Groups"].max_row == 3
+    assert wb["People"]["A2"].value == "Alex"
+    assert wb["Unmatched"]["E2"].value == "Consider expanding availability window"
+    assert wb["Summary"]["B4"].value == 80.0
+
+
+def test_handler_export_matches_to_excel(tmp_path):
+    participants, _, groups = matched_roster()
+    output = tmp_path / "matches.xlsx"
+    ExcelTemplateHandler().export_matches_to_excel(groups, str(output), participants=participants)
+    assert openpyxl.load_workbook(output)["Unmatched"]["A2"].value == "Eve"
@@ -0,0 +1,77 @@
+from src.captain_history import CaptainHistoryDB
+from src.coffee_matching import GroupMatcher
+from src.compatibility import CompatibilityIndex
+from src.rescue import RescuePass
+
+
+def person(i, hours):
+    return {
+        'id': f"{i:08d}",
+        'name': f"Employee {i}",
+        'department': "Business Intelligence",
+        'timezone': "UTC+00:00",
+        'availability': {str(h): 'Y' if h in hours else 'N' for h in range(24)},
+        'captain_count': 0
+    }
+
+
+def test_unmatched_joins_existing_pair():
+    index = CompatibilityIndex([person(0, range(9, 13)), person(1, range(9, 13)), person(2, range(10, 12))])
+    groups = [[0, 1]]
+    report = RescuePass(index, max_group_size=3).run(groups, [2])
+    assert groups == [[0, 1, 2]]
+    assert report[0]['action'] == 'joined' and report[0]['overlap_hours'] == 2
+
+
+def test_swap_frees_member_who_has_other_options():
+    participants = [
+        person(0, range(8, 13)),    # compatible with 1 and 2
+        person(1, range(9, 17)),    # compatible with 0 and 3
+        person(2, range(7, 10)),    # compatible with 0 only
+        person(3, range(14, 17)),   # compatible with 1 only
+    ]
+    index = CompatibilityIndex(participants)
+    groups = [[0, 1]]
+    report = RescuePass(index, max_group_size=2).run(groups, [2, 3])
+    assert sorted(map(sorted, groups)) == [[0, 2], [1, 3]]
+    actions = {entry['id']: entry['action'] for entry in report}
+    assert actions == {'00000002': 'swapped', '00000003': 'paired_with_displaced'}
+    assert report[0]['displaced'] == '00000001'
+
+
+def test_relaxed_pair_when_nothing_else_works():
+    index = CompatibilityIndex([person(0, [9, 10]), person(1, [10, 11])])
+    groups = []
+    rescue = RescuePass(index)
+    report = rescue.run(groups, [0, 1])
+    assert groups == [[0, 1]]
+    assert {entry['action'] for entry in report} == {'relaxed_pair'}
+    assert rescue.relaxed == {0}
+
+
+def test_matcher_rescue_never_loses_people(tmp_path):
+    from src.synthetic import generate_participants
+
+    def run(rescue):
+        participants = generate_participants(150, seed=9)
+        db = CaptainHistoryDB(str(tmp_path / f"history_{rescue}.db"))
+        matcher = GroupMatcher(participants, max_group_size=2, db=db, seed=3, rescue=rescue)
+        return participants, matcher, matcher.create_groups()
+
+    _, _, plain = run(False)
+    participants, matcher, rescued = run(True)
+    assert sum(len(g.members) for g in rescued) >= sum(len(g.members) for g in plain)
+    assert all(g.is_valid_group() and g.captain for g in rescued)
+    assert sum(p['captain_count'] for p in participants) == len(rescued)
+    for entry in matcher.rescue_report:
+        assert entry['action'] in ('joined', 'swapped', 'paired_with_displaced', 'paired',
+                                   'relaxed_pair', 'unresolved')
+
+
+def test_rescue_respects_min_group_size(tmp_path):
+    participants = [person(i, range(9, 12)) for i in range(3)] + \
+                   [person(i, range(20, 23)) for i in range(3, 5)]
+    matcher = GroupMatcher(participants, 3, 3, db=CaptainHistoryDB(str(tmp_path / "history.db")), seed=1)
+    groups = matcher.create_groups()
+    assert [len(g.members) for g in groups] == [3]
+    assert {entry['action'] for entry in matcher.rescue_report} == {'unresolved'}
@@ -0,0 +1,46 @@
+from src.models import CoffeeGroup
+from src.scheduling import assign_meeting_times
+
+
+def make_member(i, timezone="UTC+00:00", hours=range(8, 17)):
+    return {
+        'id': f"{i:08d}",
+        'name': f"Employee {i}",
+        'department': "Business Intelligence",
+        'timezone': timezone,
+        'availability': {str(h): 'Y' if h in hours else 'N' for h in range(24)},
+        'captain_count': 0
+    }
+
+
+def make_groups(count, **kwargs):
+    return [CoffeeGroup([make_member(2 * i, **kwargs), make_member(2 * i + 1, **kwargs)])
+            for i in range(count)]
+
+
+def test_groups_prefer_regional_hours_and_spread_load():
+    groups = make_groups(10)
+    schedule = assign_meeting_times(groups, max_per_hour=4)
+    hours = [g.optimal_meeting_time for g in groups]
+    # EMEA prefers 08:00-10:00 UTC and all groups fit there under the cap
+    assert set(hours) <= {8, 9, 10}
+    assert max(hours.count(h) for h in set(hours)) <= 4
+    assert schedule['preferred'] == 10
+    assert schedule['over_capacity'] == 0
+
+
+def test_capacity_pushes_groups_to_other_common_hours():
+    groups = make_groups(10)
+    schedule = assign_meeting_times(groups, max_per_hour=2)
+    hours = [g.optimal_meeting_time for g in groups]
+    assert all(h in g.common_hours for h, g in zip(hours, groups))
+    assert max(schedule['per_hour'].values()) <= 2
+    assert schedule['preferred'] == 6
+
+
+def test_overflow_when_capacity_is_impossible():
+    # Only two shared hours, five groups, one meeting per hour allowed
+    groups = make_groups(5, hours=range(12, 14))
+    schedule = assign_meeting_times(groups, max_per_hour=1)
+    assert sum(schedule['per_hour'].values()) == 5
+    assert schedule['over_capacity'] == 3
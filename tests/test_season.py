@@ -0,0 +1,52 @@
+from itertools import combinations
+
+from src.captain_history import CaptainHistoryDB
+from src.season import SeasonPlanner
+from src.synthetic import generate_participants
+
+
+def plan_season(tmp_path, workers=1):
+    participants = generate_participants(90, seed=21)
+    db = CaptainHistoryDB(str(tmp_path / f"history_{workers}.db"))
+    planner = SeasonPlanner(participants, rounds=3, db=db, seed=4, attempts=3, workers=workers)
+    return planner, planner.plan()
+
+
+def test_nobody_meets_twice_and_captains_rotate(tmp_path):
+    planner, season = plan_season(tmp_path)
+    assert len(season) == 3
+
+    pairs = set()
+    for groups in season:
+        for group in groups:
+            assert group.is_valid_group()
+            for a, b in combinations(sorted(m['id'] for m in group.members), 2):
+                assert (a, b) not in pairs
+                pairs.add((a, b))
+
+    # Every group has one captain and nobody captains much more than anyone else
+    captain_counts = [p['captain_count'] for p in planner.participants]
+    assert sum(captain_counts) == sum(len(groups) for groups in season)
+    assert max(captain_counts) <= 2
+
+
+def test_parallel_attempts_match_serial(tmp_path):
+    _, serial = plan_season(tmp_path, workers=1)
+    _, parallel = plan_season(tmp_path, workers=2)
+    as_ids = lambda season: [[sorted(m['id'] for m in g.members) for g in groups] for groups in season]
+    assert as_ids(serial) == as_ids(parallel)
+
+
+def test_commit_and_export_all_rounds(tmp_path):
+    import sqlite3
+    import openpyxl
+
+    planner, season = plan_season(tmp_path)
+    planner.commit()
+    with sqlite3.connect(planner.db.db_path) as conn:
+        dates = [row[0] for row in conn.execute("SELECT DISTINCT date FROM meetings ORDER BY date")]
+    assert dates == planner.round_dates()
+
+    output = str(tmp_path / "season.xlsx")
+    planner.export(output)
+    assert len(openpyxl.load_workbook(output).sheetnames) == 3
@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+from src.service import MatchingService
+
+
+def make_participants():
+    """Six participants who all share 09:00-17:00 UTC"""
+    participants = []
+    for i in range(6):
+        participants.append({
+            'id': f"{i + 1:08d}",
+            'name': f"Employee {i + 1}",
+            'email': f"employee{i + 1}@example.com",
+            'department': "Business Intelligence",
+            'country': "United Kingdom",
+            'timezone': "UTC+00:00",
+            'availability': {str(h): 'Y' if 9 <= h < 17 else 'N' for h in range(24)},
+            'captain_count': 0
+        })
+    return participants
+
+
+async def request(port, method, path, body=b""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n"
+                 f"Connection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    status = int(head.split(b" ")[1])
+    return status, payload
+
+
+def test_service_roundtrip(tmp_path):
+    async def scenario():
+        service = MatchingService(str(tmp_path / "history.db"))
+        server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            status, payload = await request(port, "POST", "/match")
+            assert status == 409
+
+            roster = json.dumps({'participants': make_participants()}).encode()
+            status, payload = await request(port, "POST", "/roster", roster)
+            assert status == 200
+            assert json.loads(payload)['participants'] == 6
+            index = service.index
+
+            status, payload = await request(port, "POST", "/match", b'{"max_group_size": 3}')
+            assert status == 200
+            assert json.loads(payload)['matched'] == 6
+            # The compatibility index stays warm across requests
+            assert service.index is index
+
+            status, payload = await request(port, "GET", "/groups")
+            groups = json.loads(payload)['groups']
+            assert sum(len(g['members']) for g in groups) == 6
+
+            status, payload = await request(port, "GET", "/export")
+            assert status == 200
+            assert payload[:2] == b"PK"  # xlsx files are zip archives
+
+            status, _ = await request(port, "GET", "/nope")
+            assert status == 404
+        finally:
+            server.close()
+            await server.wait_closed()
+            service.close()
+
+    asyncio.run(scenario())
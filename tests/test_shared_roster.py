@@ -0,0 +1,62 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from src.compatibility import CompatibilityIndex
+from src.shared_roster import SharedRoster
+from src.synthetic import generate_participants
+
+
+def read_worker(handle):
+    roster = SharedRoster.attach(handle)
+    try:
+        return roster.masks(), roster.department.tolist(), roster.captain_count.tolist()
+    finally:
+        roster.close()
+
+
+def test_arrays_match_roster():
+    participants = generate_participants(50, seed=2)
+    participants[3]['captain_count'] = 4
+    index = CompatibilityIndex(participants)
+    with SharedRoster.create(participants) as roster:
+        assert roster.masks() == index.masks
+        assert roster.captain_count[3] == 4
+        assert roster.departments[roster.department[0]] == participants[0]['department']
+        assert roster.neighbors(index.min_overlap_hours) == index.neighbors
+
+
+def test_worker_attaches_without_participants():
+    participants = generate_participants(30, seed=5)
+    with SharedRoster.create(participants) as roster:
+        roster.captain_count[0] = 7
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            masks, departments, counts = pool.submit(read_worker, roster.handle).result()
+        assert masks == roster.masks()
+        assert departments == roster.department.tolist()
+        assert counts[0] == 7
+
+
+def test_weekly_roster_uses_week_masks():
+    participants = generate_participants(40, seed=8)
+    for p in participants[:10]:
+        p['weekly_availability'] = {str(24 + h): 'Y' for h in range(9, 13)}  # Tuesdays only
+    index = CompatibilityIndex(participants)
+    assert index.weekly
+    with SharedRoster.create(participants) as roster:
+        assert roster.handle.days == 7
+        assert roster.masks() == index.masks
+        assert roster.neighbors(index.min_overlap_hours) == index.neighbors
+
+
+def test_participants_round_trip():
+    participants = generate_participants(60, seed=11)
+    participants[4]['captain_count'] = 2
+    for p in participants[:5]:
+        p['weekly_availability'] = {str(48 + h): 'Y' for h in range(14, 18)}  # Wednesdays only
+    index = CompatibilityIndex(participants)
+    with SharedRoster.create(participants) as roster:
+        records = roster.participants()
+    assert [r['id'] for r in records] == [p['id'] for p in participants]
+    assert [r['timezone'] for r in records] == [p['timezone'] for p in participants]
+    assert [r['department'] for r in records] == [p['department'] for p in participants]
+    assert records[4]['captain_count'] == 2
+    assert CompatibilityIndex(records).masks == index.masks
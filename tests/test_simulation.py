@@ -0,0 +1,64 @@
+import pytest
+
+from src.constraints import ConstraintSet
+from src.models import get_region
+from src.simulation import build_roster, simulate
+from src.synthetic import generate_participants
+
+LOCATIONS = {
+    "India": ["UTC+05:30"],
+    "Australia": ["UTC+08:00", "UTC+10:00"],
+    "United Kingdom": ["UTC+00:00"],
+    "Colombia": ["UTC-05:00"],
+}
+
+
+def test_build_roster_adds_people_in_region_and_country():
+    base = generate_participants(10, seed=1)
+    roster = build_roster(base, {"APAC": 20, "Colombia": 5}, seed=3, locations=LOCATIONS)
+    assert len(roster) == 35
+    assert len({p['id'] for p in roster}) == 35
+    added = roster[10:]
+    assert sum(1 for p in added if get_region(p['timezone']) == 'APAC') == 20
+    assert {p['country'] for p in added} == {"India", "Australia", "Colombia"}
+    assert base[0]['captain_count'] == 0 and roster[0] is not base[0]
+
+
+def test_unknown_region_raises():
+    with pytest.raises(ValueError):
+        build_roster([], {"Atlantis": 5}, locations=LOCATIONS)
+
+
+def test_simulation_report_is_reproducible_across_workers():
+    roster = build_roster(generate_participants(40, seed=2), {"APAC": 15}, seed=2, locations=LOCATIONS)
+    serial = simulate(roster, runs=4, seed=9, workers=1)
+    parallel = simulate(roster, runs=4, seed=9, workers=2)
+    assert serial['runs'] == 4 and serial['participants'] == 55
+    assert serial['matched_fraction'] == parallel['matched_fraction']
+    assert serial['per_hour'] == parallel['per_hour']
+    meetings = sum(load['mean'] for load in serial['per_hour'].values())
+    assert meetings == pytest.approx(sum(serial['group_sizes'].values()))
+    unmatched = sum(serial['unmatched_causes'].values())
+    assert unmatched == pytest.approx((1 - serial['matched_fraction']['mean']) * 55)
+
+
+def test_simulation_applies_constraints():
+    roster = [{'id': str(i), 'name': str(i), 'timezone': 'UTC+00:00', 'captain_count': 0,
+               'availability': {str(h): 'Y' for h in range(9, 12)}} for i in range(2)]
+    report = simulate(roster, runs=2, constraints=ConstraintSet(min_overlap_hours=3))
+    assert report['matched_fraction']['mean'] == 1
+    rules = [{'type': 'do_not_pair', 'pairs': [['0', '1']]}]
+    report = simulate(roster, runs=2, constraints=ConstraintSet(min_overlap_hours=3, rules=rules))
+    assert report['unmatched_causes'] == {'no_partner': 2}
+    # Two hours short of the overlap: not even rescue's relaxed pairing applies
+    report = simulate(roster, runs=2, constraints=ConstraintSet(min_overlap_hours=5))
+    assert report['unmatched_causes'] == {'few_hours': 2}
+
+
+def test_simulation_uses_the_solver():
+    roster = generate_participants(200, seed=2)
+    random_report = simulate(roster, runs=3, seed=1, solver='random')
+    constrained = simulate(roster, runs=3, seed=1, solver='constrained')
+    assert constrained['matched_fraction'] != random_report['matched_fraction']
+    with pytest.raises(ValueError):
+        simulate(roster, runs=1, solver='greedy')
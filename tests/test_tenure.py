@@ -0,0 +1,120 @@
+import random
+import subprocess
+import sys
+from datetime import date
+from itertools import permutations
+
+from src.coffee_matching import GroupMatcher
+from src.compatibility import CompatibilityIndex
+from src.constraints import ConstraintSet
+from src.history_store import InMemoryHistory
+from src.season import SeasonPlanner
+from src.tenure import NEWCOMER, OTHER, SENIOR, assign_mentors, classify, hopcroft_karp, tenure_days
+from src.utils import set_round_date
+
+ROUND = date(2025, 6, 1)
+NEW, MID, OLD = "2025-03-01", "2023-06-01", "2015-01-01"
+
+
+def person(i, start_date, hours=range(9, 17)):
+    return {
+        'id': f"{i:08d}",
+        'name': f"Employee {i}",
+        'department': "Business Intelligence",
+        'timezone': "UTC+00:00",
+        'availability': {str(h): 'Y' if h in hours else 'N' for h in range(24)},
+        'captain_count': 0,
+        'start_date': start_date,
+    }
+
+
+def tenure_mix(hard=True, max_group_size=3):
+    return ConstraintSet(max_group_size=max_group_size,
+                         rules=[{"type": "tenure_mix", "newcomer_days": 180, "senior_days": 1095, "hard": hard}])
+
+
+def test_tenure_is_a_compact_array_of_days():
+    days = tenure_days([person(0, NEW), person(1, OLD), person(2, None)], on=ROUND)
+    assert days.typecode == 'i'
+    assert days.tolist() == [92, (ROUND - date(2015, 1, 1)).days, -1]
+    assert classify(days) == [NEWCOMER, SENIOR, OTHER]
+
+
+def test_matcher_import_does_not_load_numpy():
+    code = "import sys, src.coffee_matching; print('numpy' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_hopcroft_karp_finds_a_maximum_matching():
+    rng = random.Random(3)
+    for _ in range(50):
+        left, right = rng.randint(1, 6), rng.randint(1, 6)
+        adjacency = [sorted(rng.sample(range(right), rng.randint(0, right))) for _ in range(left)]
+        matching = hopcroft_karp(adjacency)
+        matched = [v for v in matching if v is not None]
+        assert len(matched) == len(set(matched))
+        assert all(v is None or v in adjacency[u] for u, v in enumerate(matching))
+        best = max(sum(1 for u, v in enumerate(order) if u < left and v in adjacency[u])
+                   for order in permutations(range(max(left, right))))
+        assert len(matched) == best
+
+
+def test_matching_beats_greedy_pairing():
+    # Newcomer 0 can meet either senior, newcomer 1 only senior 2: greedy 0-2 would strand 1
+    set_round_date(ROUND)
+    try:
+        people = [person(0, NEW, range(9, 17)), person(1, NEW, range(9, 11)),
+                  person(2, OLD, range(9, 17)), person(3, OLD, range(12, 17))]
+        index = CompatibilityIndex(people)
+        teams = assign_mentors(index, classify(tenure_days(people)), team_size=2)
+        assert teams == {2: [1], 3: [0]}
+    finally:
+        set_round_date(None)
+
+
+def test_hard_rule_gives_every_newcomer_group_a_senior():
+    set_round_date(ROUND)
+    try:
+        starts = [NEW] * 6 + [OLD] * 4 + [MID] * 8
+        people = [person(i, start) for i, start in enumerate(starts)]
+        for seed in range(5):
+            matcher = GroupMatcher([p.copy() for p in people], db=InMemoryHistory(), seed=seed,
+                                   constraints=tenure_mix(hard=True))
+            groups = matcher.create_groups()
+            roles = {p['id']: p['start_date'] for p in people}
+            for group in groups:
+                members = [roles[m['id']] for m in group.members]
+                assert NEW not in members or OLD in members
+            # Four seniors, teams of up to three: at most eight newcomers, all six fit
+            placed = {m['id'] for g in groups for m in g.members}
+            assert all(p['id'] in placed for p in people if p['start_date'] == NEW)
+    finally:
+        set_round_date(None)
+
+
+def test_soft_rule_penalises_unmentored_groups():
+    set_round_date(ROUND)
+    try:
+        people = [person(0, NEW), person(1, MID), person(2, OLD)]
+        rules = tenure_mix(hard=False).compile(CompatibilityIndex(people))
+        assert rules.penalty([0, 1]) == 1 and rules.penalty([0, 2]) == 0
+        assert rules.group_allowed([0, 1])
+        assert not tenure_mix(hard=True).compile(CompatibilityIndex(people)).group_allowed([0, 1])
+    finally:
+        set_round_date(None)
+
+
+def test_season_reassigns_mentors_each_round():
+    people = [person(i, start) for i, start in enumerate([NEW] * 3 + [OLD] * 3 + [MID] * 3)]
+    planner = SeasonPlanner(people, rounds=2, db=InMemoryHistory(), seed=1, attempts=2,
+                            max_group_size=2, start_date=ROUND, constraints=tenure_mix(max_group_size=2))
+    try:
+        season = planner.plan()
+    finally:
+        set_round_date(None)
+    pairs = [frozenset(m['id'] for m in g.members) for groups in season for g in groups]
+    assert len(pairs) == len(set(pairs))
+    starts = {p['id']: p['start_date'] for p in people}
+    for pair in pairs:
+        assert NEW not in {starts[i] for i in pair} or OLD in {starts[i] for i in pair}
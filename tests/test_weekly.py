@@ -0,0 +1,124 @@
+import openpyxl
+
+from src.coffee_matching import GroupMatcher, groups_from_records, groups_to_records, run_matching_program
+from src.excel_handler import WEEKLY_SHEET, ExcelTemplateHandler
+from src.history_store import InMemoryHistory
+from src.models import CoffeeGroup, Participant
+from src.scheduling import assign_meeting_times
+from src.utils import convert_local_to_utc, day_hours, week_mask, weekly_availability_to_mask
+
+TUESDAY, WEDNESDAY = 1, 2
+
+
+def person(i, day=None, hours=range(9, 13), timezone="UTC+00:00"):
+    data = {
+        'id': f"{i:08d}",
+        'name': f"Employee {i}",
+        'email': f"e{i}@example.com",
+        'department': "Business Intelligence",
+        'timezone': timezone,
+        'availability': {str(h): 'Y' if h in hours else 'N' for h in range(24)},
+        'captain_count': 0
+    }
+    if day is not None:
+        data['weekly_availability'] = {str(day * 24 + h): 'Y' for h in hours}
+    return Participant.from_dict(data)
+
+
+def test_week_mask_of_an_every_day_grid_equals_the_daily_mask():
+    daily = person(0, timezone="UTC+05:30")
+    grid = {str(d * 24 + h): 'Y' for d in range(7) for h in range(9, 13)}
+    weekly = Participant.from_dict(dict(daily.to_dict(), weekly_availability=grid))
+    assert weekly.week == daily.week_mask == week_mask(daily.mask)
+    assert day_hours(weekly.week) == 4
+
+
+def test_group_on_the_same_weekday():
+    group = CoffeeGroup([person(0, TUESDAY), person(1, TUESDAY, timezone="UTC+01:00", hours=range(10, 14))])
+    assert group.weekly and group.is_valid_group()
+    assert group.meeting_time_label == "Tue 09:00 UTC"
+    assert not CoffeeGroup([person(0, TUESDAY), person(1, WEDNESDAY)]).is_valid_group()
+
+
+def test_daily_people_fit_any_weekday():
+    group = CoffeeGroup([person(0, WEDNESDAY), person(1)])
+    assert group.is_valid_group()
+    assert min(group.common_hours) // 24 == WEDNESDAY
+
+
+def test_matcher_keeps_weekdays_apart():
+    participants = [person(i, TUESDAY if i < 4 else WEDNESDAY) for i in range(8)]
+    matcher = GroupMatcher(participants, 2, 2, db=InMemoryHistory(), seed=1, rescue=False)
+    groups = matcher.create_groups()
+    assert len(groups) == 4
+    for group in groups:
+        assert len({int(m['id']) < 4 for m in group.members}) == 1
+    records = groups_to_records(groups)
+    assert all(r['meeting_time'][:3] in ("Tue", "Wed") for r in records)
+    rebuilt = groups_from_records(records, participants)
+    assert [g.optimal_meeting_time for g in rebuilt] == [g.optimal_meeting_time for g in groups]
+
+
+def test_scheduler_spreads_over_week_slots():
+    groups = [CoffeeGroup([person(2 * i, TUESDAY), person(2 * i + 1, TUESDAY)]) for i in range(4)]
+    schedule = assign_meeting_times(groups, max_per_hour=1)
+    assert schedule['over_capacity'] == 0
+    assert sorted(schedule['per_hour']) == [24 + 9, 24 + 10, 24 + 11, 24 + 12]
+
+
+def test_scheduler_only_uses_days_the_group_was_matched_on():
+    # One shared hour on Wednesday as well, but only Tuesday has enough
+    def both_days(i):
+        data = dict(person(i).to_dict(), weekly_availability={
+            **{str(TUESDAY * 24 + h): 'Y' for h in range(9, 13)}, str(WEDNESDAY * 24 + 9): 'Y'})
+        return Participant.from_dict(data)
+    groups = [CoffeeGroup([both_days(2 * i), both_days(2 * i + 1)]) for i in range(6)]
+    assert groups[0].meeting_slots() == [24 + 9, 24 + 10, 24 + 11, 24 + 12]
+    schedule = assign_meeting_times(groups, max_per_hour=1)
+    assert all(g.optimal_meeting_time // 24 == TUESDAY for g in groups)
+    assert schedule['over_capacity'] == 2
+
+
+def test_weekly_sheet_round_trip(tmp_path):
+    path = str(tmp_path / "template.xlsx")
+    handler = ExcelTemplateHandler()
+    handler.create_template(path, weekly=True)
+    wb = openpyxl.load_workbook(path)
+    ws = wb["Participants"]
+    for row, i in enumerate(range(2), 2):
+        values = [f"{i:08d}", f"Employee {i}", f"e{i}@example.com", "Business Intelligence",
+                  "United Kingdom", "UTC+00:00", None, "Active", None] + ["Y" if 9 <= h < 13 else "N" for h in range(24)]
+        for col, value in enumerate(values, 1):
+            ws.cell(row=row, column=col, value=value)
+    weekly_ws = wb[WEEKLY_SHEET]
+    weekly_ws.append(["00000001", "Tuesday"] + ["Y" if 9 <= h < 13 else None for h in range(24)])
+    wb.save(path)
+
+    participants = handler.read_participants_from_excel(path)
+    assert participants[0].week is None
+    assert participants[1].week == sum(1 << (24 + h) for h in range(9, 13))
+
+
+
+def test_summary_labels_week_slots(tmp_path, capsys):
+    path = str(tmp_path / "template.xlsx")
+    ExcelTemplateHandler().create_template(path, weekly=True)
+    wb = openpyxl.load_workbook(path)
+    for row, i in enumerate(range(2), 2):
+        values = [f"{i:08d}", f"Employee {i}", f"e{i}@example.com", "Business Intelligence",
+                  "United Kingdom", "UTC+00:00", None, "Active", None] + ["N"] * 24
+        for col, value in enumerate(values, 1):
+            wb["Participants"].cell(row=row, column=col, value=value)
+        wb[WEEKLY_SHEET].append([f"{i:08d}", "Tuesday"] + ["Y" if 9 <= h < 13 else None for h in range(24)])
+    wb.save(path)
+
+    run_matching_program(path, str(tmp_path / "matches.xlsx"), db_path=str(tmp_path / "history.db"), seed=1)
+    assert "Meetings per UTC hour: Tue 09:00=1" in capsys.readouterr().out
+
+
+def test_half_hour_zones_land_in_the_hour_they_start_in():
+    # 09:00 local is 03:30 UTC in UTC+05:30 and 12:30 UTC in UTC-03:30
+    assert convert_local_to_utc('9', 'UTC+05:30') == 3
+    assert convert_local_to_utc('9', 'UTC-03:30') == 12
+    assert weekly_availability_to_mask({'33': 'Y'}, 'UTC+05:30') == 1 << 27  # Tue 03:00 UTC
+    assert weekly_availability_to_mask({'33': 'Y'}, 'UTC-03:30') == 1 << 36  # Tue 12:00 UTC